@@ -0,0 +1,162 @@
+import re
+from collections import Counter, namedtuple
+
+# Word-level rewrites applied during normalization so 'S' and 'South' compare equal
+ABBREVIATIONS = {
+    'n': 'north', 's': 'south', 'e': 'east', 'w': 'west',
+    'st': 'street', 'ave': 'avenue', 'av': 'avenue', 'blvd': 'boulevard', 'rd': 'road',
+    'dr': 'drive', 'ln': 'lane', 'ct': 'court', 'pkwy': 'parkway', 'hwy': 'highway',
+    'cir': 'circle', 'pl': 'place', 'sta': 'station', 'stn': 'station',
+}
+
+_PUNCTUATION = re.compile(r'[^\w\s#]')
+_WHITESPACE = re.compile(r'\s+')
+
+Resolution = namedtuple('Resolution', ['query', 'index', 'address', 'score', 'ambiguous', 'alternatives'])
+
+
+def normalize_address(address):
+    """
+    Canonical form used for matching: lower case, no punctuation, expanded abbreviations.
+    Time Complexity: O(k) where k is length of the address
+
+    Args:
+        address (str): Raw address text
+    Returns:
+        str: Normalized address
+    """
+    words = _WHITESPACE.split(_PUNCTUATION.sub(' ', address.lower()).strip())
+    return ' '.join(ABBREVIATIONS.get(word, word) for word in words if word)
+
+
+def trigrams(text):
+    """
+    Set of character trigrams of a normalized string, padded so word starts count.
+    Time Complexity: O(k) where k is length of the text
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AddressResolver:
+    """
+    Resolves free-text addresses to location indices.
+    Tries an exact match, then a normalized match, then scores candidates from a
+    character-trigram inverted index by Dice similarity. Results are cached.
+    """
+
+    def __init__(self, addresses, min_score=0.6, ambiguity_margin=0.05, postings_budget=2000, min_grams=3):
+        """
+        Builds the normalization table and trigram index once.
+        Time Complexity: O(n * k) where n is number of addresses and k is address length
+
+        Args:
+            addresses (list[str]): Addresses by location index
+            min_score (float): Lowest Dice score accepted as a match
+            ambiguity_margin (float): Score gap below which two different addresses are ambiguous
+            postings_budget (int): Posting entries scanned per fuzzy query; common trigrams
+                beyond the budget are skipped when gathering candidates but still count when scoring
+            min_grams (int): Rarest trigrams always scanned regardless of the budget
+        """
+        self.addresses = list(addresses)
+        self.min_score = min_score
+        self.ambiguity_margin = ambiguity_margin
+        self.postings_budget = postings_budget
+        self.min_grams = min_grams
+        self.exact = {}
+        self.normalized = {}
+        self.canonical = []
+        self.gram_sets = []
+        self.index = {}
+        self.cache = {}
+
+        for position, address in enumerate(self.addresses):
+            self.exact.setdefault(address, position)
+            normalized = normalize_address(address)
+            self.canonical.append(self.normalized.setdefault(normalized, position))
+            grams = trigrams(normalized)
+            self.gram_sets.append(grams)
+            for gram in grams:
+                self.index.setdefault(gram, []).append(position)
+
+    def resolve(self, address):
+        """
+        Finds the best matching location for an address.
+        Time Complexity: O(1) for cached, exact or normalized hits; otherwise proportional
+        to the postings of the query's rarer trigrams
+
+        Args:
+            address (str): Address to look up
+        Returns:
+            Resolution: Best index (None if nothing scores above min_score), score in [0, 1],
+                        whether the match is ambiguous, and competing candidates
+        """
+        cached = self.cache.get(address)
+        if cached is not None:
+            return cached
+
+        position = self.exact.get(address)
+        normalized = normalize_address(address)
+        if position is None:
+            position = self.normalized.get(normalized)
+        if position is not None:
+            result = Resolution(address, position, self.addresses[position], 1.0, False, ())
+        else:
+            result = self._fuzzy(address, normalized)
+
+        self.cache[address] = result
+        return result
+
+    def _fuzzy(self, address, normalized):
+        """Helper function scoring trigram candidates for a query with no direct match"""
+        query_grams = trigrams(normalized)
+        if not query_grams:
+            return Resolution(address, None, None, 0.0, False, ())
+
+        # Gather candidates from the rarest trigrams first, within a postings budget
+        postings = sorted((self.index[gram] for gram in query_grams if gram in self.index), key=len)
+        hits = Counter()
+        scanned = 0
+        for used, posting in enumerate(postings):
+            if used >= self.min_grams and scanned + len(posting) > self.postings_budget:
+                break
+            hits.update(posting)
+            scanned += len(posting)
+
+        scored = []
+        for position, _ in hits.most_common(64):
+            grams = self.gram_sets[position]
+            score = 2 * len(query_grams & grams) / (len(query_grams) + len(grams))
+            scored.append((score, position))
+        scored.sort(reverse=True)
+
+        if not scored or scored[0][0] < self.min_score:
+            alternatives = tuple((self.addresses[p], round(s, 3)) for s, p in scored[:3])
+            return Resolution(address, None, None, scored[0][0] if scored else 0.0, False, alternatives)
+
+        best_score, best = scored[0]
+        rivals = [(self.addresses[p], round(s, 3)) for s, p in scored[1:4]
+                  if best_score - s < self.ambiguity_margin and self.canonical[p] != self.canonical[best]]
+        return Resolution(address, best, self.addresses[best], best_score, bool(rivals), tuple(rivals))
+
+    def resolve_batch(self, addresses):
+        """
+        Resolves many addresses and reports problems together instead of failing on the first.
+        Time Complexity: O(m) resolutions where m is number of addresses
+
+        Args:
+            addresses (iterable[str]): Addresses to look up
+        Returns:
+            tuple: (dict address -> Resolution for confident matches,
+                    list of unresolved Resolutions, list of ambiguous Resolutions)
+        """
+        resolved, unresolved, ambiguous = {}, [], []
+        for address in addresses:
+            result = self.resolve(address)
+            if result.index is None:
+                unresolved.append(result)
+            elif result.ambiguous:
+                ambiguous.append(result)
+            else:
+                resolved[address] = result
+        return resolved, unresolved, ambiguous
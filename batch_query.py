@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+import sys
+
+import clock
+
+OUTPUT_FIELDS = ['query_time', 'tracking_id', 'destination', 'city', 'state', 'zip_code',
+                 'deadline', 'status', 'vehicle_id', 'delivery_time']
+
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+
+def parse_package_ranges(spec):
+    """
+    Parses a package selection such as '1-5,9,12-40' into a sorted list of IDs.
+    Time Complexity: O(n) where n is number of selected IDs
+
+    Args:
+        spec (str): Comma separated IDs and inclusive ranges
+    Returns:
+        list[int]: Selected tracking IDs
+    Raises:
+        ValueError: If spec is malformed
+    """
+    selected = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                first, last = (int(bound) for bound in part.split('-', 1))
+                if first > last:
+                    raise ValueError
+                selected.update(range(first, last + 1))
+            else:
+                selected.add(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid package selection: {part}")
+    return sorted(selected)
+
+
+def read_query_times(at_times, times_source=None):
+    """
+    Collects query times from the command line and an optional file or stdin.
+    Blank lines and lines starting with '#' in the file are ignored.
+    Time Complexity: O(t) where t is number of query times
+
+    Args:
+        at_times (list[str]): Times given with --at
+        times_source (str): Path of a file with one time per line, or '-' for stdin
+    Yields:
+        int: Query time in seconds since midnight
+    """
+    for value in at_times or []:
+        yield clock.parse_time(value)
+
+    if times_source is None:
+        return
+    source = sys.stdin if times_source == '-' else open(times_source)
+    try:
+        for line in source:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield clock.parse_time(line)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def _rows(plan, query_times, package_ids):
+    """Helper generator producing plain output rows for every time/package pair"""
+    for query_seconds in query_times:
+        query_label = clock.format_seconds(query_seconds)
+        for tracking_id in package_ids:
+            if tracking_id not in plan.parcels:
+                continue
+            row = plan.parcel_status(tracking_id, query_seconds)
+            yield [query_label, row.tracking_id, row.destination, row.city, row.state, row.zip_code,
+                   clock.format_seconds(row.deadline), row.status,
+                   row.vehicle_id if row.vehicle_id is not None else '',
+                   clock.format_seconds(row.delivery_time)]
+
+
+def write_results(plan, query_times, package_ids, output_format, stream):
+    """
+    Streams status rows for every query time through a single writer.
+    Time Complexity: O(t * p) where t is number of times and p is number of packages
+
+    Args:
+        plan (DeliveryPlan): Precomputed delivery plan
+        query_times (iterable[int]): Query times in seconds since midnight
+        package_ids (list[int] | None): Packages to report (None for all)
+        output_format (str): 'jsonl' or 'csv'
+        stream (io.TextIOBase): Destination text stream
+    Returns:
+        int: Number of rows written
+    """
+    if package_ids is None:
+        package_ids = plan.parcel_ids
+
+    row_count = 0
+    if output_format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(OUTPUT_FIELDS)
+        for row in _rows(plan, query_times, package_ids):
+            writer.writerow(row)
+            row_count += 1
+    elif output_format == 'jsonl':
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        for row in _rows(plan, query_times, package_ids):
+            if row[8] == '':
+                row[8] = None
+            stream.write(encoder.encode(dict(zip(OUTPUT_FIELDS, row))))
+            stream.write('\n')
+            row_count += 1
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    return row_count
+
+
+def run_batch(plan, at_times, times_source, package_spec, output_format, output_path=None):
+    """
+    Entry point for non-interactive batch queries.
+    Time Complexity: O(t * p) where t is number of times and p is number of packages
+
+    Args:
+        plan (DeliveryPlan): Precomputed delivery plan
+        at_times (list[str]): Times given with --at
+        times_source (str): File of query times, '-' for stdin, or None
+        package_spec (str): Package selection such as '1-40' (None for all)
+        output_format (str): 'jsonl' or 'csv'
+        output_path (str): File to write to (None for stdout)
+    Returns:
+        int: Number of rows written
+    """
+    package_ids = parse_package_ranges(package_spec) if package_spec else None
+    query_times = read_query_times(at_times, times_source)
+
+    if output_path:
+        with open(output_path, 'w', newline='', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as stream:
+            return write_results(plan, query_times, package_ids, output_format, stream)
+
+    stream = io.TextIOWrapper(io.BufferedWriter(io.FileIO(sys.stdout.fileno(), 'w', closefd=False),
+                                                buffer_size=OUTPUT_BUFFER_SIZE),
+                              encoding='utf-8', newline='')
+    try:
+        sys.stdout.flush()
+        return write_results(plan, query_times, package_ids, output_format, stream)
+    finally:
+        stream.flush()
+        stream.detach()
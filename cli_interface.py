@@ -1,13 +1,20 @@
 import datetime
 import sys
+import clock
 import locations
 import parcels
+import table_renderer
 import van
 import shutil
 
 # get the terminal size
 terminal_width = shutil.get_terminal_size().columns
 
+# Package 9 address correction window (seconds since midnight)
+PARCEL_9_REROUTE_START = clock.parse_time("08:20")
+PARCEL_9_CORRECTION_TIME = clock.parse_time("10:20")
+BUSINESS_DAY_START = clock.parse_time("08:00")
+
 def handle_special_case_for_parcel_9(query_time=None):
     """
     Handles special status update for parcel 9 based on current or queried time.
@@ -16,19 +23,14 @@ def handle_special_case_for_parcel_9(query_time=None):
     try:
         package_9 = parcels.delivery_registry.locate_parcel(9)
         if package_9:
-            # Define time constraints
-            time_0800 = datetime.datetime.strptime("08:20", "%H:%M").time()
-            time_1020 = datetime.datetime.strptime("10:20", "%H:%M").time()
-           # time_1700 = datetime.datetime.strptime("17:00", "%H:%M").time()
-
             # Use current time if query_time is not provided
-            current_time = query_time if query_time else datetime.datetime.now().time()
+            current_time = clock.to_seconds(query_time) if query_time else clock.now_seconds()
 
             # Update address based on time constraints
-            if time_0800 <= current_time < time_1020:
+            if PARCEL_9_REROUTE_START <= current_time < PARCEL_9_CORRECTION_TIME:
                 package_9.destination = "300 State St"
                 package_9.dest_zip = "84103"
-            elif time_1020 <= current_time:
+            elif PARCEL_9_CORRECTION_TIME <= current_time:
                 package_9.destination = "410 S State St"
                 package_9.dest_zip = "84111"
 
@@ -42,30 +44,31 @@ def format_package_info(package, query_time=None):
     """
     # Initialize delivery prediction time based on van assignment
     predicted_time = "🦉"
-    if hasattr(package, 'delivery_time'):
-        predicted_time += f" {package.delivery_time.strftime('%I:%M %p')}"
+    if package.delivery_time is not None:
+        predicted_time += f" {clock.format_time(package.delivery_time)}"
 
     # Determine status
     status = "at hub"
     van = f"VAN: {str(package.assigned_vehicle)}" if package.assigned_vehicle else ""
 
     if query_time:
-        if package.start_time and query_time < package.start_time.time():
+        query_seconds = clock.to_seconds(query_time)
+        if package.start_time is not None and query_seconds < package.start_time:
             status = "at hub"
-        elif package.delivery_time and query_time >= package.delivery_time.time():
+        elif package.delivery_time is not None and query_seconds >= package.delivery_time:
             status = "delivered"
-            predicted_time = f"{package.delivery_time.strftime('%I:%M %p')}"
+            predicted_time = f"{clock.format_time(package.delivery_time)}"
         else:
             status = "en route"
 
     # Format deadline for display
-    deadline = (f"{package.deadline.strftime('%I:%M %p')}") if isinstance(package.deadline, datetime.datetime) else "04:59 PM"
+    deadline = clock.format_time(package.deadline) if package.deadline is not None else "04:59 PM"
 
     # Slice the 'destination' string to 25 characters
     destination_display = package.destination[:25]
 
-    # Split the 'special_instructions' string at '---' and select the first part
-    special_instructions = package.special_instructions.split('---')[0]
+    # Display text compiled once from 'special_instructions' (the part before '---')
+    special_instructions = parcels.delivery_constraints.note(package.tracking_id)
 
     # Fixed width formatting for clean table display
     return f"{str(package.tracking_id):<5} {destination_display:<30} {deadline:<20} {special_instructions:<35} {status:<15} {van:<10} {predicted_time:<20}"
@@ -215,27 +218,19 @@ def show_current_status():
           + "\033[0m")
     print("")
 
-    # Show package statuses
-    for i in range(1, 41):
-        try:
-            package = parcels.delivery_registry.locate_parcel(i)
-            if package:
-                print("\033[0;36m" + format_package_info(package, current_time) + "\033[0m")
-        except Exception as e:
-            print(f"\033[0;31;40mError retrieving package {i}: {str(e)}\033[0m")
+    # Show package statuses a page at a time
+    current_seconds = clock.to_seconds(current_time)
+    renderer = table_renderer.ParcelTableRenderer(table_renderer.registry_parcels())
+    table_renderer.browse(renderer, current_seconds, row_color="\033[0;36m")
 
     # Calculate and display total mileage
     distances = locations.import_distances()
     total_mileage = 0
-    # Strings for comparison
-    time_format = "%H:%M"
-    after_hours = datetime.datetime.strptime("17:00", time_format).time()
-    before_hours = datetime.datetime.strptime("08:00", time_format).time()
 
     for vehicle in van.fleet:
-        loc, miles = van.calculate_progress(current_time, vehicle, distances)
+        loc, miles = van.calculate_progress(current_seconds, vehicle, distances)
         total_mileage += miles
-    if current_time < before_hours:
+    if current_seconds < BUSINESS_DAY_START:
         print("\n\033[31;91;40m   NO MILEAGE TO REPORT | TIME OF QUERY IS OUTSIDE OF NORMAL BUSINESS HOURS   \033[0m")
     else:
         # Show van mileage
@@ -317,23 +312,19 @@ def check_all_packages_at_time():
     print("")
 
     # Update package statuses
-    parcels.update_status(query_time)
+    query_seconds = clock.to_seconds(query_time)
+    parcels.update_status(query_seconds)
 
-    # Display all package info
-    for i in range(1, 41):
-        try:
-            package = parcels.delivery_registry.locate_parcel(i)
-            if package:
-                print("\033[0;36;40m" + format_package_info(package, query_time) + "\033[0m")
-        except Exception as e:
-            print(f"\033[0;31;40mError retrieving package {i}: {str(e)}\033[0m")
+    # Display all package info a page at a time
+    renderer = table_renderer.ParcelTableRenderer(table_renderer.registry_parcels())
+    table_renderer.browse(renderer, query_seconds, row_color="\033[0;36;40m")
 
     # Show van mileage
     distances = locations.import_distances()
     total_mileage = 0
     print("\n\033[33;93;40m🦉 VAN MILEAGE 🚚 \033[0m")
     for vehicle in van.fleet:
-        loc, miles = van.calculate_progress(query_time, vehicle, distances)
+        loc, miles = van.calculate_progress(query_seconds, vehicle, distances)
         total_mileage += miles
         print(f"\033[0;36;40mVan {vehicle.id}: {miles:.1f} miles\033[0m")
     print(f"\033[33;93;40mTotal fleet mileage: {total_mileage:.1f} miles\033[0m")
@@ -0,0 +1,110 @@
+import datetime
+import re
+
+# All planning, verification, progress and status code works in integer seconds since
+# midnight. Conversion to datetime objects and display strings happens only at the edges.
+
+SECONDS_PER_HOUR = 3600
+END_OF_DAY = 17 * SECONDS_PER_HOUR
+
+_TIME_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([AaPp][Mm])?\s*$')
+
+
+def parse_time(text):
+    """
+    Parses 'HH:MM', 'HH:MM:SS' or 12-hour 'HH:MM am/pm' text into seconds since midnight.
+    Time Complexity: O(1)
+
+    Args:
+        text (str): Time of day
+    Returns:
+        int: Seconds since midnight
+    Raises:
+        ValueError: If text is not a valid time of day
+    """
+    match = _TIME_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid time value: {text}")
+    hour, minute = int(match.group(1)), int(match.group(2))
+    second = int(match.group(3) or 0)
+    meridiem = match.group(4)
+
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Invalid time value: {text}")
+        hour = hour % 12 + (12 if meridiem.lower() == 'pm' else 0)
+    if hour > 23 or minute > 59 or second > 59:
+        raise ValueError(f"Invalid time value: {text}")
+
+    return hour * SECONDS_PER_HOUR + minute * 60 + second
+
+
+def to_seconds(value):
+    """
+    Converts seconds, a datetime, a time or time text to integer seconds since midnight.
+    Time Complexity: O(1)
+
+    Args:
+        value (int | float | datetime.datetime | datetime.time | str): Time to convert
+    Returns:
+        int: Seconds since midnight
+    Raises:
+        ValueError: If value cannot be interpreted as a time of day
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid time value: {value}")
+    if isinstance(value, (int, float)):
+        return int(round(value))
+    if isinstance(value, datetime.datetime):
+        value = value.time()
+    if isinstance(value, datetime.time):
+        return value.hour * SECONDS_PER_HOUR + value.minute * 60 + value.second
+    if isinstance(value, str):
+        return parse_time(value)
+    raise ValueError(f"Invalid time value: {value}")
+
+
+def from_seconds(seconds):
+    """
+    Converts seconds since midnight to a datetime.time for display.
+    Time Complexity: O(1)
+    """
+    seconds = int(seconds) % (24 * SECONDS_PER_HOUR)
+    return datetime.time(seconds // SECONDS_PER_HOUR, seconds % SECONDS_PER_HOUR // 60, seconds % 60)
+
+
+def format_time(seconds, time_format='%I:%M %p'):
+    """
+    Formats seconds since midnight with a strftime pattern ('' for None).
+    Time Complexity: O(1)
+    """
+    if seconds is None:
+        return ''
+    return from_seconds(seconds).strftime(time_format)
+
+
+def format_seconds(seconds):
+    """
+    Formats seconds since midnight as 'HH:MM:SS' ('' for None).
+    Time Complexity: O(1)
+    """
+    if seconds is None:
+        return ''
+    whole = int(seconds)
+    return f"{whole // SECONDS_PER_HOUR:02d}:{whole % SECONDS_PER_HOUR // 60:02d}:{whole % 60:02d}"
+
+
+def now_seconds():
+    """
+    Current local wall-clock time in seconds since midnight.
+    Time Complexity: O(1)
+    """
+    return to_seconds(datetime.datetime.now().time())
+
+
+def travel_seconds(miles, speed):
+    """
+    Whole seconds needed to cover a distance at a constant speed in mph.
+    Time Complexity: O(1)
+    """
+    return int(round(miles / speed * SECONDS_PER_HOUR))
@@ -0,0 +1,229 @@
+import re
+
+import clock
+
+# Known corrections for parcels flagged 'Wrong address listed':
+# tracking ID -> (time the correct address is known, corrected street, corrected zip).
+# A flagged parcel without an entry stays unresolved rather than being sent anywhere.
+CORRECTED_ADDRESSES = {
+    9: ('10:20', '410 S State St', '84111'),
+}
+
+_PARTNERS_PATTERN = re.compile(r'Must be delivered with\s+(.*)', re.IGNORECASE)
+_DELAY_PATTERN = re.compile(r'(\d{1,2}:\d{2})(\s*[AaPp][Mm])?')
+_TRUCK_PATTERN = re.compile(r'Can only be on truck\s+(\d+)', re.IGNORECASE)
+
+
+class ParcelConstraints:
+    """
+    Typed constraints compiled once from a parcel's special instructions.
+    """
+
+    __slots__ = ('tracking_id', 'partners', 'available_time', 'truck', 'wrong_address',
+                 'address_change_time', 'corrected_address', 'note')
+
+    def __init__(self, tracking_id, partners=(), available_time=None, truck=None, wrong_address=False,
+                 address_change_time=None, corrected_address=None, note=''):
+        self.tracking_id = tracking_id
+        self.partners = partners  # Tracking IDs that must ride on the same vehicle
+        self.available_time = available_time  # Seconds since midnight the parcel reaches the hub
+        self.truck = truck  # Only vehicle allowed to carry the parcel
+        self.wrong_address = wrong_address
+        self.address_change_time = address_change_time  # Seconds since midnight
+        self.corrected_address = corrected_address  # (street, zip), None while the address is unresolved
+        self.note = note  # Display text (instructions before '---')
+
+    @property
+    def is_constrained(self):
+        """True if any constraint restricts how the parcel may be loaded"""
+        return bool(self.partners or self.available_time is not None or self.truck is not None
+                    or self.wrong_address)
+
+
+def compile_instructions(tracking_id, special_instructions):
+    """
+    Parses one parcel's special instructions into a ParcelConstraints record.
+    Time Complexity: O(k) where k is length of the instruction text
+
+    Args:
+        tracking_id (int): Package tracking identifier
+        special_instructions (str): Free-text instructions from the manifest
+    Returns:
+        ParcelConstraints: Compiled constraints
+    Raises:
+        ValueError: If an instruction is recognised but malformed
+    """
+    text = special_instructions or ''
+    constraint = ParcelConstraints(tracking_id, note=text.split('---')[0])
+    if not text:
+        return constraint
+
+    match = _PARTNERS_PATTERN.search(text)
+    if match:
+        constraint.partners = tuple(int(partner) for partner in re.findall(r'\d+', match.group(1)))
+
+    if 'Delayed' in text:
+        match = _DELAY_PATTERN.search(text)
+        if not match:
+            raise ValueError(f"Package {tracking_id}: delayed without an arrival time")
+        constraint.available_time = clock.parse_time(match.group(1) + (match.group(2) or ''))
+
+    match = _TRUCK_PATTERN.search(text)
+    if match:
+        constraint.truck = int(match.group(1))
+
+    if 'Wrong address' in text:
+        constraint.wrong_address = True
+        correction = CORRECTED_ADDRESSES.get(tracking_id)
+        if correction is not None:
+            change_time, street, zip_code = correction
+            constraint.address_change_time = clock.parse_time(change_time)
+            constraint.corrected_address = (street, zip_code)
+
+    return constraint
+
+
+class UnionFind:
+    """
+    Disjoint-set forest with path halving and union by size.
+    """
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, item):
+        """
+        Returns the representative of item's set, adding item if unseen.
+        Time Complexity: O(α(n)) amortized
+        """
+        parent = self.parent
+        if item not in parent:
+            parent[item] = item
+            self.size[item] = 1
+            return item
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first, second):
+        """
+        Merges the sets containing first and second.
+        Time Complexity: O(α(n)) amortized
+        """
+        root_a, root_b = self.find(first), self.find(second)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+
+class ConstraintSet:
+    """
+    Compiled constraints for a whole manifest with O(1) lookups.
+    Co-delivery groups are closed transitively with a union-find, so if 14 must go
+    with 15 and 16 must go with 15, then 14, 15 and 16 form one group.
+    """
+
+    EMPTY_GROUP = frozenset()
+
+    def __init__(self, compiled=()):
+        """
+        Indexes compiled ParcelConstraints and resolves co-delivery groups.
+        Time Complexity: O(n α(n)) where n is number of parcels
+        """
+        self.by_id = {}
+        self.groups = {}
+        self.truck_only = {}
+        self.available = {}
+        self.address_changes = {}
+        self.unresolved = set()
+
+        forest = UnionFind()
+        for constraint in compiled:
+            self.by_id[constraint.tracking_id] = constraint
+            for partner in constraint.partners:
+                forest.union(constraint.tracking_id, partner)
+            if constraint.truck is not None:
+                self.truck_only[constraint.tracking_id] = constraint.truck
+            if constraint.available_time is not None:
+                self.available[constraint.tracking_id] = constraint.available_time
+            if constraint.wrong_address and constraint.corrected_address is None:
+                self.unresolved.add(constraint.tracking_id)
+            elif constraint.wrong_address:
+                self.address_changes[constraint.tracking_id] = (
+                    constraint.address_change_time,) + constraint.corrected_address
+
+        members = {}
+        for item in forest.parent:
+            members.setdefault(forest.find(item), []).append(item)
+        for group in members.values():
+            frozen = frozenset(group)
+            for item in group:
+                self.groups[item] = frozen
+
+    def get(self, tracking_id):
+        """
+        Returns a parcel's compiled constraints (an empty record if unknown).
+        Time Complexity: O(1)
+        """
+        constraint = self.by_id.get(tracking_id)
+        return constraint if constraint is not None else ParcelConstraints(tracking_id)
+
+    def group_of(self, tracking_id):
+        """
+        Returns every parcel that must share a vehicle with this one (including itself),
+        or an empty set when the parcel has no co-delivery requirement.
+        Time Complexity: O(1)
+        """
+        return self.groups.get(tracking_id, self.EMPTY_GROUP)
+
+    def truck_for(self, tracking_id):
+        """Required vehicle ID or None. Time Complexity: O(1)"""
+        return self.truck_only.get(tracking_id)
+
+    def available_at(self, tracking_id):
+        """Earliest hub availability in seconds since midnight or None. Time Complexity: O(1)"""
+        return self.available.get(tracking_id)
+
+    def address_change(self, tracking_id):
+        """(change time, street, zip) or None. Time Complexity: O(1)"""
+        return self.address_changes.get(tracking_id)
+
+    def unresolved_addresses(self):
+        """
+        Parcels flagged with a wrong address that no known correction covers.
+        Time Complexity: O(u log u) where u is number of unresolved parcels
+        """
+        return sorted(self.unresolved)
+
+    def is_constrained(self, tracking_id):
+        """
+        True if the parcel has its own constraint or belongs to a co-delivery group.
+        Time Complexity: O(1)
+        """
+        constraint = self.by_id.get(tracking_id)
+        return (constraint is not None and constraint.is_constrained) or tracking_id in self.groups
+
+    def note(self, tracking_id):
+        """Display text for the parcel's instructions. Time Complexity: O(1)"""
+        constraint = self.by_id.get(tracking_id)
+        return constraint.note if constraint is not None else ''
+
+
+def compile_constraints(parcel_list):
+    """
+    Compiles every parcel's special instructions once.
+    Time Complexity: O(n) where n is number of parcels
+
+    Args:
+        parcel_list (iterable[Parcel]): Parcels to compile
+    Returns:
+        ConstraintSet: Indexed constraints for the manifest
+    """
+    return ConstraintSet(compile_instructions(parcel.tracking_id, parcel.special_instructions)
+                         for parcel in parcel_list)
@@ -0,0 +1,458 @@
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import constraints
+import locations as dist
+import parcels
+import plan
+import routing
+import scheduling
+import van
+
+# Parcels per trip, as DeliveryVehicle.max_cargo
+TRIP_CAPACITY = 16
+
+# Share of capacity targeted per cluster, leaving room for boundary repair
+TARGET_FILL = 0.9
+
+# Medoid updates consider at most this many members as candidates and as reference points
+MEDOID_SAMPLE = 64
+
+METHODS = ('kmedoids', 'sweep')
+
+
+def _leg(distances, a, b):
+    """Helper function returning the distance between two stops in either orientation"""
+    value = distances[a][b]
+    return distances[b][a] if value is None else value
+
+
+def stop_units(package_list, constraint_set=None):
+    """
+    Groups parcels into clustering units: parcels at the same stop share a unit, and
+    stops linked by a co-delivery group are merged so the group stays on one trip.
+    Time Complexity: O(p α(p)) where p is number of packages
+
+    Args:
+        package_list (list[Parcel]): Parcels to deliver
+        constraint_set (ConstraintSet): Compiled constraints (defaults to the loaded manifest)
+    Returns:
+        list[tuple]: (stops, demand, tracking IDs) for each unit, ordered by first stop
+    Raises:
+        ValueError: If a destination cannot be resolved
+    """
+    constraint_set = constraint_set if constraint_set is not None else parcels.delivery_constraints
+    forest = constraints.UnionFind()
+    stop_of = {}
+    for package in package_list:
+        stop = dist.get_location_index(package.destination)
+        stop_of[package.tracking_id] = stop
+        forest.find(stop)
+    for package in package_list:
+        for partner in constraint_set.group_of(package.tracking_id):
+            if partner in stop_of:
+                forest.union(stop_of[package.tracking_id], stop_of[partner])
+
+    units = {}
+    for package in package_list:
+        stop = stop_of[package.tracking_id]
+        stops, ids = units.setdefault(forest.find(stop), ([], []))
+        if stop not in stops:
+            stops.append(stop)
+        ids.append(package.tracking_id)
+    return sorted(((tuple(stops), len(ids), tuple(ids)) for stops, ids in units.values()),
+                  key=lambda unit: unit[0][0])
+
+
+def _medoid(members, units, distances):
+    """Helper function choosing the member stop with the least total distance to a sample of the others"""
+    if len(members) <= 2:
+        return units[members[0]][0][0]
+    step = max(1, len(members) // MEDOID_SAMPLE)
+    sample = [units[m][0][0] for m in members[::step]]
+    return min(sample, key=lambda candidate: sum(_leg(distances, candidate, other) for other in sample))
+
+
+def _two_medoids(members, units, distances, hub, refinements):
+    """Helper function seeding two far-apart medoids and refining them by alternating assignment"""
+    stop = lambda position: units[position][0][0]
+    first = stop(max(members, key=lambda p: _leg(distances, hub, stop(p))))
+    second = stop(max(members, key=lambda p: _leg(distances, first, stop(p))))
+    for _ in range(refinements):
+        near_first = [p for p in members if _leg(distances, first, stop(p)) <= _leg(distances, second, stop(p))]
+        near_second = [p for p in members if _leg(distances, first, stop(p)) > _leg(distances, second, stop(p))]
+        if not near_first or not near_second:
+            break
+        first, second = _medoid(near_first, units, distances), _medoid(near_second, units, distances)
+    return first, second
+
+
+def k_medoids(units, distances, hub, capacity=TRIP_CAPACITY, refinements=2):
+    """
+    Capacity-bounded clustering by recursive 2-medoid splits on the distance matrix.
+    Each split seeds two far-apart medoids, refines them, orders the units by which medoid
+    is closer and cuts so each side gets its share of the demand. Splitting stops once a
+    cluster fits one trip, so the number of clusters follows from the demand.
+    Time Complexity: O(u log u) distance lookups where u is number of units
+
+    Args:
+        units (list[tuple]): Units from stop_units()
+        distances (list[list[float]]): Distance matrix or DistanceOracle
+        hub (int): Location index of the hub
+        capacity (int): Parcels allowed per cluster
+        refinements (int): Medoid refinement rounds per split
+    Returns:
+        list[list[int]]: Unit positions in each cluster
+    """
+    target = capacity * TARGET_FILL
+    clusters = []
+    pending = [list(range(len(units)))]
+    while pending:
+        members = pending.pop()
+        demand = sum(units[p][1] for p in members)
+        parts = math.ceil(demand / target)
+        if parts <= 1 or len(members) == 1:
+            clusters.append(members)
+            continue
+
+        first, second = _two_medoids(members, units, distances, hub, refinements)
+        ordered = sorted(members, key=lambda p: (_leg(distances, first, units[p][0][0])
+                                                 - _leg(distances, second, units[p][0][0]), p))
+        share = demand * (parts // 2) / parts
+        cut, running = 0, 0
+        while cut < len(ordered) - 1 and running + units[ordered[cut]][1] <= share:
+            running += units[ordered[cut]][1]
+            cut += 1
+        cut = max(cut, 1)
+        pending.append(ordered[cut:])
+        pending.append(ordered[:cut])
+    return clusters
+
+
+def sweep_partition(units, oracle, hub, capacity=TRIP_CAPACITY):
+    """
+    Sweep clustering: orders units by bearing from the hub and cuts consecutive runs at capacity.
+    Needs coordinates, so distances must come from a DistanceOracle.
+    Time Complexity: O(u log u) where u is number of units
+
+    Raises:
+        ValueError: If the distance source has no coordinates
+    """
+    if not hasattr(oracle, 'latitudes'):
+        raise ValueError("Sweep clustering needs coordinates (use --coordinates or k-medoids)")
+    hub_lat, hub_lon = oracle.latitudes[hub], oracle.longitudes[hub]
+    scale = math.cos(math.radians(hub_lat))
+
+    def bearing(position):
+        stop = units[position][0][0]
+        return math.atan2(oracle.latitudes[stop] - hub_lat, (oracle.longitudes[stop] - hub_lon) * scale)
+
+    clusters, current, load = [], [], 0
+    for position in sorted(range(len(units)), key=bearing):
+        demand = units[position][1]
+        if current and load + demand > capacity:
+            clusters.append(current)
+            current, load = [], 0
+        current.append(position)
+        load += demand
+    if current:
+        clusters.append(current)
+    return clusters
+
+
+def solve_cluster(hub, stops, distances):
+    """
+    Routes one cluster as a closed tour from the hub. Pure function of its inputs so it
+    can run in a worker process.
+    Time Complexity: O(s³) per improvement pass where s is number of stops in the cluster
+
+    Returns:
+        list[int]: Route starting and ending at the hub
+    """
+    # Nearest-neighbour order gives the local search a good start
+    remaining = list(stops)
+    route = [hub]
+    while remaining:
+        following = min(remaining, key=lambda stop: (_leg(distances, route[-1], stop), stop))
+        remaining.remove(following)
+        route.append(following)
+    route.append(hub)
+    return routing._optimize_route(route, distances)
+
+
+def _nearest_stops(stops, distances, count):
+    """
+    Helper function listing the nearest other stops of every stop once: from the oracle's
+    spatial index when available, otherwise by one pass over each matrix row
+    """
+    oracle_neighbors = getattr(distances, 'nearest', None)
+    nearest = {}
+    for stop in stops:
+        if oracle_neighbors is not None:
+            nearest[stop] = oracle_neighbors(stop, count)
+        else:
+            nearest[stop] = heapq.nsmallest(count, (other for other in stops if other != stop),
+                                            key=lambda other: _leg(distances, stop, other))
+    return nearest
+
+
+def repair_boundaries(routes, distances, demand_of, capacity=TRIP_CAPACITY, locked=(), neighbor_count=8,
+                      max_passes=5):
+    """
+    Inter-route relocate moves: a stop moves next to one of its nearest stops on another
+    route when that saves miles and the receiving route has room. Only stops near other
+    clusters can move, so the work grows with the boundary rather than the whole instance.
+    Nearest stops are listed once up front and reused by every pass.
+    Time Complexity: O(n² log m + p * n * m * s) for p passes over n stops with m neighbours and
+        route length s (O(n * m log m) to list neighbours with a DistanceOracle)
+
+    Args:
+        routes (list[list[int]]): Closed routes (hub first and last), modified in place
+        distances (list[list[float]]): Distance matrix or DistanceOracle
+        demand_of (dict[int, int]): Parcels delivered at each stop
+        capacity (int): Parcels allowed per route
+        locked (set[int]): Stops that must stay on their route (co-delivery units)
+        neighbor_count (int): Nearest stops examined per stop
+        max_passes (int): Improvement passes
+    Returns:
+        float: Miles saved
+    """
+    route_of = {stop: r for r, route in enumerate(routes) for stop in route[1:-1]}
+    load = [sum(demand_of[stop] for stop in route[1:-1]) for route in routes]
+    all_stops = list(route_of)
+    nearest = _nearest_stops(all_stops, distances, neighbor_count)
+    saved = 0.0
+
+    for _ in range(max_passes):
+        improved = False
+        for stop in all_stops:
+            if stop in locked:
+                continue
+            source = route_of[stop]
+            route = routes[source]
+            position = route.index(stop)
+            before, after = route[position - 1], route[position + 1]
+            removal = (_leg(distances, before, stop) + _leg(distances, stop, after)
+                       - _leg(distances, before, after))
+
+            best = None
+            for neighbor in nearest[stop]:
+                target = route_of.get(neighbor)
+                if target is None or target == source or load[target] + demand_of[stop] > capacity:
+                    continue
+                other = routes[target]
+                at = other.index(neighbor)
+                for insert_at in (at, at + 1):
+                    a, b = other[insert_at - 1], other[insert_at]
+                    insertion = _leg(distances, a, stop) + _leg(distances, stop, b) - _leg(distances, a, b)
+                    if insertion < removal - 1e-9 and (best is None or insertion < best[0]):
+                        best = (insertion, target, insert_at)
+
+            if best is not None:
+                insertion, target, insert_at = best
+                del route[position]
+                routes[target].insert(insert_at, stop)
+                route_of[stop] = target
+                load[source] -= demand_of[stop]
+                load[target] += demand_of[stop]
+                saved += removal - insertion
+                improved = True
+        if not improved:
+            break
+    return saved
+
+
+def decompose_and_solve(hub, units, distances, method='kmedoids', capacity=TRIP_CAPACITY, workers=None):
+    """
+    Cluster-first, route-second: partitions units into capacity-bounded clusters, routes
+    every cluster independently (in parallel worker processes), then repairs the boundaries.
+    Time Complexity: O(u log u) clustering plus O(k * s³) routing spread over the workers,
+        so linear in the instance for a fixed cluster size
+
+    Args:
+        hub (int): Location index of the hub
+        units (list[tuple]): Units from stop_units()
+        distances (list[list[float]]): Distance matrix or DistanceOracle
+        method (str): 'kmedoids' or 'sweep'
+        capacity (int): Parcels allowed per route
+        workers (int): Worker processes (1 solves in this process)
+    Returns:
+        list[list[int]]: Closed routes, hub first and last
+    Raises:
+        ValueError: If the method is unknown or a unit exceeds capacity
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown decomposition method: {method}")
+    oversized = [ids for _, demand, ids in units if demand > capacity]
+    if oversized:
+        raise ValueError(f"Packages {oversized[0]} exceed one trip's capacity together")
+
+    if method == 'sweep':
+        clusters = sweep_partition(units, distances, hub, capacity)
+    else:
+        clusters = k_medoids(units, distances, hub, capacity)
+
+    stop_lists = [[stop for position in members for stop in units[position][0]] for members in clusters]
+    if workers == 1 or len(stop_lists) < 2:
+        routes = [solve_cluster(hub, stops, distances) for stops in stop_lists]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            routes = list(pool.map(solve_cluster, [hub] * len(stop_lists), stop_lists,
+                                   [distances] * len(stop_lists), chunksize=max(1, len(stop_lists) // 32)))
+
+    # A multi-stop unit counts its whole demand at its first stop and never moves
+    demand_of = {}
+    locked = set()
+    for stops, demand, _ in units:
+        demand_of.update(dict.fromkeys(stops, 0))
+        demand_of[stops[0]] = demand
+        if len(stops) > 1:
+            locked.update(stops)
+    repair_boundaries(routes, distances, demand_of, capacity, locked)
+
+    # Re-polish routes after the moves and drop any emptied by them
+    routes = [routing._greedy_improve(route, distances) if len(route) > 3 else route for route in routes]
+    return [route for route in routes if len(route) > 2]
+
+
+def _split_by_ready(tracking_ids, constraint_set):
+    """
+    Helper function splitting a unit's parcels by the time they can leave the hub.
+    Co-delivery partners share the latest ready time of their group so they stay together.
+    """
+    by_ready = {}
+    for tracking_id in tracking_ids:
+        group = constraint_set.group_of(tracking_id) or {tracking_id}
+        ready = scheduling.trip_ready_time(group, constraint_set)
+        by_ready.setdefault(ready, []).append(tracking_id)
+    return {ready: tuple(ids) for ready, ids in by_ready.items()}
+
+
+def plan_decomposed(method='kmedoids', workers=None, version=1, distances=None):
+    """
+    Plans the loaded manifest with cluster-first decomposition on the standard fleet's trucks.
+    Each cluster becomes one trip; the trip scheduler then assigns trucks, drivers and
+    departures (parcel availability included), and a truck may run several trips.
+    Truck-only parcels are clustered separately per truck so each of their trips can be
+    given that truck, and delayed or corrected parcels separately per ready time so they
+    never hold back a trip's deadline parcels.
+    Time Complexity: see decompose_and_solve()
+
+    Args:
+        method (str): 'kmedoids' or 'sweep'
+        workers (int): Worker processes for cluster routing
+        version (int): Plan version number
+        distances (list[list[float]]): Distance matrix (defaults to import_distances())
+    Returns:
+        DeliveryPlan: Snapshot of the decomposed plan, one vehicle per truck
+    Raises:
+        ValueError: If parcels at one stop must ride different trucks, or a required truck
+            is not in the fleet
+    """
+    if distances is None:
+        distances = dist.import_distances()
+    addresses = dist.import_addresses()
+    hub = addresses.index(routing.HUB_ADDRESS) if routing.HUB_ADDRESS in addresses else 0
+    truck_ids = tuple(vehicle.id for vehicle in van.fleet) or scheduling.DEFAULT_TRUCKS
+    manifest = parcels.read_parcels()
+    for package in manifest:
+        change = parcels.delivery_constraints.address_change(package.tracking_id)
+        if change is not None:
+            package.destination, package.dest_zip = change[1], change[2]
+
+    # Units are clustered apart per required truck and per ready time, so a trip never waits
+    # for a delayed or corrected parcel it does not carry. Parcels at one stop may split by
+    # ready time, so each group keeps its own stop -> packages map.
+    constraint_set = parcels.delivery_constraints
+    by_id = {package.tracking_id: package for package in manifest}
+    groups = {}
+    for unit in stop_units(manifest):
+        trucks = {constraint_set.truck_for(tracking_id) for tracking_id in unit[2]} - {None}
+        if len(trucks) > 1:
+            raise ValueError(f"Packages {unit[2]} share a stop but must ride trucks {sorted(trucks)}")
+        truck = trucks.pop() if trucks else 0
+        for ready, ids in _split_by_ready(unit[2], constraint_set).items():
+            stops = tuple(dict.fromkeys(dist.get_location_index(by_id[tracking_id].destination) for tracking_id in ids))
+            groups.setdefault((truck, ready), []).append((stops, len(ids), ids))
+
+    routes, route_trucks, route_packages = [], [], []
+    for (truck, _), group in sorted(groups.items()):
+        packages_at = {}
+        for stops, _, ids in group:
+            for tracking_id in ids:
+                package = by_id[tracking_id]
+                packages_at.setdefault(dist.get_location_index(package.destination), []).append(package)
+        for route in decompose_and_solve(hub, group, distances, method, workers=workers):
+            routes.append(route)
+            route_trucks.append(truck or None)
+            route_packages.append([package for stop in route[1:-1] for package in packages_at.get(stop, ())])
+
+    trips = []
+    for trip_id, shipments in enumerate(route_packages, start=1):
+        vehicle = van.DeliveryVehicle(trip_id, scheduling.DAY_START, 1)
+        vehicle.depot = hub
+        for package in shipments:
+            vehicle.shipments.append(package)
+            package.assigned_vehicle = trip_id
+        trips.append(vehicle)
+
+    required = {trip_id: truck for trip_id, truck in enumerate(route_trucks, start=1) if truck is not None}
+    final_routes, schedule = scheduling.schedule_fleet(trips, routes, distances, hub, truck_ids=truck_ids,
+                                                       required_trucks=required)
+    for vehicle, route in zip(trips, final_routes):
+        vehicle.route = route
+        routing._verify_delivery_times(vehicle, distances, addresses)
+    return _merge_trips(plan.build_plan(trips, distances, addresses, version=version), schedule)
+
+
+def late_parcels(delivery_plan):
+    """
+    Parcels the plan delivers after their deadline. Clustering minimizes miles and the
+    scheduler only orders whole trips, so a decomposed plan can still miss deadlines.
+    Time Complexity: O(n) where n is number of parcels
+
+    Returns:
+        list[int]: Tracking IDs delivered late, in tracking ID order
+    """
+    records = delivery_plan.parcels
+    return [tracking_id for tracking_id in delivery_plan.parcel_ids
+            if records[tracking_id].delivery_time is not None
+            and records[tracking_id].delivery_time > records[tracking_id].deadline]
+
+
+def _merge_trips(trip_plan, schedule):
+    """
+    Helper function turning a plan with one vehicle per trip into one vehicle per truck.
+    A truck's trips are joined in departure order; the hub appears twice between trips,
+    at the return and at the next departure, so the truck waits there without moving.
+    The timeline starts with the first trip's driver and records a driver change at the
+    departure of each later trip driven by someone else.
+    """
+    truck_of = {assignment.trip_id: assignment.truck_id for assignment in schedule.assignments}
+    by_truck = {}
+    for trip_id in sorted(trip_plan.vehicle_ids, key=lambda trip_id: (trip_plan.vehicles[trip_id].leave_time, trip_id)):
+        by_truck.setdefault(truck_of[trip_id], []).append(trip_plan.vehicles[trip_id])
+
+    timelines = {}
+    for truck, trip_timelines in by_truck.items():
+        route, arrivals, miles, shipments, driver_changes = [], [], [], [], []
+        for timeline in trip_timelines:
+            # A trip driven by someone else hands the truck over as it leaves the hub
+            driver = driver_changes[-1][1] if driver_changes else trip_timelines[0].operator
+            if timeline.operator != driver:
+                driver_changes.append((timeline.leave_time, timeline.operator))
+            offset = miles[-1] if miles else 0.0
+            route.extend(timeline.route)
+            arrivals.extend(timeline.arrival_times)
+            miles.extend(offset + distance for distance in timeline.cumulative_miles)
+            shipments.extend(timeline.shipments)
+        first = trip_timelines[0]
+        timelines[truck] = plan.VehicleTimeline(truck, first.operator, first.leave_time, first.speed, tuple(route),
+                                                tuple(arrivals), tuple(miles), tuple(shipments),
+                                                tuple(driver_changes))
+
+    records = {tracking_id: record._replace(vehicle_id=truck_of[record.vehicle_id])
+               if record.vehicle_id is not None else record
+               for tracking_id, record in trip_plan.parcels.items()}
+    return plan.DeliveryPlan(records, timelines, trip_plan.version)
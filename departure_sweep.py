@@ -0,0 +1,156 @@
+from collections import namedtuple
+
+import numpy as np
+
+import clock
+import locations as dist
+import parcels
+import scheduling
+import speed_profiles
+
+DEFAULT_WINDOW = (clock.parse_time('08:00'), clock.parse_time('12:00'))
+DEFAULT_STEP = 60
+
+DepartureOption = namedtuple('DepartureOption', ['vehicle_id', 'departure', 'min_slack', 'total_lateness',
+                                                 'late_count', 'completion', 'latest_on_time'])
+
+
+def delivery_positions(vehicle):
+    """
+    Route position at which each package on the vehicle is delivered.
+    A stop visited twice delivers at the later visit, as _verify_delivery_times does.
+    Time Complexity: O(n + p) where n is number of route points and p is number of packages
+
+    Args:
+        vehicle (DeliveryVehicle): Vehicle with a planned route
+    Returns:
+        tuple: (packages, positions array, deadlines array)
+    """
+    last_visit = {stop: position for position, stop in enumerate(vehicle.route) if position > 0}
+
+    packages, positions, deadlines = [], [], []
+    for package in vehicle.shipments:
+        try:
+            stop = dist.get_location_index(package.destination)
+        except ValueError:
+            continue
+        if stop in last_visit:
+            packages.append(package)
+            positions.append(last_visit[stop])
+            deadlines.append(package.deadline)
+
+    return packages, np.array(positions, dtype=np.int64), np.array(deadlines, dtype=np.int64)
+
+
+def sweep_departures(arrivals, positions, deadlines):
+    """
+    Evaluates every candidate departure time in one vectorized pass.
+    Time Complexity: O(c * p) arithmetic where c is number of candidates and p is number of packages
+
+    Args:
+        arrivals (numpy.ndarray): (c, n) arrival time at each route point for each candidate,
+            from speed_profiles.route_arrival_matrix()
+        positions (numpy.ndarray): Route position of each delivery
+        deadlines (numpy.ndarray): Deadline of each delivery in seconds since midnight
+    Returns:
+        dict: 'min_slack', 'total_lateness', 'late_count' and 'completion' arrays, one entry per candidate
+    """
+    completion = arrivals[:, -1]
+    if len(positions) == 0:
+        unlimited = np.full(len(arrivals), np.iinfo(np.int64).max)
+        zeros = np.zeros(len(arrivals), dtype=np.int64)
+        return {'min_slack': unlimited, 'total_lateness': zeros, 'late_count': zeros, 'completion': completion}
+
+    # slack[c, p] = deadline of package p - its arrival when leaving at candidate c
+    slack = deadlines[None, :] - arrivals[:, positions]
+    lateness = np.maximum(-slack, 0)
+    return {
+        'min_slack': slack.min(axis=1),
+        'total_lateness': lateness.sum(axis=1),
+        'late_count': (slack < 0).sum(axis=1),
+        'completion': completion,
+    }
+
+
+def _best_option(vehicle_id, candidates, results):
+    """Helper function picking the candidate with the largest worst-case slack, earliest on ties"""
+    # lexsort uses the last key as primary: most slack, then least lateness, then earliest departure
+    order = np.lexsort((candidates, results['total_lateness'], -results['min_slack']))
+    best = int(order[0])
+    on_time = np.nonzero(results['late_count'] == 0)[0]
+    latest_on_time = int(candidates[on_time[-1]]) if len(on_time) else None
+    return DepartureOption(vehicle_id, int(candidates[best]), int(results['min_slack'][best]),
+                           int(results['total_lateness'][best]), int(results['late_count'][best]),
+                           int(results['completion'][best]), latest_on_time)
+
+
+def recommend_departures(fleet, distances, window=DEFAULT_WINDOW, step=DEFAULT_STEP, constraint_set=None):
+    """
+    Recommends a departure time per vehicle for the already planned routes.
+    Candidates run from the window start to its end every step seconds, but never before
+    the vehicle's parcels are ready or its driver is back from an earlier vehicle.
+    Vehicles are considered in their current departure order.
+    Arrival times follow each vehicle's speed profile when it has one.
+    Time Complexity: O(v * c * (n + p)) arithmetic where c is number of candidates per vehicle
+
+    Args:
+        fleet (list[DeliveryVehicle]): Vehicles with planned routes
+        distances (list[list[float]]): Distance matrix
+        window (tuple[int, int]): First and last candidate departure in seconds since midnight
+        step (int): Seconds between candidates
+        constraint_set (ConstraintSet): Compiled constraints (defaults to the loaded manifest)
+    Returns:
+        list[DepartureOption]: One recommendation per vehicle in fleet order
+    """
+    constraint_set = constraint_set if constraint_set is not None else parcels.delivery_constraints
+    window_start, window_end = window
+    driver_free = {}
+    options = {}
+
+    for vehicle in sorted(fleet, key=lambda v: (v.leave_time, v.id)):
+        _, positions, deadlines = delivery_positions(vehicle)
+        earliest = max(window_start, driver_free.get(vehicle.operator, window_start),
+                       scheduling.trip_ready_time((p.tracking_id for p in vehicle.shipments),
+                                                  constraint_set, window_start))
+        candidates = np.arange(earliest, max(earliest, window_end) + 1, step, dtype=np.int64)
+        arrivals = speed_profiles.route_arrival_matrix(candidates, vehicle.route, distances, vehicle.speed,
+                                                       vehicle.speed_profile)
+        option = _best_option(vehicle.id, candidates, sweep_departures(arrivals, positions, deadlines))
+        options[vehicle.id] = option
+        driver_free[vehicle.operator] = option.completion
+
+    return [options[vehicle.id] for vehicle in fleet]
+
+
+def apply_departures(fleet, distances, options):
+    """
+    Moves each vehicle to its recommended departure and shifts its delivery times to match.
+    Time Complexity: O(n + p) per vehicle
+    """
+    by_vehicle = {option.vehicle_id: option for option in options}
+    for vehicle in fleet:
+        option = by_vehicle.get(vehicle.id)
+        if option is None:
+            continue
+        vehicle.leave_time = option.departure
+        packages, positions, _ = delivery_positions(vehicle)
+        arrival_times, _ = speed_profiles.route_arrival_times(vehicle.route, distances, vehicle.leave_time,
+                                                             vehicle.speed, vehicle.speed_profile)
+        for package in vehicle.shipments:
+            package.start_time = option.departure
+        for package, position in zip(packages, positions.tolist()):
+            package.delivery_time = arrival_times[position]
+
+
+if __name__ == "__main__":
+    import routing
+    import van
+
+    routing.coordinate_deliveries()
+    route_distances = dist.import_distances()
+    for current, option in zip(van.fleet, recommend_departures(van.fleet, route_distances)):
+        latest = clock.format_seconds(option.latest_on_time) or 'none'
+        print(f"Vehicle {option.vehicle_id}: planned {clock.format_seconds(current.leave_time)}, "
+              f"recommended {clock.format_seconds(option.departure)} "
+              f"(worst slack {option.min_slack // 60} min, {option.late_count} late, "
+              f"done {clock.format_seconds(option.completion)}, latest on-time departure {latest})")
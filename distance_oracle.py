@@ -0,0 +1,257 @@
+import csv
+import heapq
+import math
+from collections import OrderedDict
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Straight-line miles are multiplied by this to approximate road miles
+DEFAULT_ROAD_FACTOR = 1.3
+
+DEFAULT_CACHE_SIZE = 100000
+
+
+def haversine_miles(lat_a, lon_a, lat_b, lon_b):
+    """
+    Great-circle distance between two points in degrees.
+    Time Complexity: O(1)
+    """
+    phi_a, phi_b = math.radians(lat_a), math.radians(lat_b)
+    d_phi = phi_b - phi_a
+    d_lambda = math.radians(lon_b - lon_a)
+    h = math.sin(d_phi / 2) ** 2 + math.cos(phi_a) * math.cos(phi_b) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(h)))
+
+
+def load_coordinates(path):
+    """
+    Reads address,latitude,longitude rows (a header row and '#' comments are skipped).
+    Time Complexity: O(n) where n is number of locations
+
+    Args:
+        path (str): Coordinate CSV
+    Returns:
+        tuple: (addresses, latitudes, longitudes) as parallel lists
+    Raises:
+        FileNotFoundError: If the file is missing
+        ValueError: If a row is malformed
+    """
+    addresses, latitudes, longitudes = [], [], []
+    with open(path, newline='') as coordinate_data:
+        for row in csv.reader(coordinate_data):
+            if not row or row[0].strip().startswith('#') or row[0].strip().lower() == 'address':
+                continue
+            try:
+                latitude, longitude = float(row[1]), float(row[2])
+            except (IndexError, ValueError):
+                raise ValueError(f"Invalid coordinate row: {row}")
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValueError(f"Coordinates out of range: {row}")
+            addresses.append(row[0].strip())
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+    return addresses, latitudes, longitudes
+
+
+class _OracleRow:
+    """
+    Row view computing distances on demand.
+    Supports row[col] exactly like a row of the list-of-lists matrix.
+    """
+
+    __slots__ = ('_oracle', '_row')
+
+    def __init__(self, oracle, row):
+        self._oracle = oracle
+        self._row = row
+
+    def __len__(self):
+        return len(self._oracle)
+
+    def __getitem__(self, col):
+        return self._oracle.distance(self._row, col)
+
+
+class GridIndex:
+    """
+    Uniform grid over locations projected to flat miles, for nearest-neighbour queries.
+    Cells are sized for about two locations each, so a query inspects a few rings of cells.
+    """
+
+    def __init__(self, latitudes, longitudes, points_per_cell=2.0):
+        """
+        Buckets every location into its grid cell.
+        Time Complexity: O(n)
+        """
+        count = len(latitudes)
+        mid_latitude = math.radians(sum(latitudes) / count) if count else 0.0
+        scale = EARTH_RADIUS_MILES * math.pi / 180
+        self.xs = [scale * lon * math.cos(mid_latitude) for lon in longitudes]
+        self.ys = [scale * lat for lat in latitudes]
+
+        width = (max(self.xs) - min(self.xs)) if count else 0.0
+        height = (max(self.ys) - min(self.ys)) if count else 0.0
+        area = max(width * height, 1e-9)
+        self.cell = max(math.sqrt(area * points_per_cell / max(count, 1)), 1e-6)
+        self.min_x = min(self.xs) if count else 0.0
+        self.min_y = min(self.ys) if count else 0.0
+        self.cells = {}
+        for index in range(count):
+            self.cells.setdefault(self._cell_of(self.xs[index], self.ys[index]), []).append(index)
+        self.max_ring = int(max(width, height) / self.cell) + 1
+
+    def _cell_of(self, x, y):
+        return int((x - self.min_x) // self.cell), int((y - self.min_y) // self.cell)
+
+    def _ring(self, center, radius):
+        """Helper function yielding the cells on the square ring at the given radius"""
+        cx, cy = center
+        if radius == 0:
+            yield center
+            return
+        for dx in range(-radius, radius + 1):
+            yield cx + dx, cy - radius
+            yield cx + dx, cy + radius
+        for dy in range(-radius + 1, radius):
+            yield cx - radius, cy + dy
+            yield cx + radius, cy + dy
+
+    def nearest(self, index, k):
+        """
+        The k locations closest to a location in projected distance (excluding itself).
+        Rings grow until the next ring cannot hold anything closer than the current k-th best.
+        Time Complexity: O(k log k) typical for evenly spread locations
+
+        Returns:
+            list[int]: Location indices, closest first
+        """
+        x, y = self.xs[index], self.ys[index]
+        center = self._cell_of(x, y)
+        best = []  # Max-heap of (-squared distance, index) holding the k closest so far
+        for radius in range(self.max_ring + 1):
+            for cell in self._ring(center, radius):
+                for other in self.cells.get(cell, ()):
+                    if other == index:
+                        continue
+                    squared = (self.xs[other] - x) ** 2 + (self.ys[other] - y) ** 2
+                    if len(best) < k:
+                        heapq.heappush(best, (-squared, other))
+                    elif squared < -best[0][0]:
+                        heapq.heapreplace(best, (-squared, other))
+            # Anything unseen lies at least radius cells away from the query
+            if len(best) == k and (radius * self.cell) ** 2 >= -best[0][0]:
+                break
+        return [other for _, other in sorted(best, key=lambda entry: (-entry[0], entry[1]))]
+
+
+class DistanceOracle:
+    """
+    Distances computed on demand from coordinates instead of a stored n x n table.
+    Indexing (oracle[a][b], len(oracle)) matches the list-of-lists matrix, so routing,
+    timing and plan code accept it unchanged. Recently used pairs are kept in an LRU cache.
+    """
+
+    def __init__(self, addresses, latitudes, longitudes, road_factor=DEFAULT_ROAD_FACTOR,
+                 cache_size=DEFAULT_CACHE_SIZE, precision=None):
+        """
+        Initializes the oracle. Nothing proportional to n² is built.
+        Time Complexity: O(n)
+
+        Args:
+            addresses (list[str]): Address of each location
+            latitudes (list[float]): Latitude of each location in degrees
+            longitudes (list[float]): Longitude of each location in degrees
+            road_factor (float): Multiplier from straight-line to road miles
+            cache_size (int): Pairs kept in the LRU cache (0 disables caching)
+            precision (int): Decimal places distances are rounded to (None keeps full precision)
+        """
+        if not len(addresses) == len(latitudes) == len(longitudes):
+            raise ValueError("Addresses and coordinates must have the same length")
+        self.addresses = list(addresses)
+        self.latitudes = list(latitudes)
+        self.longitudes = list(longitudes)
+        self.road_factor = road_factor
+        self.cache_size = cache_size
+        self.precision = precision
+        self.source = None  # File the coordinates were read from
+        self._cache = OrderedDict()
+        self._index = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_file(cls, path, **options):
+        """
+        Builds an oracle from an address,latitude,longitude CSV.
+        Time Complexity: O(n)
+        """
+        oracle = cls(*load_coordinates(path), **options)
+        oracle.source = path
+        return oracle
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __getitem__(self, row):
+        if not 0 <= row < len(self.addresses):
+            raise IndexError(f"Invalid location index: {row}")
+        return _OracleRow(self, row)
+
+    def __iter__(self):
+        for row in range(len(self.addresses)):
+            yield _OracleRow(self, row)
+
+    def distance(self, a, b):
+        """
+        Road-factor distance between two locations, cached symmetrically.
+        Time Complexity: O(1)
+
+        Raises:
+            IndexError: If an index is out of range
+        """
+        if not (0 <= a < len(self.addresses) and 0 <= b < len(self.addresses)):
+            raise IndexError(f"Invalid location index: {a if not 0 <= a < len(self.addresses) else b}")
+        if a == b:
+            return 0.0
+        key = (a, b) if a < b else (b, a)
+        cache = self._cache
+        value = cache.get(key)
+        if value is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = self.road_factor * haversine_miles(self.latitudes[a], self.longitudes[a],
+                                                   self.latitudes[b], self.longitudes[b])
+        if self.precision is not None:
+            value = round(value, self.precision)
+        if self.cache_size:
+            cache[key] = value
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return value
+
+    def nearest(self, index, k=8):
+        """
+        The k locations nearest to a location, closest first by oracle distance.
+        The grid index is built on first use.
+        Time Complexity: O(k log k) typical after an O(n) build
+
+        Args:
+            index (int): Location index
+            k (int): Number of neighbours
+        Returns:
+            list[int]: Neighbouring location indices
+        """
+        if self._index is None:
+            self._index = GridIndex(self.latitudes, self.longitudes)
+        k = min(k, len(self.addresses) - 1)
+        if k <= 0:
+            return []
+        candidates = self._index.nearest(index, k)
+        return sorted(candidates, key=lambda other: (self.distance(index, other), other))
+
+    def cache_info(self):
+        """Cache statistics as a dict. Time Complexity: O(1)"""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'capacity': self.cache_size}
@@ -0,0 +1,364 @@
+import bisect
+import os
+import struct
+import zlib
+from collections import namedtuple
+
+import clock
+
+LOG_MAGIC = b'WGEVLOG1'
+INDEX_MAGIC = b'WGEVIDX1'
+
+# Events between state checkpoints; bounds the replay behind every state_at() query
+DEFAULT_CHECKPOINT_INTERVAL = 256
+
+REGISTERED = 0
+LOADED = 1
+DEPARTED = 2
+ARRIVED = 3
+DELIVERED = 4
+ADDRESS_CHANGED = 5
+FINISHED = 6
+
+KIND_NAMES = {REGISTERED: 'registered', LOADED: 'loaded', DEPARTED: 'departed', ARRIVED: 'arrived',
+              DELIVERED: 'delivered', ADDRESS_CHANGED: 'address changed', FINISHED: 'finished'}
+
+# sequence, time, kind, pad, vehicle, parcel, location, miles, payload length; then payload and CRC32
+_RECORD = struct.Struct('<IiBxHiidH')
+_CRC = struct.Struct('<I')
+_INDEX_HEADER = struct.Struct('<QQ')
+_INDEX_ENTRY = struct.Struct('<iIQ')
+
+Event = namedtuple('Event', ['sequence', 'time', 'kind', 'vehicle_id', 'tracking_id', 'location', 'miles',
+                             'payload'])
+
+ParcelState = namedtuple('ParcelState', ['tracking_id', 'status', 'vehicle_id', 'destination', 'zip_code',
+                                         'start_time', 'delivery_time'])
+
+VehicleState = namedtuple('VehicleState', ['vehicle_id', 'status', 'location', 'miles', 'departure',
+                                           'cargo'])
+
+LogState = namedtuple('LogState', ['time', 'parcels', 'vehicles'])
+
+
+def _encode(event):
+    """Helper function packing an event into its on-disk record"""
+    payload = event.payload.encode('utf-8')
+    body = _RECORD.pack(event.sequence, event.time, event.kind, event.vehicle_id, event.tracking_id,
+                        event.location, event.miles, len(payload)) + payload
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def _apply(parcel_states, vehicle_states, event):
+    """
+    Helper function applying one event to the replay state in place.
+    Time Complexity: O(c) for departures where c is the vehicle's cargo, O(1) otherwise
+    """
+    kind = event.kind
+    if kind == REGISTERED:
+        destination, _, zip_code = event.payload.partition('\t')
+        parcel_states[event.tracking_id] = ParcelState(event.tracking_id, 'at hub', None, destination, zip_code,
+                                                       None, None)
+    elif kind == LOADED:
+        parcel = parcel_states[event.tracking_id]
+        parcel_states[event.tracking_id] = parcel._replace(vehicle_id=event.vehicle_id)
+        vehicle = vehicle_states.get(event.vehicle_id) or VehicleState(event.vehicle_id, 'at hub', event.location,
+                                                                       0.0, None, ())
+        vehicle_states[event.vehicle_id] = vehicle._replace(cargo=vehicle.cargo + (event.tracking_id,))
+    elif kind == DEPARTED:
+        vehicle = vehicle_states[event.vehicle_id]
+        vehicle_states[event.vehicle_id] = vehicle._replace(status='en route', departure=event.time)
+        for tracking_id in vehicle.cargo:
+            parcel = parcel_states[tracking_id]
+            if parcel.vehicle_id == event.vehicle_id and parcel.status == 'at hub':
+                parcel_states[tracking_id] = parcel._replace(status='en route', start_time=event.time)
+    elif kind == ARRIVED:
+        vehicle = vehicle_states[event.vehicle_id]
+        vehicle_states[event.vehicle_id] = vehicle._replace(location=event.location, miles=event.miles)
+    elif kind == DELIVERED:
+        parcel = parcel_states[event.tracking_id]
+        parcel_states[event.tracking_id] = parcel._replace(status='delivered', delivery_time=event.time)
+    elif kind == ADDRESS_CHANGED:
+        destination, _, zip_code = event.payload.partition('\t')
+        parcel = parcel_states[event.tracking_id]
+        parcel_states[event.tracking_id] = parcel._replace(destination=destination, zip_code=zip_code)
+    elif kind == FINISHED:
+        vehicle = vehicle_states[event.vehicle_id]
+        vehicle_states[event.vehicle_id] = vehicle._replace(status='completed deliveries', location=event.location,
+                                                            miles=event.miles)
+
+
+class EventLog:
+    """
+    Append-only binary log of planning and delivery events.
+    Records are fixed-size headers plus a short text payload and a CRC, written in
+    arrival order; an in-memory index keeps them sorted by (time, sequence). Replay state
+    is checkpointed every checkpoint_interval events in time order, so state_at() is a
+    binary search plus at most checkpoint_interval record reads.
+    The index is saved beside the log on flush; reopening loads it and scans only the
+    records written after it, discarding a torn final record left by a crash.
+    """
+
+    def __init__(self, path, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Opens or creates a log and recovers its index.
+        Time Complexity: O(r) where r is number of records not covered by the saved index
+
+        Args:
+            path (str): Log file path (the index is stored at path + '.idx')
+            checkpoint_interval (int): Events between replay checkpoints
+        Raises:
+            ValueError: If the file exists but is not an event log
+        """
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.checkpoint_interval = max(int(checkpoint_interval), 1)
+        self._keys = []  # (time, sequence) in time order
+        self._offsets = []  # File offset of each record, parallel to _keys
+        self._checkpoints = [({}, {})]  # State after the first i * interval events in time order
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as log_file:
+                log_file.write(LOG_MAGIC)
+        self._file = open(path, 'r+b')
+        if self._file.read(len(LOG_MAGIC)) != LOG_MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not an event log")
+        self._recover()
+        self.next_sequence = 1 + max((sequence for _, sequence in self._keys), default=-1)
+
+    def _load_index(self):
+        """Helper function loading the saved index; returns the log length it covers"""
+        try:
+            with open(self.index_path, 'rb') as index_file:
+                if index_file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return len(LOG_MAGIC)
+                covered, count = _INDEX_HEADER.unpack(index_file.read(_INDEX_HEADER.size))
+                data = index_file.read(count * _INDEX_ENTRY.size)
+        except (OSError, struct.error):
+            return len(LOG_MAGIC)
+        if len(data) != count * _INDEX_ENTRY.size or covered > os.path.getsize(self.path):
+            return len(LOG_MAGIC)
+        for time, sequence, offset in _INDEX_ENTRY.iter_unpack(data):
+            self._keys.append((time, sequence))
+            self._offsets.append(offset)
+        return covered
+
+    def _recover(self):
+        """
+        Helper function rebuilding the index from the saved copy plus a scan of newer records.
+        A record that is incomplete or fails its CRC ends the log and is truncated away.
+        """
+        offset = self._load_index()
+        self._file.seek(offset)
+        while True:
+            event, size = self._read_record()
+            if event is None:
+                break
+            self._insert((event.time, event.sequence), offset)
+            offset += size
+        self._file.seek(offset)
+        self._file.truncate()
+        self._file.flush()
+
+    def _read_record(self):
+        """Helper function reading the record at the file position; returns (event, size) or (None, 0)"""
+        header = self._file.read(_RECORD.size)
+        if len(header) < _RECORD.size:
+            return None, 0
+        fields = _RECORD.unpack(header)
+        payload = self._file.read(fields[-1])
+        crc = self._file.read(_CRC.size)
+        if len(payload) < fields[-1] or len(crc) < _CRC.size or \
+                _CRC.unpack(crc)[0] != zlib.crc32(header + payload):
+            return None, 0
+        return Event(*fields[:-1], payload.decode('utf-8')), _RECORD.size + len(payload) + _CRC.size
+
+    def _insert(self, key, offset):
+        """Helper function adding a record to the time index, dropping checkpoints it invalidates"""
+        if not self._keys or key >= self._keys[-1]:
+            self._keys.append(key)
+            self._offsets.append(offset)
+            position = len(self._keys) - 1
+        else:
+            position = bisect.bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._offsets.insert(position, offset)
+        # Checkpoint i covers events [0, i * interval); any at or after the new position is stale
+        del self._checkpoints[position // self.checkpoint_interval + 1:]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, time, kind, vehicle_id=0, tracking_id=0, location=-1, miles=0.0, payload=''):
+        """
+        Appends one event. Events may arrive out of time order; the index places them.
+        Time Complexity: O(1) for in-order events, O(r) worst case for late ones
+
+        Args:
+            time (int): Event time in seconds since midnight
+            kind (int): Event kind (REGISTERED, LOADED, ...)
+            vehicle_id (int): Vehicle involved (0 when none)
+            tracking_id (int): Parcel involved (0 when none)
+            location (int): Location index (-1 when none)
+            miles (float): Vehicle odometer for ARRIVED and FINISHED events
+            payload (str): 'street<TAB>zip' for REGISTERED and ADDRESS_CHANGED events
+        Returns:
+            Event: The recorded event
+        Raises:
+            ValueError: If kind is unknown
+        """
+        if kind not in KIND_NAMES:
+            raise ValueError(f"Unknown event kind: {kind}")
+        event = Event(self.next_sequence, int(time), kind, vehicle_id, tracking_id, location, float(miles),
+                      payload)
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(_encode(event))
+        self.next_sequence += 1
+        self._insert((event.time, event.sequence), offset)
+        return event
+
+    def _event_at(self, position):
+        """Helper function reading the event at a position in time order"""
+        self._file.seek(self._offsets[position])
+        return self._read_record()[0]
+
+    def events(self, start=None, end=None):
+        """
+        Yields events with start <= time <= end in time order.
+        Time Complexity: O(log r + m) where m is number of events yielded
+
+        Args:
+            start (int): Earliest event time (None for the beginning)
+            end (int): Latest event time (None for the end)
+        """
+        first = 0 if start is None else bisect.bisect_left(self._keys, (start, -1))
+        last = len(self._keys) if end is None else bisect.bisect_right(self._keys, (end, float('inf')))
+        for position in range(first, last):
+            yield self._event_at(position)
+
+    def _checkpoint(self, number):
+        """Helper function returning checkpoint number, replaying forward from the last one built"""
+        while len(self._checkpoints) <= number:
+            built = len(self._checkpoints) - 1
+            parcel_states, vehicle_states = (dict(part) for part in self._checkpoints[built])
+            start = built * self.checkpoint_interval
+            for position in range(start, start + self.checkpoint_interval):
+                _apply(parcel_states, vehicle_states, self._event_at(position))
+            self._checkpoints.append((parcel_states, vehicle_states))
+        return self._checkpoints[number]
+
+    def state_at(self, time):
+        """
+        Parcel and vehicle state after every event at or before the given time.
+        Time Complexity: O(log r + I + p + v) where I is the checkpoint interval, once checkpoints exist
+
+        Args:
+            time (int): Query time in seconds since midnight
+        Returns:
+            LogState: Time plus mappings of tracking ID -> ParcelState and vehicle ID -> VehicleState
+        """
+        count = bisect.bisect_right(self._keys, (time, float('inf')))
+        number = count // self.checkpoint_interval
+        parcel_states, vehicle_states = (dict(part) for part in self._checkpoint(number))
+        for position in range(number * self.checkpoint_interval, count):
+            _apply(parcel_states, vehicle_states, self._event_at(position))
+        return LogState(time, parcel_states, vehicle_states)
+
+    def flush(self, sync=False):
+        """
+        Flushes appended records and saves the index so the next open skips the scan.
+        Time Complexity: O(r)
+
+        Args:
+            sync (bool): Also fsync the log before saving the index
+        """
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        covered = self._file.seek(0, os.SEEK_END)
+        temporary = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as index_file:
+            index_file.write(INDEX_MAGIC + _INDEX_HEADER.pack(covered, len(self._keys)))
+            index_file.write(b''.join(_INDEX_ENTRY.pack(time, sequence, offset)
+                                      for (time, sequence), offset in zip(self._keys, self._offsets)))
+        os.replace(temporary, self.index_path)
+
+    def close(self):
+        """Flushes and closes the log. Time Complexity: O(r)"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def record_plan(log, delivery_plan, start_of_day=0):
+    """
+    Writes the events of a DeliveryPlan: registration of every parcel, loading, departures,
+    stop arrivals, deliveries, address corrections and route completion.
+    Time Complexity: O(p + n) where p is number of parcels and n is number of route points
+
+    Args:
+        log (EventLog): Log to append to
+        delivery_plan (DeliveryPlan): Plan to record
+        start_of_day (int): Time parcels are registered at
+    Returns:
+        int: Number of events written
+    """
+    written = len(log)
+    for tracking_id in delivery_plan.parcel_ids:
+        record = delivery_plan.parcels[tracking_id]
+        log.append(start_of_day, REGISTERED, tracking_id=tracking_id,
+                   payload=f"{record.destination}\t{record.zip_code}")
+        for change_time, street, zip_code in record.address_changes:
+            log.append(change_time, ADDRESS_CHANGED, tracking_id=tracking_id, payload=f"{street}\t{zip_code}")
+
+    for vehicle_id in delivery_plan.vehicle_ids:
+        timeline = delivery_plan.vehicles[vehicle_id]
+        hub = timeline.route[0] if timeline.route else -1
+        # Records are authoritative for which vehicle carries a parcel loaded on two trucks
+        cargo = [tracking_id for tracking_id in sorted(set(timeline.shipments))
+                 if delivery_plan.parcels[tracking_id].vehicle_id == vehicle_id]
+        for tracking_id in cargo:
+            log.append(timeline.leave_time, LOADED, vehicle_id, tracking_id, hub)
+        if len(timeline.route) < 2:
+            continue
+        log.append(timeline.leave_time, DEPARTED, vehicle_id, location=hub)
+        for stop, arrival, miles in zip(timeline.route[1:], timeline.arrival_times[1:],
+                                        timeline.cumulative_miles[1:]):
+            log.append(arrival, ARRIVED, vehicle_id, location=stop, miles=miles)
+        for tracking_id in cargo:
+            delivery_time = delivery_plan.parcels[tracking_id].delivery_time
+            if delivery_time is not None:
+                log.append(delivery_time, DELIVERED, vehicle_id, tracking_id)
+        log.append(timeline.arrival_times[-1], FINISHED, vehicle_id, location=timeline.route[-1],
+                   miles=timeline.cumulative_miles[-1])
+    return len(log) - written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import plan
+
+    parser = argparse.ArgumentParser(description="Record the day's plan to an event log and replay it")
+    parser.add_argument("path", help="event log file (created and filled from a fresh plan if missing)")
+    parser.add_argument("--at", action="append", default=[], metavar="TIME", help="time to replay to")
+    arguments = parser.parse_args()
+
+    with EventLog(arguments.path) as event_log:
+        if not len(event_log):
+            print(f"Recorded {record_plan(event_log, plan.plan_deliveries())} events to {arguments.path}")
+        for text in arguments.at or ['17:00']:
+            state = event_log.state_at(clock.parse_time(text))
+            delivered = sum(parcel.status == 'delivered' for parcel in state.parcels.values())
+            en_route = sum(parcel.status == 'en route' for parcel in state.parcels.values())
+            miles = sum(vehicle.miles for vehicle in state.vehicles.values())
+            print(f"{clock.format_seconds(state.time)}: {delivered} delivered, {en_route} en route, "
+                  f"{len(state.parcels) - delivered - en_route} at hub, {miles:.1f} miles at last stops")
@@ -0,0 +1,190 @@
+import sys
+from collections import namedtuple
+
+import clock
+import locations as dist
+import parcels
+import plan
+import van
+
+Violation = namedtuple('Violation', ['kind', 'tracking_id', 'vehicle_id', 'detail'])
+
+FeasibilityReport = namedtuple('FeasibilityReport', [
+    'feasible', 'violations', 'counts', 'parcels_checked', 'stops_checked'
+])
+
+# Violation kinds in report order
+VIOLATION_KINDS = ('coverage', 'capacity', 'deadline', 'group', 'truck', 'availability', 'address')
+
+
+def _trip_visits(timeline):
+    """
+    Helper function walking a route once. Returns the last visit of each stop as
+    (arrival, trip) and the hub departure time of each trip; every return to the
+    route's first stop starts a new trip, and a repeated hub point is the wait before it.
+    """
+    route, arrivals = timeline.route, timeline.arrival_times
+    departures = [timeline.leave_time]
+    visits = {}
+    for position in range(1, len(route)):
+        if route[position] == route[0]:
+            if route[position - 1] == route[0]:
+                departures[-1] = arrivals[position]  # Waited at the hub: the trip leaves now
+            elif position + 1 < len(route):
+                departures.append(arrivals[position])
+            continue
+        visits[route[position]] = (arrivals[position], len(departures) - 1)
+    return visits, departures
+
+
+def validate_plan(delivery_plan, fleet=None, constraint_set=None, addresses=None, parcel_list=None):
+    """
+    Checks a whole plan against every delivery constraint in one pass over its routes and
+    one pass over its parcels, and reports each violation instead of stopping at the first.
+    Time Complexity: O(n + r) where n is number of parcels and r is number of route points
+
+    Checks: every manifest parcel is on exactly one vehicle and delivered (coverage);
+    parcels, kilograms and volume per trip stay within each truck's limits (capacity);
+    deadlines; co-delivery groups share a vehicle; truck-only parcels ride their truck;
+    delayed parcels leave the hub no earlier than they arrive (availability); and
+    wrong-address parcels reach the corrected address after the correction is known, or
+    are reported when no correction was supplied (address).
+
+    Args:
+        delivery_plan (DeliveryPlan): Plan to check
+        fleet (list[DeliveryVehicle]): Trucks whose limits apply, by ID (defaults to van.fleet)
+        constraint_set (ConstraintSet): Compiled constraints (defaults to the loaded manifest)
+        addresses (list[str]): Addresses by location index (defaults to the distance table)
+        parcel_list (list[Parcel]): Manifest the plan must cover (defaults to the registry)
+    Returns:
+        FeasibilityReport: feasible flag, violations, counts by kind and the work done
+    """
+    fleet = fleet if fleet is not None else van.fleet
+    constraint_set = constraint_set if constraint_set is not None else parcels.delivery_constraints
+    lookup = plan._build_address_lookup(addresses if addresses is not None else dist.import_addresses())
+    if parcel_list is None:
+        parcel_list = [package for bucket in parcels.delivery_registry.storage for _, package in bucket]
+    limits = {vehicle.id: vehicle for vehicle in fleet}
+    volumes = {package.tracking_id: package.volume for package in parcel_list}
+    violations = []
+
+    # Routes: last visit of every stop, trip departures, and which vehicle loaded each parcel
+    visits, departures, carrier = {}, {}, {}
+    stops_checked = 0
+    for vehicle_id in delivery_plan.vehicle_ids:
+        timeline = delivery_plan.vehicles[vehicle_id]
+        visits[vehicle_id], departures[vehicle_id] = _trip_visits(timeline)
+        stops_checked += len(timeline.route)
+        for tracking_id in timeline.shipments:
+            if tracking_id in carrier:
+                detail = (f"loaded twice on vehicle {vehicle_id}" if carrier[tracking_id] == vehicle_id
+                          else f"also loaded on vehicle {carrier[tracking_id]}")
+                violations.append(Violation('coverage', tracking_id, vehicle_id, detail))
+            else:
+                carrier[tracking_id] = vehicle_id
+
+    for package in parcel_list:
+        if package.tracking_id not in delivery_plan.parcels:
+            violations.append(Violation('coverage', package.tracking_id, None, "missing from the plan"))
+
+    # Parcels: one pass, accumulating trip loads as it goes
+    loads = {}
+    group_vehicle = {}
+    for tracking_id in delivery_plan.parcel_ids:
+        record = delivery_plan.parcels[tracking_id]
+        vehicle_id = record.vehicle_id
+        if vehicle_id is None:
+            violations.append(Violation('coverage', tracking_id, None, "not assigned to a vehicle"))
+            continue
+
+        stop = lookup(record.destination)
+        visit = visits.get(vehicle_id, {}).get(stop)
+        trip = visit[1] if visit is not None else 0
+        if record.delivery_time is None:
+            reason = "address not found" if stop is None else "stop not on the vehicle's route"
+            violations.append(Violation('coverage', tracking_id, vehicle_id, f"never delivered ({reason})"))
+        elif record.delivery_time > record.deadline:
+            violations.append(Violation(
+                'deadline', tracking_id, vehicle_id,
+                f"delivered {clock.format_seconds(record.delivery_time)}, due {clock.format_seconds(record.deadline)}"))
+
+        count, kilograms, volume = loads.get((vehicle_id, trip), (0, 0.0, 0.0))
+        weight = parcels.weight_in_kilograms(*parcels.parse_weight(record.weight))
+        loads[(vehicle_id, trip)] = (count + 1, kilograms + (weight or 0.0), volume + (volumes.get(tracking_id) or 0.0))
+
+        group = constraint_set.group_of(tracking_id)
+        if group:
+            anchor = min(group)
+            first = group_vehicle.setdefault(anchor, (vehicle_id, tracking_id))
+            if first[0] != vehicle_id:
+                violations.append(Violation('group', tracking_id, vehicle_id,
+                                            f"group {sorted(group)} split from #{first[1]} on vehicle {first[0]}"))
+
+        truck = constraint_set.truck_for(tracking_id)
+        if truck is not None and truck != vehicle_id:
+            violations.append(Violation('truck', tracking_id, vehicle_id, f"must ride truck {truck}"))
+
+        available = constraint_set.available_at(tracking_id)
+        departure = departures.get(vehicle_id, [record.start_time])[trip]
+        if available is not None and departure is not None and departure < available:
+            violations.append(Violation(
+                'availability', tracking_id, vehicle_id,
+                f"leaves the hub {clock.format_seconds(departure)}, arrives {clock.format_seconds(available)}"))
+
+        if tracking_id in constraint_set.unresolved:
+            violations.append(Violation('address', tracking_id, vehicle_id,
+                                        "wrong address listed and no correction supplied"))
+        change = record.address_changes[-1] if record.address_changes else constraint_set.address_change(tracking_id)
+        if change is not None and record.delivery_time is not None:
+            change_time, street, _ = change
+            corrected = visits.get(vehicle_id, {}).get(lookup(street))
+            if record.delivery_time < change_time:
+                violations.append(Violation('address', tracking_id, vehicle_id,
+                                            f"delivered before the correction at {clock.format_seconds(change_time)}"))
+            elif corrected is None or corrected[0] < change_time:
+                violations.append(Violation('address', tracking_id, vehicle_id,
+                                            f"corrected address {street} not visited after "
+                                            f"{clock.format_seconds(change_time)}"))
+
+    for (vehicle_id, trip), (count, kilograms, volume) in sorted(loads.items()):
+        vehicle = limits.get(vehicle_id)
+        if vehicle is None:
+            continue
+        label = f"trip {trip + 1}: " if len(departures.get(vehicle_id, ())) > 1 else ""
+        if count > vehicle.max_cargo:
+            violations.append(Violation('capacity', None, vehicle_id,
+                                        f"{label}{count} parcels, limit {vehicle.max_cargo}"))
+        if vehicle.max_weight is not None and kilograms > vehicle.max_weight:
+            violations.append(Violation('capacity', None, vehicle_id,
+                                        f"{label}{kilograms:g} kg, limit {vehicle.max_weight:g}"))
+        if vehicle.max_volume is not None and volume > vehicle.max_volume:
+            violations.append(Violation('capacity', None, vehicle_id,
+                                        f"{label}volume {volume:g}, limit {vehicle.max_volume:g}"))
+
+    violations.sort(key=lambda v: (VIOLATION_KINDS.index(v.kind), v.tracking_id or 0, v.vehicle_id or 0))
+    counts = {kind: 0 for kind in VIOLATION_KINDS}
+    for violation in violations:
+        counts[violation.kind] += 1
+    return FeasibilityReport(not violations, tuple(violations), counts, len(delivery_plan.parcel_ids), stops_checked)
+
+
+def format_report(report):
+    """
+    Renders a feasibility report as text, one line per violation.
+    Time Complexity: O(v) where v is number of violations
+    """
+    if report.feasible:
+        return f"Plan feasible: {report.parcels_checked} parcels, {report.stops_checked} route points checked"
+    summary = ", ".join(f"{count} {kind}" for kind, count in report.counts.items() if count)
+    lines = [f"Plan infeasible: {len(report.violations)} violations ({summary})"]
+    for violation in report.violations:
+        subject = f"#{violation.tracking_id}" if violation.tracking_id is not None else "-"
+        vehicle = f"van {violation.vehicle_id}" if violation.vehicle_id is not None else "no van"
+        lines.append(f"  {violation.kind:<12} {subject:<5} {vehicle:<7} {violation.detail}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    report = validate_plan(plan.plan_deliveries())
+    print(format_report(report))
+    sys.exit(0 if report.feasible else 1)
@@ -0,0 +1,166 @@
+from collections import namedtuple
+
+import clock
+import parcels
+
+# Parcels, kilograms and volume of one load unit (a parcel or a co-delivery group)
+LoadUnit = namedtuple('LoadUnit', ['tracking_ids', 'count', 'weight', 'volume', 'deadline', 'ready_time',
+                                   'change_time', 'truck'])
+
+TruckBin = namedtuple('TruckBin', ['vehicle_id', 'departure', 'max_count', 'max_weight', 'max_volume'])
+
+
+def load_units(parcel_list, constraint_set=None):
+    """
+    Groups parcels into units that must share a truck and totals their size.
+    Time Complexity: O(n) where n is number of parcels
+
+    Args:
+        parcel_list (list[Parcel]): Parcels to load
+        constraint_set (ConstraintSet): Compiled constraints (defaults to the loaded manifest)
+    Returns:
+        list[LoadUnit]: Units in manifest order
+    Raises:
+        ValueError: If a group's members are restricted to different trucks
+    """
+    constraint_set = constraint_set if constraint_set is not None else parcels.delivery_constraints
+    by_id = {parcel.tracking_id: parcel for parcel in parcel_list}
+    units, seen = [], set()
+
+    for parcel in parcel_list:
+        if parcel.tracking_id in seen:
+            continue
+        group = constraint_set.group_of(parcel.tracking_id) or {parcel.tracking_id}
+        members = sorted(tracking_id for tracking_id in group if tracking_id in by_id)
+        seen.update(members)
+
+        trucks = {constraint_set.truck_for(tracking_id) for tracking_id in members} - {None}
+        if len(trucks) > 1:
+            raise ValueError(f"Packages {members} must ride together but are restricted to trucks {sorted(trucks)}")
+        changes = [constraint_set.address_change(tracking_id) for tracking_id in members]
+        units.append(LoadUnit(
+            tuple(members), len(members),
+            sum(by_id[tracking_id].weight_kg or 0.0 for tracking_id in members),
+            sum(by_id[tracking_id].volume or 0.0 for tracking_id in members),
+            min(by_id[tracking_id].deadline for tracking_id in members),
+            max((constraint_set.available_at(tracking_id) or 0 for tracking_id in members), default=0),
+            max((change[0] for change in changes if change), default=0),
+            trucks.pop() if trucks else None))
+    return units
+
+
+def truck_bins(fleet):
+    """
+    Capacities and scheduled departures of a fleet, in departure order.
+    Time Complexity: O(v log v) where v is number of vehicles
+    """
+    return sorted((TruckBin(vehicle.id, vehicle.scheduled_departure, vehicle.max_cargo, vehicle.max_weight,
+                            vehicle.max_volume) for vehicle in fleet),
+                  key=lambda truck: (truck.departure, truck.vehicle_id))
+
+
+def _fraction(amount, capacity):
+    """Helper function giving the share of a capacity used (0 for unlimited capacities)"""
+    return amount / capacity if capacity else 0.0
+
+
+def _size(unit, bins):
+    """Helper function measuring a unit by its largest share of the biggest truck on any dimension"""
+    return max(_fraction(unit.count, max(truck.max_count for truck in bins)),
+               _fraction(unit.weight, max(truck.max_weight or 0 for truck in bins)),
+               _fraction(unit.volume, max(truck.max_volume or 0 for truck in bins)))
+
+
+def _eligible(unit, truck):
+    """Helper function checking a unit's truck restriction, availability and address correction"""
+    return ((unit.truck is None or unit.truck == truck.vehicle_id)
+            and truck.departure >= unit.ready_time and truck.departure >= unit.change_time)
+
+
+def pack_loads(parcel_list, fleet, constraint_set=None, spread=False, earliest_deadlines=False):
+    """
+    Assigns parcels to trucks by count, weight and volume with a best-fit-decreasing packer.
+    Units are packed most restricted first (fewest eligible trucks), deadline units before
+    end-of-day ones, and otherwise largest first. A unit goes to the open truck it fills
+    most tightly, and a new truck is only opened (earliest departure first) when no open
+    truck can take it, so loads consolidate onto as few trips as possible. Deadline units
+    only consider trucks leaving before their deadline while any exists. With spread=True
+    units instead go to the eligible truck with the most room left (worst fit), using every
+    truck. With earliest_deadlines=True deadline units take the earliest departure with
+    room, falling back to the usual choice when none has room. Truck restrictions, parcel
+    availability, address corrections and co-delivery groups are respected.
+    Time Complexity: O(n log n + n * v) where n is number of parcels and v is number of vehicles
+
+    Args:
+        parcel_list (list[Parcel]): Parcels to load
+        fleet (list[DeliveryVehicle]): Trucks with max_cargo, max_weight and max_volume set
+        constraint_set (ConstraintSet): Compiled constraints (defaults to the loaded manifest)
+        spread (bool): Balance loads across all trucks instead of consolidating them
+        earliest_deadlines (bool): Put deadline units on the earliest truck with room
+    Returns:
+        dict: Mapping of truck IDs to lists of package IDs, as parcels.plan_loads()
+    Raises:
+        ValueError: If a unit fits on no eligible truck
+    """
+    bins = truck_bins(fleet)
+    units = load_units(parcel_list, constraint_set)
+    used = {truck.vehicle_id: [0, 0.0, 0.0] for truck in bins}
+    loads = {vehicle.id: [] for vehicle in fleet}
+
+    def slack(unit, truck):
+        count, weight, volume = used[truck.vehicle_id]
+        if count + unit.count > truck.max_count or \
+                (truck.max_weight is not None and weight + unit.weight > truck.max_weight) or \
+                (truck.max_volume is not None and volume + unit.volume > truck.max_volume):
+            return None
+        # Tightest remaining share across the dimensions this truck limits
+        return min(1.0 - _fraction(count + unit.count, truck.max_count),
+                   1.0 - _fraction(weight + unit.weight, truck.max_weight) if truck.max_weight else 1.0,
+                   1.0 - _fraction(volume + unit.volume, truck.max_volume) if truck.max_volume else 1.0)
+
+    # Units with the fewest eligible trucks first, deadline units before end-of-day ones, then largest
+    order = sorted(units, key=lambda unit: (sum(_eligible(unit, truck) for truck in bins),
+                                            unit.deadline >= clock.END_OF_DAY,
+                                            -_size(unit, bins), unit.tracking_ids))
+    for unit in order:
+        eligible = [truck for truck in bins if _eligible(unit, truck)]
+        in_time = [truck for truck in eligible if truck.departure < unit.deadline]
+        candidates = in_time or eligible
+
+        best, best_slack = None, None
+        if earliest_deadlines and unit.deadline < clock.END_OF_DAY:
+            # Deadline units take the earliest departure with room
+            best = next((truck for truck in candidates if slack(unit, truck) is not None), None)
+        for truck in candidates if best is None else ():
+            if not loads[truck.vehicle_id] and not spread:
+                continue
+            remaining = slack(unit, truck)
+            if remaining is not None and (best_slack is None or
+                                          (remaining > best_slack if spread else remaining < best_slack)):
+                best, best_slack = truck, remaining
+        if best is None:
+            best = next((truck for truck in candidates
+                         if not loads[truck.vehicle_id] and slack(unit, truck) is not None), None)
+        if best is None:
+            raise ValueError(f"No truck can take package(s) {', '.join(map(str, unit.tracking_ids))}")
+
+        loads[best.vehicle_id].extend(unit.tracking_ids)
+        totals = used[best.vehicle_id]
+        totals[0] += unit.count
+        totals[1] += unit.weight
+        totals[2] += unit.volume
+    return loads
+
+
+def load_summary(loads, parcel_list):
+    """
+    Count, kilograms and volume per truck for a load plan.
+    Time Complexity: O(n)
+
+    Returns:
+        dict: Truck ID -> (count, kilograms, volume)
+    """
+    by_id = {parcel.tracking_id: parcel for parcel in parcel_list}
+    return {vehicle_id: (len(ids), sum(by_id[i].weight_kg or 0.0 for i in ids),
+                         sum(by_id[i].volume or 0.0 for i in ids))
+            for vehicle_id, ids in loads.items()}
@@ -0,0 +1,258 @@
+import argparse
+import random
+import threading
+import time
+
+import locations
+import parcels
+import routing
+import van
+from status_service import PlanStore
+
+# Default share of each query type in a generated workload
+DEFAULT_MIX = {'parcel': 0.80, 'table': 0.05, 'sweep': 0.15}
+
+DAY_START = 8 * 3600
+DAY_END = 17 * 3600
+
+
+def build_workload(request_count, parcel_ids, mix=None, sweep_points=36, seed=950):
+    """
+    Generates a reproducible list of query operations.
+    Operations are ('parcel', id, t), ('table', t) or ('sweep', id, [t, ...]).
+    Time Complexity: O(r * s) where r is request count and s is sweep points
+
+    Args:
+        request_count (int): Number of operations to generate
+        parcel_ids (list[int]): Tracking IDs to draw from
+        mix (dict): Share of 'parcel', 'table' and 'sweep' operations
+        sweep_points (int): Number of times in each time sweep
+        seed (int): Random seed
+    Returns:
+        list[tuple]: Workload operations
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    step = (DAY_END - DAY_START) // max(sweep_points - 1, 1)
+    workload = []
+
+    for kind in rng.choices(kinds, weights, k=request_count):
+        query_seconds = rng.randrange(DAY_START, DAY_END, 60)
+        if kind == 'parcel':
+            workload.append(('parcel', rng.choice(parcel_ids), query_seconds))
+        elif kind == 'table':
+            workload.append(('table', query_seconds))
+        else:
+            times = [DAY_START + i * step for i in range(sweep_points)]
+            workload.append(('sweep', rng.choice(parcel_ids), times))
+
+    return workload
+
+
+class PlanQueryLayer:
+    """
+    Executes workload operations against immutable DeliveryPlan snapshots.
+    Re-planning swaps the snapshot while readers continue on the old one.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def execute(self, operation):
+        """
+        Runs one operation against the current snapshot.
+        Time Complexity: O(1) single lookup, O(n) table, O(s) sweep
+        """
+        snapshot = self.store.current
+        kind = operation[0]
+        if kind == 'parcel':
+            return snapshot.parcel_status(operation[1], operation[2])
+        if kind == 'table':
+            rows = list(snapshot.all_parcel_statuses(operation[1]))
+            return rows, snapshot.total_mileage(operation[1])
+        return [snapshot.parcel_status(operation[1], query_seconds) for query_seconds in operation[2]]
+
+    def replan(self):
+        """Rebuilds and publishes a new snapshot"""
+        self.store.rebuild()
+
+
+class LegacyQueryLayer:
+    """
+    Executes workload operations through parcels.update_status and van.calculate_progress.
+    Those functions mutate shared objects, so every query and re-plan holds one lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.distances = locations.import_distances()
+
+    def execute(self, operation):
+        """
+        Runs one operation against the global registry and fleet.
+        Time Complexity: O(n) per query time plus progress recomputation
+        """
+        kind = operation[0]
+        with self.lock:
+            if kind == 'parcel':
+                parcels.update_status(operation[2])
+                return parcels.delivery_registry.locate_parcel(operation[1]).status
+            if kind == 'table':
+                query_time = operation[1]
+                parcels.update_status(query_time)
+                return sum(van.calculate_progress(query_time, vehicle, self.distances)[1]
+                           for vehicle in van.fleet)
+            statuses = []
+            for query_seconds in operation[2]:
+                parcels.update_status(query_seconds)
+                statuses.append(parcels.delivery_registry.locate_parcel(operation[1]).status)
+            return statuses
+
+    def replan(self):
+        """Re-runs delivery coordination in place"""
+        with self.lock:
+            routing.coordinate_deliveries()
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    Time Complexity: O(1)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_load(layer, workload, workers=8, replan_interval=None):
+    """
+    Replays a workload across worker threads, optionally re-planning in the background.
+    Time Complexity: O(r) operations plus one re-plan per interval
+
+    Args:
+        layer (PlanQueryLayer | LegacyQueryLayer): Query layer under test
+        workload (list[tuple]): Operations from build_workload
+        workers (int): Number of concurrent worker threads
+        replan_interval (float): Seconds between re-plans, or None to disable
+    Returns:
+        dict: Throughput, latency percentiles per operation type, and re-plan timings
+    """
+    latencies = {kind: [] for kind in DEFAULT_MIX}
+    replan_times = []
+    errors = []
+    stop_replanning = threading.Event()
+    shares = [workload[i::workers] for i in range(workers)]
+
+    def worker(operations):
+        local = {kind: [] for kind in DEFAULT_MIX}
+        for operation in operations:
+            started = time.perf_counter()
+            try:
+                layer.execute(operation)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            local[operation[0]].append(time.perf_counter() - started)
+        for kind, values in local.items():
+            latencies[kind].extend(values)
+
+    def replanner():
+        while not stop_replanning.is_set():
+            started = time.perf_counter()
+            layer.replan()
+            replan_times.append(time.perf_counter() - started)
+            stop_replanning.wait(replan_interval)
+
+    threads = [threading.Thread(target=worker, args=(share,)) for share in shares]
+    background = threading.Thread(target=replanner) if replan_interval else None
+
+    started = time.perf_counter()
+    if background:
+        background.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop_replanning.set()
+    if background:
+        background.join()
+
+    combined = sorted(value for values in latencies.values() for value in values)
+    report = {
+        'requests': len(combined),
+        'errors': len(errors),
+        'elapsed': elapsed,
+        'throughput': len(combined) / elapsed if elapsed else 0.0,
+        'latency': _summarize(combined),
+        'by_type': {kind: _summarize(sorted(values)) for kind, values in latencies.items() if values},
+        'replans': len(replan_times),
+        'replan_mean': sum(replan_times) / len(replan_times) if replan_times else 0.0,
+    }
+    return report
+
+
+def _summarize(sorted_values):
+    """Helper function to compute latency percentiles in milliseconds"""
+    return {
+        'count': len(sorted_values),
+        'p50': percentile(sorted_values, 0.50) * 1000,
+        'p95': percentile(sorted_values, 0.95) * 1000,
+        'p99': percentile(sorted_values, 0.99) * 1000,
+        'max': (sorted_values[-1] if sorted_values else 0.0) * 1000,
+    }
+
+
+def format_report(title, report):
+    """
+    Formats a load test report as a plain-text table.
+    Time Complexity: O(1)
+    """
+    lines = [f"{title}",
+             f"  requests: {report['requests']}  errors: {report['errors']}  "
+             f"elapsed: {report['elapsed']:.2f}s  throughput: {report['throughput']:.0f} req/s",
+             f"  re-plans: {report['replans']}  mean re-plan time: {report['replan_mean'] * 1000:.1f} ms",
+             f"  {'TYPE':<8} {'COUNT':>8} {'P50 ms':>10} {'P95 ms':>10} {'P99 ms':>10} {'MAX ms':>10}"]
+    rows = [('all', report['latency'])] + list(report['by_type'].items())
+    for kind, stats in rows:
+        lines.append(f"  {kind:<8} {stats['count']:>8} {stats['p50']:>10.3f} {stats['p95']:>10.3f} "
+                     f"{stats['p99']:>10.3f} {stats['max']:>10.3f}")
+    return "\n".join(lines)
+
+
+def main():
+    """
+    Command-line entry point: runs the workload without and with concurrent re-plans.
+    Time Complexity: O(r) operations per phase
+    """
+    parser = argparse.ArgumentParser(description="WGUPS status query load test")
+    parser.add_argument("--requests", type=int, default=20000, help="operations per phase")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent worker threads")
+    parser.add_argument("--replan-interval", type=float, default=0.05,
+                        help="seconds between re-plans in the second phase")
+    parser.add_argument("--layer", choices=["plan", "legacy"], default="plan",
+                        help="query layer to exercise (default: plan snapshots)")
+    parser.add_argument("--seed", type=int, default=950, help="workload random seed")
+    args = parser.parse_args()
+
+    if args.layer == "plan":
+        store = PlanStore()
+        store.rebuild()
+        layer = PlanQueryLayer(store)
+        parcel_ids = list(store.current.parcel_ids)
+    else:
+        routing.coordinate_deliveries()
+        layer = LegacyQueryLayer()
+        parcel_ids = list(range(1, 41))
+
+    workload = build_workload(args.requests, parcel_ids, seed=args.seed)
+    print(format_report(f"[{args.layer}] steady state", run_load(layer, workload, args.workers)))
+    print(format_report(f"[{args.layer}] with re-plan every {args.replan_interval}s",
+                        run_load(layer, workload, args.workers, args.replan_interval)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,38 @@
 import csv
 
+from address_resolver import AddressResolver
 
-def import_distances():
+# Distance table read when no path is given (PlanningContext points this elsewhere)
+DISTANCES_PATH = './data/distances.csv'
+
+# When set, locations come from an address,latitude,longitude file and distances are
+# computed on demand by a DistanceOracle instead of being read from DISTANCES_PATH
+COORDINATES_PATH = None
+_distance_oracle = None
+
+# Resolver built once from distances.csv on first lookup
+_address_resolver = None
+
+
+def import_distances(path=None):
     """
     Loads and processes distance matrix from CSV data source.
     Time Complexity: O(n²) where n is number of locations
 
+    Args:
+        path (str): Distance table to read (defaults to DISTANCES_PATH)
     Returns:
         list[list[float]]: Matrix of distances between delivery points
+            (a DistanceOracle with the same indexing when COORDINATES_PATH is set)
     Raises:
         FileNotFoundError: If distance data file not found
         ValueError: If data format is invalid
     """
+    if path is None and COORDINATES_PATH:
+        return get_distance_oracle()
+
     try:
-        with open('./data/distances.csv') as route_data:
+        with open(path or DISTANCES_PATH) as route_data:
             csv_parser = csv.reader(route_data)
             delivery_points = next(csv_parser)[2:]  # Skip first two columns of header
 
@@ -46,18 +65,23 @@ def import_distances():
         raise ValueError(f"Error processing distance data: {str(e)}")
 
 
-def import_addresses():
+def import_addresses(path=None):
     """
     Extracts and standardizes delivery location addresses from CSV.
     Time Complexity: O(n) where n is number of locations
 
+    Args:
+        path (str): Distance table to read (defaults to DISTANCES_PATH)
     Returns:
         list[str]: Clean list of delivery addresses
     Raises:
         FileNotFoundError: If distance data file not found
     """
+    if path is None and COORDINATES_PATH:
+        return list(get_distance_oracle().addresses)
+
     try:
-        with open('./data/distances.csv') as route_data:
+        with open(path or DISTANCES_PATH) as route_data:
             csv_parser = csv.reader(route_data)
             raw_addresses = next(csv_parser)[2:]
 
@@ -122,32 +146,71 @@ def calculate_distance(route_segment, distance_matrix):
         raise ValueError("Invalid location indices in route segment")
 
 
+def get_distance_oracle():
+    """
+    Returns the shared coordinate-based distance oracle for COORDINATES_PATH,
+    loading it on first use so every caller shares one pair cache.
+    Time Complexity: O(1) after the first call, O(n) to load
+
+    Returns:
+        DistanceOracle: Oracle over the locations in the coordinates file
+    Raises:
+        ValueError: If COORDINATES_PATH is not set
+    """
+    global _distance_oracle
+    if not COORDINATES_PATH:
+        raise ValueError("No coordinates file configured")
+    if _distance_oracle is None or _distance_oracle.source != COORDINATES_PATH:
+        from distance_oracle import DistanceOracle
+        _distance_oracle = DistanceOracle.from_file(COORDINATES_PATH)
+    return _distance_oracle
+
+
+def get_address_resolver():
+    """
+    Returns the shared address resolver, building its index on first use.
+    Time Complexity: O(1) after the first call, O(n) to build
+
+    Returns:
+        AddressResolver: Resolver over the addresses in distances.csv
+    """
+    global _address_resolver
+    if _address_resolver is None:
+        _address_resolver = AddressResolver(import_addresses())
+    return _address_resolver
+
+
+def reset_address_cache():
+    """
+    Discards the cached resolver and distance oracle so the next lookup re-reads the data.
+    Time Complexity: O(1)
+    """
+    global _address_resolver, _distance_oracle
+    _address_resolver = None
+    _distance_oracle = None
+
+
 def get_location_index(address):
     """
     Finds index of location in address list.
-    Time Complexity: O(n) where n is number of addresses
+    Exact and normalized matches are dictionary lookups; anything else goes through
+    the trigram resolver, and results are cached.
+    Time Complexity: O(1) for known addresses
 
     Args:
         address (str): Address to look up
     Returns:
         int: Index of address in location list
     Raises:
-        ValueError: If address not found
+        ValueError: If address not found or matches several locations equally well
     """
-    addresses = import_addresses()
-
-    # Try exact match first
-    try:
-        return addresses.index(address)
-    except ValueError:
-        # Try fuzzy matching
-        normalized_address = address.lower().replace(' ', '')
-        normalized_addresses = [addr.lower().replace(' ', '') for addr in addresses]
-
-        try:
-            return normalized_addresses.index(normalized_address)
-        except ValueError:
-            raise ValueError(f"Address not found: {address}")
+    result = get_address_resolver().resolve(address)
+    if result.index is None:
+        raise ValueError(f"Address not found: {address}")
+    if result.ambiguous:
+        candidates = ", ".join(candidate for candidate, _ in result.alternatives)
+        raise ValueError(f"Ambiguous address: {address} (best {result.address}, also {candidates})")
+    return result.index
 
 
 def get_address_by_index(index):
@@ -162,8 +225,8 @@ def get_address_by_index(index):
     Raises:
         IndexError: If invalid index
     """
-    addresses = import_addresses()
+    addresses = get_address_resolver().addresses
     if 0 <= index < len(addresses):
         return addresses[index]
     else:
-        raise IndexError(f"Invalid location index: {index}")
\ No newline at end of file
+        raise IndexError(f"Invalid location index: {index}")
@@ -4,16 +4,110 @@ Created by Christopher Powell
 Student #001307071
 '''
 
+import argparse
+import sys
+
 import parcels
 import routing
 from cli_interface import launch_welcome
 
+
+def parse_arguments(argv=None):
+    """
+    Parses command-line options. With no batch options the interactive interface is launched.
+    Time Complexity: O(1)
+    """
+    parser = argparse.ArgumentParser(description="WGUPS Delivery Management System")
+    batch = parser.add_argument_group("batch query mode")
+    batch.add_argument("--at", action="append", metavar="TIME",
+                       help="query time such as 10:25 or '10:25 am' (repeatable)")
+    batch.add_argument("--times-file", metavar="PATH",
+                       help="file with one query time per line, or '-' to read from stdin")
+    batch.add_argument("--packages", metavar="IDS",
+                       help="package IDs and ranges such as 1-5,9 (default: all)")
+    batch.add_argument("--format", choices=["jsonl", "csv"], default="jsonl",
+                       help="output format (default: jsonl)")
+    batch.add_argument("--output", metavar="PATH", help="write results to a file instead of stdout")
+    batch.add_argument("--metric-closure", action="store_true",
+                       help="plan on shortest-path mileage (requires NumPy)")
+    batch.add_argument("--dynamic-schedule", action="store_true",
+                       help="compute departures and driver assignments instead of the fixed times")
+    batch.add_argument("--coordinates", metavar="PATH",
+                       help="address,latitude,longitude CSV; distances are computed from coordinates")
+    batch.add_argument("--speed-profile", metavar="PATH",
+                       help="CSV of zone,start,mph rows giving time-of-day speeds (zone '*' = network)")
+    batch.add_argument("--speed-zones", metavar="PATH",
+                       help="CSV of address,zone rows placing locations in speed-profile zones")
+    batch.add_argument("--pack-loads", action="store_true",
+                       help="load trucks with the weight-aware bin packer instead of the fixed loading rules")
+    batch.add_argument("--max-weight", type=float, metavar="KG",
+                       help="per-truck weight capacity in kilograms for --pack-loads")
+    batch.add_argument("--max-volume", type=float, metavar="VOLUME",
+                       help="per-truck volume capacity for --pack-loads (manifest column 9)")
+    batch.add_argument("--decompose", choices=["kmedoids", "sweep"],
+                       help="plan by clustering stops into trips (sweep requires --coordinates)")
+    batch.add_argument("--validate", action="store_true",
+                       help="check the plan against every constraint and report violations on stderr")
+    return parser.parse_args(argv)
+
+
+def run_batch_mode(args):
+    """
+    Plans the day once and answers every batch query from the precomputed plan.
+    Time Complexity: O(n³ + t * p) for planning plus t query times over p packages
+    """
+    import batch_query
+    import locations
+    import plan
+
+    if args.coordinates:
+        locations.COORDINATES_PATH = args.coordinates
+
+    profile = None
+    if args.speed_profile:
+        import speed_profiles
+        profile = speed_profiles.load_speed_profile(args.speed_profile, args.speed_zones)
+
+    if args.max_weight is not None or args.max_volume is not None:
+        import van
+        for vehicle in van.fleet:
+            vehicle.max_weight = args.max_weight
+            vehicle.max_volume = args.max_volume
+
+    if args.decompose:
+        import decomposition
+        delivery_plan = decomposition.plan_decomposed(args.decompose)
+        late = decomposition.late_parcels(delivery_plan)
+        if late:
+            print(f"Warning: the decomposed plan delivers {len(late)} package(s) late: "
+                  f"{', '.join(f'#{tracking_id}' for tracking_id in late)}", file=sys.stderr)
+    else:
+        delivery_plan = plan.plan_deliveries(metric_closure=args.metric_closure,
+                                             dynamic_schedule=args.dynamic_schedule,
+                                             speed_profile=profile,
+                                             pack_loads=args.pack_loads)
+    if args.validate:
+        import feasibility
+        print(feasibility.format_report(feasibility.validate_plan(delivery_plan)), file=sys.stderr)
+    batch_query.run_batch(delivery_plan, args.at, args.times_file, args.packages, args.format, args.output)
+
+
 def main():
     """
     Entry point for the WGUPS Delivery Management System.
     Initializes delivery coordination and launches user interface.
     Time Complexity: O(n³) where n is number of delivery points
     """
+    args = parse_arguments()
+
+    if args.at or args.times_file:
+        try:
+            run_batch_mode(args)
+        except Exception as e:
+            print(f"Error running batch query: {str(e)}", file=sys.stderr)
+            exit(1)
+        return
+
     try:
         # Load package data and initialize registry
         # print("Initializing package data...")
@@ -33,4 +127,4 @@ def main():
         exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import batch_query
+import clock
+from planning_context import PlanningContext, summarize_plan
+
+SUMMARY_FIELDS = ('manifest', 'status', 'parcels', 'delivered', 'late', 'unassigned', 'total_miles',
+                  'last_delivery', 'plan_seconds', 'result_path', 'error')
+
+
+def discover_manifests(root, distances_path=None):
+    """
+    Finds every manifest below root: each directory containing a parcels.csv.
+    A directory without its own distances.csv uses distances_path.
+    Time Complexity: O(d) where d is number of directories under root
+
+    Args:
+        root (str): Directory to search
+        distances_path (str): Shared distance table for manifests that lack one
+    Returns:
+        list[PlanningContext]: One context per manifest, ordered by name
+    """
+    contexts = []
+    for directory, _, files in os.walk(root):
+        if 'parcels.csv' not in files:
+            continue
+        own_distances = os.path.join(directory, 'distances.csv')
+        name = os.path.relpath(directory, root).replace(os.sep, '_')
+        contexts.append(PlanningContext(
+            data_dir=directory, name=os.path.basename(os.path.normpath(root)) if name == '.' else name,
+            distances_path=own_distances if 'distances.csv' in files else distances_path))
+    return sorted(contexts, key=lambda context: context.name)
+
+
+def plan_manifest(context, output_dir, output_format='jsonl', query_times=(clock.END_OF_DAY,)):
+    """
+    Plans one manifest and writes its parcel results. Runs inside a worker process.
+    Failures are reported in the summary row instead of stopping the batch.
+    Time Complexity: O(n³ + t * p) for planning plus t query times over p parcels
+
+    Args:
+        context (PlanningContext): Manifest to plan
+        output_dir (str): Directory for the result file
+        output_format (str): 'jsonl' or 'csv'
+        query_times (tuple[int]): Times to report parcel status at
+    Returns:
+        dict: Summary row (see SUMMARY_FIELDS)
+    """
+    row = dict.fromkeys(SUMMARY_FIELDS, '')
+    row['manifest'] = context.name
+    started = time.perf_counter()
+    try:
+        delivery_plan = context.plan()
+        result_path = os.path.join(output_dir, f"{context.name}.{output_format}")
+        with open(result_path, 'w', newline='') as stream:
+            batch_query.write_results(delivery_plan, query_times, delivery_plan.parcel_ids,
+                                      output_format, stream)
+        row.update(summarize_plan(delivery_plan))
+        row['status'] = 'ok'
+        row['result_path'] = result_path
+    except Exception as e:
+        row['status'] = 'failed'
+        row['error'] = str(e)
+    row['plan_seconds'] = round(time.perf_counter() - started, 3)
+    return row
+
+
+def run_manifests(contexts, output_dir, workers=None, output_format='jsonl',
+                  query_times=(clock.END_OF_DAY,)):
+    """
+    Plans many manifests in parallel worker processes and writes an aggregate summary.
+    Each worker has its own copy of the planning modules, so manifests never share state.
+    Time Complexity: O(m * n³ / w) for m manifests on w workers
+
+    Args:
+        contexts (list[PlanningContext]): Manifests to plan
+        output_dir (str): Directory for per-manifest results and summary.csv
+        workers (int): Worker processes (defaults to the CPU count)
+        output_format (str): 'jsonl' or 'csv' for per-manifest results
+        query_times (tuple[int]): Times to report parcel status at
+    Returns:
+        list[dict]: Summary rows in manifest order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rows = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(plan_manifest, context, output_dir, output_format, tuple(query_times)):
+                   context.name for context in contexts}
+        for future in as_completed(futures):
+            rows[futures[future]] = future.result()
+
+    ordered = [rows[context.name] for context in contexts]
+    with open(os.path.join(output_dir, 'summary.csv'), 'w', newline='') as summary:
+        writer = csv.DictWriter(summary, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(ordered)
+    return ordered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan many WGUPS manifests in parallel")
+    parser.add_argument("root", help="directory searched for manifests (directories with parcels.csv)")
+    parser.add_argument("--output-dir", default="./batch_results", help="where results are written")
+    parser.add_argument("--distances", default="./data/distances.csv",
+                        help="distance table for manifests without their own distances.csv")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--at", action="append", metavar="TIME",
+                        help="report parcel status at this time (repeatable, default 17:00)")
+    args = parser.parse_args(argv)
+
+    contexts = discover_manifests(args.root, args.distances)
+    if not contexts:
+        print(f"No manifests found under {args.root}", file=sys.stderr)
+        return 1
+    query_times = tuple(clock.parse_time(text) for text in args.at) if args.at else (clock.END_OF_DAY,)
+
+    started = time.perf_counter()
+    rows = run_manifests(contexts, args.output_dir, args.workers, args.format, query_times)
+    failed = [row for row in rows if row['status'] != 'ok']
+    print(f"Planned {len(rows) - len(failed)}/{len(rows)} manifests in {time.perf_counter() - started:.2f}s; "
+          f"summary in {os.path.join(args.output_dir, 'summary.csv')}")
+    for row in failed:
+        print(f"  {row['manifest']}: {row['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import clock
+import locations as dist
+import parcels
+import plan
+import routing
+import scheduling
+import van
+
+# Departure and driver of each truck in a depot's fleet, mirroring van.fleet
+DEFAULT_TRUCKS = (('08:00:00', 1), ('09:05:00', 2), ('10:20:00', 1))
+
+# Packages per truck, as DeliveryVehicle.max_cargo
+TRUCK_CAPACITY = 16
+
+Depot = namedtuple('Depot', ['depot_id', 'address', 'trucks', 'cost_per_mile'],
+                   defaults=(DEFAULT_TRUCKS, 1.0))
+
+MultiDepotResult = namedtuple('MultiDepotResult', ['fleet', 'depot_of_parcel', 'depot_of_vehicle'])
+
+# Parcels that must share a truck, the truck they must ride (None = any), when they can
+# leave the hub (arrival and address correction) and their earliest deadline
+DepotUnit = namedtuple('DepotUnit', ['tracking_ids', 'truck', 'ready_time', 'deadline'])
+
+
+def depot_distance_table(depot_indices, distances):
+    """
+    Precomputes the distance from every location to every depot.
+    Time Complexity: O(n * d) where n is number of locations and d is number of depots
+
+    Args:
+        depot_indices (list[int]): Location index of each depot
+        distances (list[list[float]]): Distance matrix
+    Returns:
+        numpy.ndarray: (n, d) miles, inf where a distance is missing
+    """
+    # Only the depot columns are read, so distance oracles are never expanded to n x n
+    table = np.full((len(distances), len(depot_indices)), np.inf)
+    for row in range(len(distances)):
+        for column, depot in enumerate(depot_indices):
+            value = distances[row][depot]
+            if value is None:
+                value = distances[depot][row]
+            if value is not None:
+                table[row, column] = value
+    return table
+
+
+def depot_units(parcel_list, constraint_set=None):
+    """
+    Groups parcels into the units that must ride one truck together.
+    Time Complexity: O(n) where n is number of parcels
+
+    Returns:
+        list[DepotUnit]: Units in manifest order
+    Raises:
+        ValueError: If a group's members are restricted to different trucks
+    """
+    constraint_set = constraint_set if constraint_set is not None else parcels.delivery_constraints
+    by_id = {parcel.tracking_id: parcel for parcel in parcel_list}
+    units, seen = [], set()
+    for parcel in parcel_list:
+        if parcel.tracking_id in seen:
+            continue
+        group = constraint_set.group_of(parcel.tracking_id) or {parcel.tracking_id}
+        members = tuple(sorted(tracking_id for tracking_id in group if tracking_id in by_id))
+        seen.update(members)
+        trucks = {constraint_set.truck_for(tracking_id) for tracking_id in members} - {None}
+        if len(trucks) > 1:
+            raise ValueError(f"Packages {list(members)} must ride together but are restricted "
+                             f"to trucks {sorted(trucks)}")
+        units.append(DepotUnit(members, trucks.pop() if trucks else None,
+                               scheduling.trip_ready_time(members, constraint_set, day_start=0),
+                               min(by_id[tracking_id].deadline for tracking_id in members)))
+    return units
+
+
+def _may_ride(unit, vehicle):
+    """Helper function checking a unit's truck restriction and that the truck leaves after it is ready"""
+    return (unit.truck is None or unit.truck == vehicle.id) and vehicle.leave_time >= unit.ready_time
+
+
+def load_depot(units, trucks):
+    """
+    Loads a depot's units across its own trucks. Units with the fewest trucks they may ride
+    go first; deadline units take the earliest eligible departure with room and the rest
+    the eligible truck with the most room, so every truck is used.
+    Time Complexity: O(u log u + u * v) where u is number of units and v is number of trucks
+
+    Args:
+        units (list[DepotUnit]): Units assigned to the depot
+        trucks (list[DeliveryVehicle]): The depot's trucks
+    Returns:
+        dict: Vehicle ID -> tracking IDs loaded on it
+    Raises:
+        ValueError: If a unit fits on no truck it may ride
+    """
+    loads = {vehicle.id: [] for vehicle in trucks}
+    by_departure = sorted(trucks, key=lambda vehicle: (vehicle.leave_time, vehicle.id))
+    order = sorted(units, key=lambda unit: (sum(_may_ride(unit, vehicle) for vehicle in trucks),
+                                            unit.deadline, -len(unit.tracking_ids), unit.tracking_ids))
+    for unit in order:
+        fits = [vehicle for vehicle in by_departure if _may_ride(unit, vehicle)
+                and len(loads[vehicle.id]) + len(unit.tracking_ids) <= vehicle.max_cargo]
+        if not fits:
+            raise ValueError(f"No truck can take package(s) {', '.join(map(str, unit.tracking_ids))}")
+        if unit.deadline < clock.END_OF_DAY:
+            chosen = fits[0]
+        else:
+            chosen = max(fits, key=lambda vehicle: vehicle.max_cargo - len(loads[vehicle.id]))
+        loads[chosen.id].extend(unit.tracking_ids)
+    return loads
+
+
+def assign_parcels_to_depots(parcel_list, depots, depot_indices, distances, constraint_set=None, fleets=None):
+    """
+    Assigns each parcel to its cheapest depot (miles times the depot's cost per mile).
+    Co-delivery groups go to one depot together. Units with the most to lose from a
+    second choice are placed first, and a full depot (trucks x capacity) falls back to the next.
+    Given the depots' fleets, a unit only goes to a depot with a truck it may ride: the truck
+    a "Can only be on truck N" parcel names, or one leaving after the parcel arrives and
+    after its address correction.
+    Time Complexity: O(n log n + n * v) where n is number of parcels and v is number of vehicles
+
+    Args:
+        parcel_list (list[Parcel]): Parcels to assign
+        depots (list[Depot]): Candidate depots
+        depot_indices (list[int]): Location index of each depot
+        distances (list[list[float]]): Distance matrix
+        constraint_set (ConstraintSet): Compiled constraints (defaults to the loaded manifest)
+        fleets (list[list[DeliveryVehicle]]): Trucks of each depot, numbered as the merged fleet
+    Returns:
+        dict: Tracking ID -> depot ID
+    Raises:
+        ValueError: If a parcel cannot reach any depot or every depot it may use is full
+    """
+    table = depot_distance_table(depot_indices, distances)
+    costs_per_mile = np.array([depot.cost_per_mile for depot in depots], dtype=np.float64)
+    if fleets is None:
+        remaining = [len(depot.trucks) * TRUCK_CAPACITY for depot in depots]
+    else:
+        remaining = [sum(vehicle.max_cargo for vehicle in trucks) for trucks in fleets]
+
+    # Parcels that must ride together form one assignment unit
+    stop_of = {parcel.tracking_id: dist.get_location_index(parcel.destination) for parcel in parcel_list}
+    units = []
+    for unit in depot_units(parcel_list, constraint_set):
+        cost = table[[stop_of[tracking_id] for tracking_id in unit.tracking_ids]].sum(axis=0) * costs_per_mile
+        if fleets is not None:
+            allowed = [any(_may_ride(unit, vehicle) for vehicle in trucks) for trucks in fleets]
+            cost = np.where(allowed, cost, np.inf)
+        units.append((unit, cost))
+
+    def regret(entry):
+        # A unit with a single usable depot has everything to lose, so it goes first
+        ordered = np.sort(entry[1][np.isfinite(entry[1])])
+        if len(ordered) < 2:
+            return np.inf if len(entry[1]) > 1 else 0.0
+        return ordered[1] - ordered[0]
+
+    assignment = {}
+    for unit, cost in sorted(units, key=regret, reverse=True):
+        for choice in np.argsort(cost, kind='stable'):
+            if np.isfinite(cost[choice]) and remaining[choice] >= len(unit.tracking_ids):
+                remaining[choice] -= len(unit.tracking_ids)
+                for tracking_id in unit.tracking_ids:
+                    assignment[tracking_id] = depots[choice].depot_id
+                break
+        else:
+            raise ValueError(f"No depot can take package(s) {', '.join(map(str, unit.tracking_ids))}")
+    return assignment
+
+
+def route_depot(depot_index, stop_lists, return_flags, distances):
+    """
+    Routes one depot's trucks. Pure function of its inputs so it can run in a worker process.
+    Time Complexity: O(n³) where n is number of stops per truck
+
+    Args:
+        depot_index (int): Location index of the depot
+        stop_lists (list[list[int]]): Delivery stops of each truck
+        return_flags (list[bool]): Whether each truck returns to the depot
+        distances (list[list[float]]): Distance matrix
+    Returns:
+        list[list[int]]: Optimized route of each truck
+    """
+    routes = []
+    for stops, returns in zip(stop_lists, return_flags):
+        route = [depot_index] + stops + ([depot_index] if returns else [])
+        routes.append(routing._optimize_route(route, distances))
+    return routes
+
+
+def plan_multi_depot(depots, distances=None, workers=None, speed_profile=None):
+    """
+    Plans the loaded manifest across several depots sharing one distance table.
+    Parcels are assigned to depots, packed across each depot's own trucks, and each
+    depot's fleet is routed in its own worker process. The merged fleet numbers trucks
+    consecutively; depot_of_vehicle maps each truck back to its depot, and a
+    "Can only be on truck N" parcel rides truck N of the merged fleet. Each depot has its
+    own crew: its trucks' operator numbers are shifted past the previous depots' drivers.
+    Parcels addressed to a depot are delivered when their truck leaves it.
+    Time Complexity: O(n³ / w) where n is number of delivery points and w is number of workers
+
+    Args:
+        depots (list[Depot]): Depots to plan from
+        distances (list[list[float]]): Distance matrix (defaults to distances.csv)
+        workers (int): Worker processes (1 routes in this process)
+        speed_profile (SpeedProfile | ZonedSpeedProfile): Time-of-day speeds (None = constant)
+    Returns:
+        MultiDepotResult: Merged fleet with delivery times set, and the depot assignments
+    Raises:
+        ValueError: If a depot address is unknown or a parcel cannot be placed on any truck
+    """
+    if distances is None:
+        distances = dist.import_distances()
+    depot_indices = [dist.get_location_index(depot.address) for depot in depots]
+    manifest = parcels.read_parcels()
+
+    # The merged fleet numbers trucks consecutively across depots; "truck N" means fleet truck N
+    fleets, fleet, depot_of_vehicle = [], [], {}
+    driver_offset = 0
+    for depot, depot_index in zip(depots, depot_indices):
+        trucks = []
+        for departure, operator in depot.trucks:
+            # Each depot has its own crew, so its driver numbers follow the previous depot's
+            vehicle = van.DeliveryVehicle(len(fleet) + 1, departure, driver_offset + operator)
+            vehicle.depot = depot_index
+            vehicle.speed_profile = speed_profile
+            fleet.append(vehicle)
+            depot_of_vehicle[vehicle.id] = depot.depot_id
+            trucks.append(vehicle)
+        fleets.append(trucks)
+        driver_offset += max((operator for _, operator in depot.trucks), default=0)
+
+    depot_of_parcel = assign_parcels_to_depots(manifest, depots, depot_indices, distances, fleets=fleets)
+
+    # Load each depot's parcels across its own trucks, honoring the usual loading rules
+    jobs = []
+    for depot, depot_index, trucks in zip(depots, depot_indices, fleets):
+        members = [p for p in manifest if depot_of_parcel[p.tracking_id] == depot.depot_id]
+        loads = load_depot(depot_units(members), trucks)
+        loaded = sum(len(tracking_ids) for tracking_ids in loads.values())
+        if loaded != len(members):
+            raise ValueError(f"Depot {depot.depot_id} loaded {loaded} of its {len(members)} packages")
+        for vehicle in trucks:
+            for tracking_id in loads[vehicle.id]:
+                package = parcels.delivery_registry.locate_parcel(tracking_id)
+                # The truck leaves after any address correction, so it goes to the corrected address
+                change = parcels.delivery_constraints.address_change(tracking_id)
+                if change is not None:
+                    package.destination, package.dest_zip = change[1], change[2]
+                vehicle.shipments.append(package)
+                package.assigned_vehicle = vehicle.id
+                package.start_time = vehicle.leave_time
+        # Parcels addressed to the depot itself are handed over at departure, not routed
+        stop_lists = []
+        for vehicle in trucks:
+            stops = []
+            for package in vehicle.shipments:
+                stop = dist.get_location_index(package.destination)
+                if stop != depot_index and stop not in stops:
+                    stops.append(stop)
+            stop_lists.append(stops)
+        # As with the single hub, only each depot's first truck returns
+        jobs.append((trucks, (depot_index, stop_lists, [i == 0 for i in range(len(trucks))], distances)))
+
+    if workers == 1 or len(jobs) == 1:
+        results = [route_depot(*arguments) for _, arguments in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(route_depot, *zip(*(arguments for _, arguments in jobs))))
+
+    addresses = dist.import_addresses()
+    for (trucks, _), routes in zip(jobs, results):
+        for vehicle, route in zip(trucks, routes):
+            vehicle.route = route
+            routing._verify_delivery_times(vehicle, distances, addresses)
+            for package in vehicle.shipments:
+                if dist.get_location_index(package.destination) == vehicle.depot:
+                    package.delivery_time = vehicle.leave_time
+
+    return MultiDepotResult(fleet, depot_of_parcel, depot_of_vehicle)
+
+
+def plan_multi_depot_snapshot(depots, distances=None, workers=None, version=1, speed_profile=None):
+    """
+    Plans across depots and freezes the merged fleet into one DeliveryPlan.
+    Time Complexity: see plan_multi_depot()
+
+    Returns:
+        tuple: (DeliveryPlan, MultiDepotResult)
+    """
+    if distances is None:
+        distances = dist.import_distances()
+    result = plan_multi_depot(depots, distances, workers, speed_profile)
+    snapshot = plan.build_plan(result.fleet, distances, dist.import_addresses(), version=version)
+
+    # Parcels addressed to a depot are delivered as their truck leaves it
+    records = dict(snapshot.parcels)
+    for vehicle in result.fleet:
+        for package in vehicle.shipments:
+            if dist.get_location_index(package.destination) == vehicle.depot:
+                records[package.tracking_id] = records[package.tracking_id]._replace(delivery_time=vehicle.leave_time)
+    return plan.DeliveryPlan(records, snapshot.vehicles, snapshot.version), result
@@ -0,0 +1,251 @@
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+import route_evaluation
+
+try:
+    import numba
+except ImportError:  # Optional: without Numba the kernels run as plain Python
+    numba = None
+
+# 'numba' when the kernels are compiled, 'python' otherwise
+BACKEND = 'numba' if numba is not None else 'python'
+
+# Whether routing sends its 3-opt and swap searches through the kernels
+ENABLED = numba is not None
+
+_last_matrix = (None, None)
+
+
+def _kernel(function):
+    """Helper function compiling a kernel with Numba when it is installed"""
+    return numba.njit(cache=True)(function) if numba is not None else function
+
+
+@_kernel
+def route_cost(route, matrix):
+    """
+    Total distance of a route, summing legs in route order like locations.calculate_distance().
+    Time Complexity: O(n) where n is route length
+    """
+    total = 0.0
+    for position in range(len(route) - 1):
+        total += matrix[route[position]][route[position + 1]]
+    return total
+
+
+@_kernel
+def _three_opt_cost(route, matrix, i, j, k):
+    """
+    Helper function returning the distance of route with route[i..j] and route[j+1..k]
+    each reversed, without building the new route
+    """
+    previous = route[0]
+    total = 0.0
+    for position in range(1, len(route)):
+        if position < i or position > k:
+            current = route[position]
+        elif position <= j:
+            current = route[i + j - position]
+        else:
+            current = route[j + 1 + k - position]
+        total += matrix[previous][current]
+        previous = current
+    return total
+
+
+@_kernel
+def greedy_swap(route, matrix):
+    """
+    Swaps pairs of interior stops while any swap shortens the route, in place, with the
+    acceptance order of routing._greedy_improve().
+    Time Complexity: O(p * n³) for p improving passes over a route of length n
+
+    Returns:
+        float: Distance of the improved route
+    """
+    current = route_cost(route, matrix)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route) - 2):
+            for j in range(i + 1, len(route) - 1):
+                route[i], route[j] = route[j], route[i]
+                candidate = route_cost(route, matrix)
+                if candidate < current:
+                    current = candidate
+                    improved = True
+                else:
+                    route[i], route[j] = route[j], route[i]
+    return current
+
+
+@_kernel
+def three_opt_scan(route, matrix, best_distance):
+    """
+    Scans every segment-reversal move of routing._optimize_route() over route and keeps
+    the last move that beats the running best, as the Python search does.
+    Time Complexity: O(n⁴) where n is route length
+
+    Returns:
+        tuple: (i, j, k, distance) of the kept move, or i = -1 when no move beats best_distance
+    """
+    best = (-1, -1, -1, best_distance)
+    for i in range(1, len(route) - 3):
+        for j in range(i + 1, len(route) - 2):
+            for k in range(j + 1, len(route) - 1):
+                distance = _three_opt_cost(route, matrix, i, j, k)
+                if distance < best[3]:
+                    best = (i, j, k, distance)
+    return best
+
+
+def prepare_matrix(distances):
+    """
+    The distance matrix in the form the kernels take: a dense float64 array for Numba,
+    or the same values as lists for the Python backend. The last conversion is reused
+    while the planner keeps passing the same matrix.
+    Time Complexity: O(n²) on a new matrix, O(1) on a repeat
+
+    Args:
+        distances (list[list[float]]): Distance matrix (missing entries read from the other direction)
+    Returns:
+        numpy.ndarray | list[list[float]]: Matrix for the kernels
+    """
+    global _last_matrix
+    source, prepared = _last_matrix
+    if source is not distances:
+        prepared = route_evaluation.dense_matrix(distances)
+        if numba is None:
+            prepared = prepared.tolist()
+        _last_matrix = (distances, prepared)
+    return prepared
+
+
+def _route_values(route):
+    """Helper function converting a route to the kernels' sequence type"""
+    return np.array(route, dtype=np.int64) if numba is not None else list(route)
+
+
+def supports(route, distances):
+    """
+    Whether the kernels can search this route: the distances must be a matrix (not a
+    DistanceOracle) with a recorded distance between every pair of the route's stops.
+    Otherwise the Python search runs and reports the problem as before.
+    Time Complexity: O(n² + m²) where m is number of distinct stops
+    """
+    if hasattr(distances, 'distance') or len(route) < 2:
+        return False
+    stops = sorted(set(route))
+    if stops[0] < 0 or stops[-1] >= len(distances):
+        return False
+    matrix = prepare_matrix(distances)
+    block = np.asarray(matrix)[np.ix_(stops, stops)]
+    return not np.isnan(block).any()
+
+
+def greedy_improve(route, distances):
+    """
+    Kernel version of routing._greedy_improve(). Time Complexity: O(p * n³)
+
+    Returns:
+        list[int]: Improved route
+    """
+    values = _route_values(route)
+    greedy_swap(values, prepare_matrix(distances))
+    return [int(stop) for stop in values]
+
+
+def optimize_route(route, distances, max_iterations=100):
+    """
+    Kernel version of routing._optimize_route(): the same swap pass, then the same
+    segment-reversal scan over the original route, giving the same route.
+    Time Complexity: O(n⁴) where n is route length
+
+    Returns:
+        list[int]: Optimized route
+    """
+    matrix = prepare_matrix(distances)
+    values = _route_values(route)
+    best = _route_values(route)
+    best_distance = greedy_swap(best, matrix)
+    best_route = [int(stop) for stop in best]
+
+    for _ in range(max_iterations):
+        i, j, k, distance = three_opt_scan(values, matrix, best_distance)
+        if i < 0:
+            break
+        best_distance = distance
+        best_route = route[:i] + route[i:j + 1][::-1] + route[j + 1:k + 1][::-1] + route[k + 1:]
+    return list(best_route)
+
+
+def _random_matrix(size, rng):
+    """Helper function building a symmetric lower-triangular matrix with missing upper entries"""
+    return [[round(rng.uniform(0.5, 12.0), 1) if col <= row else None for col in range(size)]
+            for row in range(size)]
+
+
+def compare_backends(routes, distances):
+    """
+    Runs routing's Python search and the kernels on the same routes. Only a check of
+    the compiled kernels when ENABLED; without Numba both sides run as Python.
+    Time Complexity: O(r * n⁴) for r routes of length n
+
+    Returns:
+        tuple: (number of routes whose results differ, Python seconds, kernel seconds)
+    """
+    import routing
+
+    global ENABLED
+    enabled, ENABLED = ENABLED, False
+    try:
+        started = time.perf_counter()
+        expected = [routing._optimize_route(list(route), distances) for route in routes]
+        python_seconds = time.perf_counter() - started
+    finally:
+        ENABLED = enabled
+
+    optimize_route(list(routes[0]), distances)  # Compile before timing
+    started = time.perf_counter()
+    actual = [optimize_route(list(route), distances) for route in routes]
+    kernel_seconds = time.perf_counter() - started
+    return sum(a != e for a, e in zip(actual, expected)), python_seconds, kernel_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and time the optimizer kernels against the Python search")
+    parser.add_argument("--routes", type=int, default=20, help="random routes per case")
+    parser.add_argument("--stops", type=int, default=12, help="delivery stops per route")
+    parser.add_argument("--seed", type=int, default=950)
+    args = parser.parse_args(argv)
+
+    import locations
+    rng = random.Random(args.seed)
+    cases = [('distances.csv', locations.import_distances()),
+             ('random 60', _random_matrix(60, rng))]
+    print(f"Kernel backend: {BACKEND}")
+    if not ENABLED:
+        print("Numba is not installed: the kernels would run as plain Python, so there is "
+              "nothing to compare or time; skipping")
+        return 0
+    mismatches = 0
+    for name, distances in cases:
+        stops = min(args.stops, len(distances) - 1)
+        routes = []
+        for number in range(args.routes):
+            route = [0] + rng.sample(range(1, len(distances)), stops)
+            routes.append(route + [0] if number % 2 == 0 else route)
+        differ, python_seconds, kernel_seconds = compare_backends(routes, distances)
+        mismatches += differ
+        print(f"{name:<14} {len(routes)} routes x {stops} stops: python {python_seconds:.3f}s, "
+              f"{BACKEND} {kernel_seconds:.3f}s, {'identical' if not differ else f'{differ} differ'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
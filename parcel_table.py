@@ -0,0 +1,329 @@
+import bisect
+import tracemalloc
+from array import array
+
+import parcels
+
+# Sentinel for "no value" in integer columns
+NONE = -1
+
+STATUSES = ("at hub", "en route", "delivered")
+
+
+class StringPool:
+    """
+    Stores each distinct string once and refers to it by a small integer code.
+    """
+
+    __slots__ = ('values', '_codes')
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value):
+        """
+        Returns the code for a string, adding it to the pool if new.
+        Time Complexity: O(1) average
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ParcelTable:
+    """
+    Structure-of-arrays parcel storage.
+    Every parcel is one row across typed columns (array module); repeated strings such
+    as addresses, cities and special instructions are pooled. ParcelView objects give
+    the familiar Parcel attribute API over a row without storing per-parcel objects.
+    """
+
+    def __init__(self):
+        """
+        Initializes empty columns and string pools.
+        Time Complexity: O(1)
+        """
+        self.tracking_ids = array('q')
+        self.deadlines = array('i')
+        self.weights = array('f')
+        self.destinations = array('i')
+        self.cities = array('i')
+        self.states = array('i')
+        self.zip_codes = array('i')
+        self.weight_units = array('i')
+        self.volumes = array('f')
+        self.instructions = array('i')
+        self.vehicles = array('h')
+        self.start_times = array('i')
+        self.delivery_times = array('i')
+        self.statuses = array('b')
+        self.strings = StringPool()
+        self._sorted = True
+
+    def __len__(self):
+        return len(self.tracking_ids)
+
+    def append(self, tracking_id, destination, city, state, zip_code, deadline, weight_value,
+               weight_unit, special_instructions, vehicle_id=None, volume=None):
+        """
+        Adds one parcel row. Deadline is in seconds since midnight; volume is optional.
+        Time Complexity: O(1) amortized
+        """
+        if self.tracking_ids and tracking_id <= self.tracking_ids[-1]:
+            self._sorted = False
+        pool = self.strings
+        self.tracking_ids.append(tracking_id)
+        self.deadlines.append(deadline)
+        self.weights.append(float('nan') if weight_value is None else weight_value)
+        self.destinations.append(pool.encode(destination))
+        self.cities.append(pool.encode(city))
+        self.states.append(pool.encode(state))
+        self.zip_codes.append(pool.encode(zip_code))
+        self.weight_units.append(pool.encode(weight_unit))
+        self.volumes.append(float('nan') if volume is None else volume)
+        self.instructions.append(pool.encode(special_instructions))
+        self.vehicles.append(NONE if vehicle_id is None else vehicle_id)
+        self.start_times.append(NONE)
+        self.delivery_times.append(NONE)
+        self.statuses.append(0)
+        return len(self.tracking_ids) - 1
+
+    def append_parcel(self, parcel):
+        """
+        Copies a Parcel object into a new row.
+        Time Complexity: O(1) amortized
+        """
+        row = self.append(parcel.tracking_id, parcel.destination, parcel.dest_city, parcel.dest_state,
+                          parcel.dest_zip, parcel.deadline, parcel.weight_value, parcel.weight_unit,
+                          parcel.special_instructions, parcel.assigned_vehicle, parcel.volume)
+        if parcel.start_time is not None:
+            self.start_times[row] = parcel.start_time
+        if parcel.delivery_time is not None:
+            self.delivery_times[row] = parcel.delivery_time
+        self.statuses[row] = STATUSES.index(parcel.status) if parcel.status in STATUSES else 1
+        return row
+
+    @classmethod
+    def from_registry(cls, registry=None):
+        """
+        Builds a table from every parcel in a ParcelRegistry, ordered by tracking ID.
+        Time Complexity: O(n log n) where n is number of parcels
+        """
+        registry = registry if registry is not None else parcels.delivery_registry
+        table = cls()
+        entries = sorted((entry for bucket in registry.storage for entry in bucket), key=lambda e: e[0])
+        for _, parcel in entries:
+            table.append_parcel(parcel)
+        return table
+
+    def _sort_rows(self):
+        """Helper function to reorder all columns by tracking ID"""
+        order = sorted(range(len(self.tracking_ids)), key=self.tracking_ids.__getitem__)
+        for name in ('tracking_ids', 'deadlines', 'weights', 'destinations', 'cities', 'states',
+                     'zip_codes', 'weight_units', 'volumes', 'instructions', 'vehicles', 'start_times',
+                     'delivery_times', 'statuses'):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, (column[i] for i in order)))
+        self._sorted = True
+
+    def row_of(self, tracking_id):
+        """
+        Finds a parcel's row by binary search over the sorted ID column.
+        Time Complexity: O(log n)
+
+        Raises:
+            LookupError: If package not found
+        """
+        if not self._sorted:
+            self._sort_rows()
+        row = bisect.bisect_left(self.tracking_ids, tracking_id)
+        if row == len(self.tracking_ids) or self.tracking_ids[row] != tracking_id:
+            raise LookupError(f"Package #{tracking_id} not found")
+        return row
+
+    def view(self, tracking_id):
+        """
+        Returns a lightweight Parcel-compatible view of a row.
+        Time Complexity: O(log n)
+        """
+        return ParcelView(self, self.row_of(tracking_id))
+
+    def __iter__(self):
+        if not self._sorted:
+            self._sort_rows()
+        for row in range(len(self.tracking_ids)):
+            yield ParcelView(self, row)
+
+    def nbytes(self):
+        """
+        Bytes held by the columns (excluding the shared string pool).
+        Time Complexity: O(1)
+        """
+        return sum(column.itemsize * len(column) for column in (
+            self.tracking_ids, self.deadlines, self.weights, self.destinations, self.cities,
+            self.states, self.zip_codes, self.weight_units, self.instructions, self.vehicles,
+            self.start_times, self.delivery_times, self.statuses))
+
+
+def _optional(value):
+    """Helper function to map the NONE sentinel back to None"""
+    return None if value == NONE else value
+
+
+class ParcelView:
+    """
+    Row view exposing the Parcel attribute API over a ParcelTable.
+    Reads and writes go straight to the table columns.
+    """
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    tracking_id = property(lambda self: self._table.tracking_ids[self._row])
+    deadline = property(lambda self: self._table.deadlines[self._row])
+    dest_city = property(lambda self: self._table.strings.values[self._table.cities[self._row]])
+    dest_state = property(lambda self: self._table.strings.values[self._table.states[self._row]])
+    weight_unit = property(lambda self: self._table.strings.values[self._table.weight_units[self._row]])
+    special_instructions = property(
+        lambda self: self._table.strings.values[self._table.instructions[self._row]])
+
+    @property
+    def destination(self):
+        return self._table.strings.values[self._table.destinations[self._row]]
+
+    @destination.setter
+    def destination(self, value):
+        self._table.destinations[self._row] = self._table.strings.encode(value)
+
+    @property
+    def dest_zip(self):
+        return self._table.strings.values[self._table.zip_codes[self._row]]
+
+    @dest_zip.setter
+    def dest_zip(self, value):
+        self._table.zip_codes[self._row] = self._table.strings.encode(value)
+
+    @property
+    def weight_value(self):
+        value = self._table.weights[self._row]
+        return None if value != value else value
+
+    @property
+    def weight(self):
+        if self.weight_value is None:
+            return self.weight_unit
+        return f"{self.weight_value:g} {self.weight_unit}"
+
+    @property
+    def weight_kg(self):
+        return parcels.weight_in_kilograms(self.weight_value, self.weight_unit)
+
+    @property
+    def volume(self):
+        value = self._table.volumes[self._row]
+        return None if value != value else value
+
+    @volume.setter
+    def volume(self, value):
+        self._table.volumes[self._row] = float('nan') if value is None else value
+
+    @property
+    def status(self):
+        return STATUSES[self._table.statuses[self._row]]
+
+    @status.setter
+    def status(self, value):
+        # Accept 'en route 2' style values produced by parcels.update_status
+        self._table.statuses[self._row] = 1 if value.startswith("en route") else STATUSES.index(value)
+
+    @property
+    def assigned_vehicle(self):
+        return _optional(self._table.vehicles[self._row])
+
+    @assigned_vehicle.setter
+    def assigned_vehicle(self, value):
+        self._table.vehicles[self._row] = NONE if value is None else value
+
+    @property
+    def start_time(self):
+        return _optional(self._table.start_times[self._row])
+
+    @start_time.setter
+    def start_time(self, value):
+        self._table.start_times[self._row] = NONE if value is None else value
+
+    @property
+    def delivery_time(self):
+        return _optional(self._table.delivery_times[self._row])
+
+    @delivery_time.setter
+    def delivery_time(self, value):
+        self._table.delivery_times[self._row] = NONE if value is None else value
+
+    def __str__(self):
+        return parcels.Parcel.__str__(self)
+
+
+def measure_bytes_per_parcel(count=100000):
+    """
+    Measures allocated bytes per parcel for Parcel objects and for a ParcelTable,
+    using synthetic parcels cycled from the manifest.
+    Time Complexity: O(n) where n is count
+
+    Returns:
+        dict: Bytes per parcel for 'objects' and 'table'
+    """
+    template = []
+    for bucket in parcels.delivery_registry.storage:
+        template.extend(parcel for _, parcel in bucket)
+    if not template:
+        parcels.import_parcels()
+        return measure_bytes_per_parcel(count)
+    template.sort(key=lambda p: p.tracking_id)
+
+    def fresh(text):
+        # New string object per row, as a CSV reader would produce
+        return (text + ' ')[:-1]
+
+    def rows():
+        for i in range(count):
+            p = template[i % len(template)]
+            yield (i + 1, fresh(p.destination), fresh(p.dest_city), fresh(p.dest_state), fresh(p.dest_zip),
+                   fresh(p.weight), p.deadline, fresh(p.special_instructions))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = []
+    for tracking_id, destination, city, state, zip_code, weight, deadline, notes in rows():
+        parcel = parcels.Parcel(tracking_id, destination, city, state, zip_code, 'EOD', weight, notes)
+        parcel.deadline = deadline
+        objects.append(parcel)
+    object_bytes = tracemalloc.get_traced_memory()[0] - before
+    del objects
+
+    before = tracemalloc.get_traced_memory()[0]
+    table = ParcelTable()
+    for tracking_id, destination, city, state, zip_code, weight, deadline, notes in rows():
+        weight_value, weight_unit = parcels.parse_weight(weight)
+        table.append(tracking_id, destination, city, state, zip_code, deadline, weight_value,
+                     weight_unit, notes)
+    table_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return {'objects': object_bytes / count, 'table': table_bytes / count}
+
+
+if __name__ == "__main__":
+    results = measure_bytes_per_parcel()
+    print(f"Parcel objects (__slots__): {results['objects']:.1f} bytes/parcel")
+    print(f"ParcelTable columns:        {results['table']:.1f} bytes/parcel")
@@ -1,5 +1,8 @@
-import datetime
 import csv
+import sys
+
+import clock
+import constraints
 
 class ParcelRegistry:
     """
@@ -106,25 +109,68 @@ class ParcelRegistry:
             self.register_parcel(tracking_id, parcel_data)
 
 
+def parse_weight(weight_str):
+    """
+    Splits a manifest weight such as '21 Kilos' into a number and an interned unit.
+    Time Complexity: O(1)
+
+    Args:
+        weight_str (str): Weight text from the manifest
+    Returns:
+        tuple: (float or None if unparseable, unit string)
+    """
+    amount, _, unit = weight_str.strip().partition(' ')
+    try:
+        return float(amount), sys.intern(unit.strip())
+    except ValueError:
+        return None, sys.intern(weight_str.strip())
+
+
+# Manifest weight units (lower case) converted to kilograms for load planning
+KILOGRAMS_PER_UNIT = {'kilos': 1.0, 'kilo': 1.0, 'kg': 1.0, 'kgs': 1.0,
+                      'lbs': 0.45359237, 'lb': 0.45359237, 'pounds': 0.45359237}
+
+
+def weight_in_kilograms(amount, unit):
+    """
+    Converts a parsed manifest weight to kilograms.
+    Time Complexity: O(1)
+
+    Returns:
+        float: Kilograms, or None if the amount or unit is not understood
+    """
+    factor = KILOGRAMS_PER_UNIT.get(unit.lower())
+    if amount is None or factor is None:
+        return None
+    return amount * factor
+
+
 class Parcel:
     """
     Represents an individual delivery parcel with tracking and routing information.
+    Uses __slots__, interned location strings and a numeric weight to keep
+    per-parcel memory small on large manifests.
     """
 
+    __slots__ = ('tracking_id', 'destination', 'dest_city', 'dest_state', 'dest_zip', 'deadline',
+                 'weight_value', 'weight_unit', 'weight_kg', 'volume', 'special_instructions', 'status',
+                 'start_time', 'delivery_time', 'assigned_vehicle')
+
     def __init__(self, tracking_id, destination, city, state, zip_code, deadline,
-                 weight, special_instructions, assigned_vehicle=None):
+                 weight, special_instructions, assigned_vehicle=None, volume=None):
         """
         Initializes parcel with delivery requirements and tracking details.
         Time Complexity: O(1)
         """
         self.tracking_id = tracking_id
-        self.destination = destination
-        self.dest_city = city
-        self.dest_state = state
-        self.dest_zip = zip_code
+        self.destination = sys.intern(destination)
+        self.dest_city = sys.intern(city)
+        self.dest_state = sys.intern(state)
+        self.dest_zip = sys.intern(zip_code)
         self.deadline = self._parse_deadline(deadline)
         self.weight = weight
-        self.special_instructions = special_instructions
+        self.volume = volume  # Cubic units from the optional manifest column (None = not given)
+        self.special_instructions = sys.intern(special_instructions)
         self.status = "at hub"
         self.start_time = None
         self.delivery_time = None
@@ -132,50 +178,76 @@ class Parcel:
 
     def _parse_deadline(self, deadline_str):
         """
-        Parses deadline string into datetime object.
+        Parses deadline string into seconds since midnight.
         Time Complexity: O(1)
         """
         if deadline_str.strip().upper() == 'EOD':
-            return datetime.datetime.strptime('5:00 PM', '%I:%M %p')
+            return clock.END_OF_DAY
         try:
-            return datetime.datetime.strptime(deadline_str, '%I:%M %p')
+            return clock.parse_time(deadline_str)
         except ValueError:
             raise ValueError(f"Invalid deadline format: {deadline_str}")
 
+    @property
+    def weight(self):
+        """
+        Manifest-style weight text, e.g. '21 Kilos'.
+        Time Complexity: O(1)
+        """
+        if self.weight_value is None:
+            return self.weight_unit
+        return f"{self.weight_value:g} {self.weight_unit}"
+
+    @weight.setter
+    def weight(self, weight_str):
+        self.weight_value, self.weight_unit = parse_weight(weight_str)
+        self.weight_kg = weight_in_kilograms(self.weight_value, self.weight_unit)
+
     def __str__(self):
         """
         Provides formatted string representation of parcel details.
         Time Complexity: O(1)
         """
         status_str = f"{self.status}"
-        if self.delivery_time:
-            status_str += f" (Delivered at {self.delivery_time.strftime('%I:%M %p')})"
-        elif self.start_time:
-            status_str += f" (Started at {self.start_time.strftime('%I:%M %p')})"
+        if self.delivery_time is not None:
+            status_str += f" (Delivered at {clock.format_time(self.delivery_time)})"
+        elif self.start_time is not None:
+            status_str += f" (Started at {clock.format_time(self.start_time)})"
 
         return (f"Package #{self.tracking_id}: {self.destination}, {self.dest_city}, "
                 f"{self.dest_state} {self.dest_zip} | Weight: {self.weight} | "
-                f"Deadline: {self.deadline.strftime('%I:%M %p')} | Status: {status_str}")
+                f"Deadline: {clock.format_time(self.deadline)} | Status: {status_str}")
+
 
+# Delayed parcels arriving before these times ride on truck 1 / truck 2 respectively
+SECOND_DEPARTURE_CUTOFF = clock.parse_time('9:00')
+THIRD_DEPARTURE_CUTOFF = clock.parse_time('10:20')
 
 # Global registry instance
 delivery_registry = ParcelRegistry()
 
+# Constraints compiled from special instructions by import_parcels()
+delivery_constraints = constraints.ConstraintSet()
 
-def import_parcels():
+# Manifest read when no path is given (PlanningContext points this elsewhere)
+PARCELS_PATH = './data/parcels.csv'
+
+
+def read_parcels(path=None):
     """
-    Processes parcel data from CSV and organizes into vehicle loads.
+    Reads the parcel manifest, registers every parcel and compiles its constraints.
     Time Complexity: O(n) where n is number of packages
+
+    Args:
+        path (str): Manifest to read (defaults to PARCELS_PATH)
     Returns:
-        dict: Mapping of truck IDs to lists of package IDs
+        list[Parcel]: Parcels in manifest order
     """
-    vehicle_loads = {1: [], 2: [], 3: []}
-    processing_queue = []
-    grouped_parcels = set()
-#    EOD = datetime.datetime.strptime("5:00 PM", '%I:%M %p')
+    global delivery_constraints
+    manifest = []
 
     try:
-        with open('./data/parcels.csv') as parcel_data:
+        with open(path or PARCELS_PATH) as parcel_data:
             csv_parser = csv.reader(parcel_data)
 
             # Process each parcel entry
@@ -189,39 +261,76 @@ def import_parcels():
                 deadline = row[5].strip()
                 weight = row[6].strip()
                 special_instructions = row[7].strip()
+                # Optional ninth column: parcel volume
+                volume = float(row[8]) if len(row) > 8 and row[8].strip() else None
 
                 # Create and register parcel
                 new_parcel = Parcel(tracking_id, destination, city, state, zip_code,
-                                    deadline, weight, special_instructions)
+                                    deadline, weight, special_instructions, volume=volume)
                 delivery_registry.register_parcel(tracking_id, new_parcel)
-                processing_queue.append(new_parcel)
-
-        # Sort by deadline
-        processing_queue.sort(key=lambda p: p.deadline)
-
-        # Process special instructions and constraints
-        current_time = datetime.datetime.now().time()
-        for parcel in processing_queue[:]:
-            if parcel.special_instructions:
-                if 'Must be delivered with' in parcel.special_instructions:
-                    _handle_grouped_delivery(parcel, vehicle_loads, grouped_parcels)
-                elif 'Delayed' in parcel.special_instructions:
-                    _handle_delayed_delivery(parcel, vehicle_loads)
-                elif 'Wrong address' in parcel.special_instructions:
-                    vehicle_loads[3].append(parcel.tracking_id)
-                    processing_queue.remove(parcel)
-                elif 'Can only be on truck' in parcel.special_instructions:
-                    truck_num = int(parcel.special_instructions[-1])
-                    vehicle_loads[truck_num].append(parcel.tracking_id)
-                    processing_queue.remove(parcel)
-
-        # Distribute remaining packages
-        _distribute_remaining_packages(processing_queue, vehicle_loads)
-
-        return vehicle_loads
+                manifest.append(new_parcel)
 
     except FileNotFoundError:
         raise FileNotFoundError("parcels.csv file not found in data directory")
+
+    # Compile special instructions once
+    delivery_constraints = constraints.compile_constraints(manifest)
+    return manifest
+
+
+def plan_loads(parcel_list, constraint_set=None):
+    """
+    Organizes parcels into vehicle loads according to their special instructions.
+    Time Complexity: O(n log n) where n is number of packages
+
+    Args:
+        parcel_list (list[Parcel]): Parcels to load
+        constraint_set (ConstraintSet): Compiled constraints (defaults to the loaded manifest)
+    Returns:
+        dict: Mapping of truck IDs to lists of package IDs
+    """
+    constraint_set = constraint_set if constraint_set is not None else delivery_constraints
+    vehicle_loads = {1: [], 2: [], 3: []}
+    grouped_parcels = set()
+
+    # Sort by deadline
+    processing_queue = sorted(parcel_list, key=lambda p: p.deadline)
+
+    # Process special instructions and constraints
+    remaining = []
+    for parcel in processing_queue:
+        constraint = constraint_set.get(parcel.tracking_id)
+        if constraint.partners:
+            _handle_grouped_delivery(parcel, vehicle_loads, grouped_parcels)
+        elif constraint.available_time is not None:
+            _handle_delayed_delivery(parcel, constraint, vehicle_loads)
+        elif constraint.wrong_address:
+            vehicle_loads[3].append(parcel.tracking_id)
+            continue
+        elif constraint.truck is not None:
+            vehicle_loads[constraint.truck].append(parcel.tracking_id)
+            continue
+        remaining.append(parcel)
+
+    # Distribute remaining packages
+    _distribute_remaining_packages(remaining, vehicle_loads)
+
+    return vehicle_loads
+
+
+def import_parcels(path=None):
+    """
+    Processes parcel data from CSV and organizes into vehicle loads.
+    Time Complexity: O(n) where n is number of packages
+    Args:
+        path (str): Manifest to read (defaults to PARCELS_PATH)
+    Returns:
+        dict: Mapping of truck IDs to lists of package IDs
+    """
+    try:
+        return plan_loads(read_parcels(path))
+    except FileNotFoundError:
+        raise
     except Exception as e:
         raise Exception(f"Error importing parcels: {str(e)}")
 
@@ -233,24 +342,18 @@ def _handle_grouped_delivery(parcel, vehicle_loads, grouped_parcels):
         grouped_parcels.add(parcel.tracking_id)
 
 
-def _handle_delayed_delivery(parcel, vehicle_loads):
+def _handle_delayed_delivery(parcel, constraint, vehicle_loads):
     """Helper function to process delayed delivery requirements"""
-    arrival_time = None
-    for text in parcel.special_instructions.split():
-        if 'Wrong' in text:
-            parcel.destination = "410 S State St"
-            parcel.dest_zip = "84111"
-        elif ':' in text:
-            arrival_time = datetime.datetime.strptime(text, '%H:%M').time()
-            break
-
-    if arrival_time:
-        if arrival_time.hour < 9:
-            vehicle_loads[1].append(parcel.tracking_id)
-        elif arrival_time.hour < 10 or (arrival_time.hour == 10 and arrival_time.minute < 20):
-            vehicle_loads[2].append(parcel.tracking_id)
-        else:
-            vehicle_loads[3].append(parcel.tracking_id)
+    if constraint.corrected_address is not None:
+        parcel.destination, parcel.dest_zip = constraint.corrected_address
+
+    arrival_time = constraint.available_time
+    if arrival_time < SECOND_DEPARTURE_CUTOFF:
+        vehicle_loads[1].append(parcel.tracking_id)
+    elif arrival_time < THIRD_DEPARTURE_CUTOFF:
+        vehicle_loads[2].append(parcel.tracking_id)
+    else:
+        vehicle_loads[3].append(parcel.tracking_id)
 
 
 def _distribute_remaining_packages(queue, vehicle_loads):
@@ -275,15 +378,15 @@ def update_status(query_time):
     Time Complexity: O(n) where n is number of packages
 
     Args:
-        query_time: Time to check status
+        query_time (int): Time to check status, in seconds since midnight
     """
     for i in range(1, 41):
         try:
             parcel = delivery_registry.locate_parcel(i)
             if parcel:
-                if not parcel.start_time or query_time < parcel.start_time.time():
+                if parcel.start_time is None or query_time < parcel.start_time:
                     parcel.status = "at hub"
-                elif not parcel.delivery_time or query_time < parcel.delivery_time.time():
+                elif parcel.delivery_time is None or query_time < parcel.delivery_time:
                     parcel.status = f"en route {parcel.assigned_vehicle}"
                 else:
                     parcel.status = "delivered"
@@ -0,0 +1,268 @@
+import bisect
+import types
+from collections import namedtuple
+
+from address_resolver import AddressResolver
+import locations as dist
+import parcels
+import routing
+import speed_profiles
+import van
+
+ParcelRecord = namedtuple('ParcelRecord', [
+    'tracking_id', 'destination', 'city', 'state', 'zip_code', 'deadline', 'weight',
+    'special_instructions', 'vehicle_id', 'start_time', 'delivery_time', 'address_changes'
+])
+
+# driver_changes: (time, driver) when another driver takes the vehicle out, in time order
+VehicleTimeline = namedtuple('VehicleTimeline', [
+    'vehicle_id', 'operator', 'leave_time', 'speed', 'route', 'arrival_times', 'cumulative_miles',
+    'shipments', 'driver_changes'
+], defaults=((),))
+
+ParcelStatus = namedtuple('ParcelStatus', [
+    'tracking_id', 'destination', 'city', 'state', 'zip_code', 'deadline', 'weight',
+    'special_instructions', 'status', 'vehicle_id', 'start_time', 'delivery_time'
+])
+
+VehicleStatus = namedtuple('VehicleStatus', [
+    'vehicle_id', 'operator', 'status', 'location', 'distance_traveled', 'packages'
+])
+
+
+class DeliveryPlan:
+    """
+    Read-only snapshot of a finished delivery plan.
+    Answers parcel and vehicle status queries at any time of day without touching
+    the mutable Parcel and DeliveryVehicle objects it was built from.
+    """
+
+    def __init__(self, parcel_records, vehicle_timelines, version=1):
+        """
+        Stores precomputed parcel records and vehicle timelines.
+        Time Complexity: O(n) where n is number of parcels
+        """
+        self.version = version
+        self.parcels = types.MappingProxyType(dict(parcel_records))
+        self.vehicles = types.MappingProxyType(dict(vehicle_timelines))
+        self.parcel_ids = tuple(sorted(self.parcels))
+        self.vehicle_ids = tuple(sorted(self.vehicles))
+
+    def parcel_status(self, tracking_id, query_seconds):
+        """
+        Determines a parcel's status and effective address at a given time.
+        Time Complexity: O(log k) where k is number of address changes (usually O(1))
+
+        Args:
+            tracking_id (int): Package tracking identifier
+            query_seconds (int): Query time in seconds since midnight
+        Returns:
+            ParcelStatus: Status row for the parcel
+        Raises:
+            LookupError: If package not found
+        """
+        record = self.parcels.get(tracking_id)
+        if record is None:
+            raise LookupError(f"Package #{tracking_id} not found")
+
+        if record.start_time is None or query_seconds < record.start_time:
+            status = "at hub"
+        elif record.delivery_time is None or query_seconds < record.delivery_time:
+            status = "en route"
+        else:
+            status = "delivered"
+
+        destination, zip_code = record.destination, record.zip_code
+        if record.address_changes:
+            change_times = [change[0] for change in record.address_changes]
+            position = bisect.bisect_right(change_times, query_seconds) - 1
+            if position >= 0:
+                _, destination, zip_code = record.address_changes[position]
+
+        return ParcelStatus(record.tracking_id, destination, record.city, record.state, zip_code,
+                            record.deadline, record.weight, record.special_instructions, status,
+                            record.vehicle_id, record.start_time, record.delivery_time)
+
+    def all_parcel_statuses(self, query_seconds):
+        """
+        Yields status rows for every parcel in tracking ID order.
+        Time Complexity: O(n) where n is number of parcels
+        """
+        for tracking_id in self.parcel_ids:
+            yield self.parcel_status(tracking_id, query_seconds)
+
+    def vehicle_progress(self, vehicle_id, query_seconds):
+        """
+        Determines vehicle location and distance traveled at a given time.
+        Time Complexity: O(log n) where n is number of route points
+
+        Args:
+            vehicle_id (int): Vehicle identifier
+            query_seconds (int): Query time in seconds since midnight
+        Returns:
+            VehicleStatus: Status of the vehicle
+        Raises:
+            LookupError: If vehicle not found
+        """
+        timeline = self.vehicles.get(vehicle_id)
+        if timeline is None:
+            raise LookupError(f"Vehicle #{vehicle_id} not found")
+        packages = len(timeline.shipments)
+
+        if query_seconds < timeline.leave_time or len(timeline.route) < 2:
+            location = timeline.route[0] if timeline.route else 0
+            return VehicleStatus(vehicle_id, operator_at(timeline, query_seconds), "at hub", location, 0.0, packages)
+
+        # Last stop reached at or before the query time
+        stop = bisect.bisect_right(timeline.arrival_times, query_seconds) - 1
+        miles = timeline.cumulative_miles[stop]
+
+        if stop < len(timeline.route) - 1:
+            # Interpolate position between stops
+            leg_seconds = timeline.arrival_times[stop + 1] - timeline.arrival_times[stop]
+            leg_miles = timeline.cumulative_miles[stop + 1] - miles
+            if leg_seconds > 0:
+                miles += leg_miles * (query_seconds - timeline.arrival_times[stop]) / leg_seconds
+            status = "en route"
+        else:
+            status = "completed deliveries"
+
+        return VehicleStatus(vehicle_id, operator_at(timeline, query_seconds), status, timeline.route[stop], miles,
+                             packages)
+
+    def total_mileage(self, query_seconds):
+        """
+        Calculates combined fleet mileage at a given time.
+        Time Complexity: O(v log n) where v is number of vehicles
+        """
+        return sum(self.vehicle_progress(vehicle_id, query_seconds).distance_traveled
+                   for vehicle_id in self.vehicle_ids)
+
+
+def operator_at(timeline, query_seconds):
+    """
+    Driver of a vehicle at a given time: the timeline's operator until the first driver change.
+    Time Complexity: O(c) where c is number of driver changes (usually 0)
+    """
+    operator = timeline.operator
+    for change_time, driver in timeline.driver_changes:
+        if change_time > query_seconds:
+            break
+        operator = driver
+    return operator
+
+
+def _build_address_lookup(addresses):
+    """
+    Builds an address-to-index lookup backed by a cached AddressResolver.
+    Time Complexity: O(n) where n is number of addresses
+    """
+    resolver = AddressResolver(addresses)
+
+    def lookup(address):
+        result = resolver.resolve(address)
+        return None if result.ambiguous else result.index
+
+    return lookup
+
+
+def build_vehicle_timeline(vehicle, distances):
+    """
+    Precomputes arrival time and cumulative mileage for every stop of a vehicle route.
+    Time Complexity: O(n) where n is number of route points
+
+    Args:
+        vehicle (DeliveryVehicle): Vehicle with an assigned route
+        distances (list[list[float]]): Distance matrix
+    Returns:
+        VehicleTimeline: Immutable stop-by-stop timeline
+    """
+    leave_time = vehicle.leave_time
+    route = tuple(vehicle.route)
+    arrival_times, cumulative_miles = speed_profiles.route_arrival_times(
+        route, distances, leave_time, vehicle.speed, vehicle.speed_profile)
+
+    return VehicleTimeline(vehicle.id, vehicle.operator, leave_time, vehicle.speed, route,
+                           tuple(arrival_times), tuple(cumulative_miles),
+                           tuple(package.tracking_id for package in vehicle.shipments))
+
+
+def build_plan(fleet, distances, addresses, registry=None, version=1, constraint_set=None):
+    """
+    Builds an immutable DeliveryPlan from a routed fleet.
+    Time Complexity: O(n + r) where n is number of parcels and r is number of route points
+
+    Args:
+        fleet (list[DeliveryVehicle]): Vehicles with loaded shipments and routes
+        distances (list[list[float]]): Distance matrix
+        addresses (list[str]): Delivery addresses by location index
+        registry (ParcelRegistry): Registry holding unassigned parcels (defaults to global)
+        version (int): Plan version number
+        constraint_set (ConstraintSet): Compiled constraints (defaults to global)
+    Returns:
+        DeliveryPlan: Snapshot answering status queries
+    """
+    registry = registry if registry is not None else parcels.delivery_registry
+    constraint_set = constraint_set if constraint_set is not None else parcels.delivery_constraints
+    lookup = _build_address_lookup(addresses)
+    vehicle_timelines = {}
+    parcel_records = {}
+
+    for vehicle in fleet:
+        timeline = build_vehicle_timeline(vehicle, distances)
+        vehicle_timelines[vehicle.id] = timeline
+
+        # Later visits overwrite earlier ones, matching route verification
+        stop_times = {}
+        for stop, arrival in zip(timeline.route[1:], timeline.arrival_times[1:]):
+            stop_times[stop] = arrival
+
+        for package in vehicle.shipments:
+            point_index = lookup(package.destination)
+            parcel_records[package.tracking_id] = _make_record(
+                package, vehicle.id, timeline.leave_time, stop_times.get(point_index), constraint_set)
+
+    # Parcels never loaded onto a vehicle stay at the hub
+    for bucket in registry.storage:
+        for tracking_id, package in bucket:
+            if tracking_id not in parcel_records:
+                parcel_records[tracking_id] = _make_record(package, None, None, None, constraint_set)
+
+    return DeliveryPlan(parcel_records, vehicle_timelines, version)
+
+
+def _make_record(package, vehicle_id, start_time, delivery_time, constraint_set):
+    """Helper function to freeze a Parcel into a ParcelRecord"""
+    change = constraint_set.address_change(package.tracking_id)
+    address_changes = (change,) if change else ()
+
+    return ParcelRecord(package.tracking_id, package.destination, package.dest_city,
+                        package.dest_state, package.dest_zip, package.deadline,
+                        package.weight, package.special_instructions, vehicle_id,
+                        start_time, delivery_time, address_changes)
+
+
+def plan_deliveries(version=1, metric_closure=False, dynamic_schedule=False, speed_profile=None, pack_loads=False):
+    """
+    Runs delivery coordination and freezes the result into a DeliveryPlan.
+    Time Complexity: O(n³) where n is number of delivery points
+
+    Args:
+        version (int): Version number for the new plan
+        metric_closure (bool): Plan on shortest-path mileage instead of direct mileage
+        dynamic_schedule (bool): Let the trip scheduler choose departures and drivers
+        speed_profile (SpeedProfile | ZonedSpeedProfile): Time-of-day speeds (None = constant)
+        pack_loads (bool | str): Load trucks by count, weight and volume with the bin packer
+            ('spread' balances loads across every truck)
+    Returns:
+        DeliveryPlan: Snapshot of the freshly computed plan
+    """
+    # Coordinate distances already satisfy the triangle inequality, so closure is skipped for them
+    if metric_closure and not dist.COORDINATES_PATH:
+        import shortest_paths
+        distances = shortest_paths.metric_distances()
+    else:
+        distances = dist.import_distances()
+    routing.coordinate_deliveries(distances, dynamic_schedule=dynamic_schedule, speed_profile=speed_profile,
+                                  pack_loads=pack_loads)
+    return build_plan(van.fleet, distances, dist.import_addresses(), version=version)
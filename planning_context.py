@@ -0,0 +1,140 @@
+import os
+import threading
+
+import clock
+import locations as dist
+import parcels
+import plan
+import van
+
+DEFAULT_DATA_DIR = './data'
+
+# Planning still runs through module-level state; one context plans at a time per process
+_planning_lock = threading.Lock()
+
+
+class PlanningContext:
+    """
+    Everything needed to plan one day: where its data lives and how to plan it.
+    The context holds no module state of its own, so it pickles cheaply into worker
+    processes. plan() installs its data paths, fresh parcel state and a fresh address
+    resolver, runs the planner, and restores the previous settings afterwards.
+    """
+
+    def __init__(self, data_dir=None, distances_path=None, parcels_path=None, name=None,
+                 metric_closure=False, dynamic_schedule=False, speed_profile=None, coordinates_path=None,
+                 vehicles=None, speed=None, pack_loads=False):
+        """
+        Initializes a planning context.
+        Time Complexity: O(1)
+
+        Args:
+            data_dir (str): Directory holding distances.csv and parcels.csv (default ./data)
+            distances_path (str): Distance table, overriding data_dir
+            parcels_path (str): Parcel manifest, overriding data_dir
+            name (str): Label used in batch results (defaults to the data directory name)
+            metric_closure (bool): Plan on shortest-path mileage
+            dynamic_schedule (bool): Let the trip scheduler choose departures and drivers
+            speed_profile (SpeedProfile | ZonedSpeedProfile): Time-of-day speeds (None = constant)
+            coordinates_path (str): Address,latitude,longitude file; when given, distances are
+                computed from coordinates and distances_path is not read
+            vehicles (tuple[tuple]): (departure, operator) of each truck, planned with a temporary
+                fleet instead of van.fleet (None keeps the standard fleet)
+            speed (float): Constant speed in mph for every truck (None keeps the vehicle default)
+            pack_loads (bool | str): Load trucks with the weight-aware bin packer ('spread' balances them)
+        """
+        data_dir = data_dir or DEFAULT_DATA_DIR
+        self.distances_path = distances_path or os.path.join(data_dir, 'distances.csv')
+        self.parcels_path = parcels_path or os.path.join(data_dir, 'parcels.csv')
+        self.name = name or os.path.basename(os.path.normpath(data_dir))
+        self.metric_closure = metric_closure
+        self.dynamic_schedule = dynamic_schedule
+        self.speed_profile = speed_profile
+        self.coordinates_path = coordinates_path
+        self.vehicles = tuple(vehicles) if vehicles is not None else None
+        self.speed = speed
+        self.pack_loads = pack_loads
+
+    def __repr__(self):
+        return f"PlanningContext({self.name!r}, parcels={self.parcels_path!r}, distances={self.distances_path!r})"
+
+    def plan(self, version=1):
+        """
+        Plans this context's day and returns the immutable result.
+        Time Complexity: O(n³) where n is number of delivery points
+
+        Args:
+            version (int): Version number for the plan
+        Returns:
+            DeliveryPlan: Snapshot of the plan
+        Raises:
+            FileNotFoundError: If a data file is missing
+        """
+        for path in (self.coordinates_path or self.distances_path, self.parcels_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Data file not found: {path}")
+
+        with _planning_lock:
+            saved = (dist.DISTANCES_PATH, dist.COORDINATES_PATH, parcels.PARCELS_PATH, parcels.delivery_registry,
+                     parcels.delivery_constraints, dist._address_resolver, dist._distance_oracle)
+            saved_fleet = [(v.shipments, v.route, v.leave_time, v.operator, v.speed_profile) for v in van.fleet]
+            live_fleet = van.fleet
+            try:
+                if self.vehicles is not None or self.speed is not None:
+                    van.fleet = self._build_fleet(live_fleet)
+                dist.DISTANCES_PATH = self.distances_path
+                dist.COORDINATES_PATH = self.coordinates_path
+                parcels.PARCELS_PATH = self.parcels_path
+                parcels.delivery_registry = parcels.ParcelRegistry()
+                dist.reset_address_cache()
+                return plan.plan_deliveries(version=version, metric_closure=self.metric_closure,
+                                            dynamic_schedule=self.dynamic_schedule,
+                                            speed_profile=self.speed_profile, pack_loads=self.pack_loads)
+            finally:
+                van.fleet = live_fleet
+                (dist.DISTANCES_PATH, dist.COORDINATES_PATH, parcels.PARCELS_PATH, parcels.delivery_registry,
+                 parcels.delivery_constraints, dist._address_resolver, dist._distance_oracle) = saved
+                for vehicle, state in zip(van.fleet, saved_fleet):
+                    (vehicle.shipments, vehicle.route, vehicle.leave_time, vehicle.operator,
+                     vehicle.speed_profile) = state
+
+    def _build_fleet(self, live_fleet):
+        """
+        Helper function building the temporary fleet for this context's vehicles and speed.
+        Trucks beyond the standard fleet copy the capacities of its last truck.
+        """
+        specs = self.vehicles if self.vehicles is not None else \
+            tuple((vehicle.scheduled_departure, vehicle.scheduled_operator) for vehicle in live_fleet)
+        fleet = []
+        for vehicle_id, (departure, operator) in enumerate(specs, start=1):
+            vehicle = van.DeliveryVehicle(vehicle_id, departure, operator)
+            template = live_fleet[min(vehicle_id, len(live_fleet)) - 1] if live_fleet else None
+            if template is not None:
+                vehicle.max_cargo, vehicle.max_weight, vehicle.max_volume = \
+                    template.max_cargo, template.max_weight, template.max_volume
+                vehicle.speed = template.speed
+            if self.speed is not None:
+                vehicle.speed = float(self.speed)
+            fleet.append(vehicle)
+        return fleet
+
+
+def summarize_plan(delivery_plan, query_time=clock.END_OF_DAY):
+    """
+    Headline figures for a plan: parcel counts, lateness and mileage.
+    Time Complexity: O(n) where n is number of parcels
+
+    Returns:
+        dict: Summary values
+    """
+    records = delivery_plan.parcels.values()
+    delivered = [r for r in records if r.delivery_time is not None and r.delivery_time <= query_time]
+    late = [r for r in delivered if r.delivery_time > r.deadline]
+    return {
+        'parcels': len(delivery_plan.parcel_ids),
+        'delivered': len(delivered),
+        'late': len(late),
+        'unassigned': sum(1 for r in records if r.vehicle_id is None),
+        'total_miles': round(delivery_plan.total_mileage(query_time), 1),
+        'last_delivery': clock.format_seconds(max((r.delivery_time for r in delivered), default=None)),
+    }
@@ -0,0 +1,119 @@
+import numpy as np
+
+# Padding value for unused positions in a padded route array
+PAD = -1
+
+
+def dense_matrix(distance_matrix):
+    """
+    Converts the list-of-lists distance matrix into a dense, cleaned NumPy array.
+    Missing entries are filled from the opposite direction; entries missing both
+    ways become NaN so they can be detected after evaluation.
+    Time Complexity: O(n²) where n is number of locations
+
+    Args:
+        distance_matrix (list[list[float]]): Matrix from locations.import_distances()
+    Returns:
+        numpy.ndarray: float64 array of shape (n, n)
+    """
+    matrix = np.array([[np.nan if distance is None else distance for distance in row]
+                       for row in distance_matrix], dtype=np.float64)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError("Distance matrix must be square")
+    missing = np.isnan(matrix)
+    matrix[missing] = matrix.T[missing]
+    return matrix
+
+
+def pad_routes(routes):
+    """
+    Packs variable-length routes into a padded 2-D index array.
+    Time Complexity: O(r * m) where r is number of routes and m is longest route
+
+    Args:
+        routes (list[list[int]]): Routes as location index sequences
+    Returns:
+        tuple: (int64 array of shape (r, m) padded with PAD, int64 array of route lengths)
+    """
+    lengths = np.fromiter((len(route) for route in routes), dtype=np.int64, count=len(routes))
+    width = int(lengths.max()) if len(routes) else 0
+    route_array = np.full((len(routes), width), PAD, dtype=np.int64)
+    for row, route in enumerate(routes):
+        route_array[row, :len(route)] = route
+    return route_array, lengths
+
+
+def evaluate_routes(route_array, lengths, matrix, speed=None, leave_time=0.0):
+    """
+    Scores many routes in one fancy-indexing pass.
+    Time Complexity: O(r * m) vectorized, where r is number of routes and m is route width
+
+    Args:
+        route_array (numpy.ndarray): Padded (r, m) location index array
+        lengths (numpy.ndarray): Number of real stops in each row
+        matrix (numpy.ndarray): Dense matrix from dense_matrix()
+        speed (float): Travel speed in mph; when given, arrival times are also returned
+        leave_time (float | numpy.ndarray): Departure in seconds since midnight, scalar or per route
+    Returns:
+        numpy.ndarray: Total distance of each route, or
+        tuple: (totals, arrivals) where arrivals[r, k] is the arrival time in seconds at
+               stop k of route r (NaN past the end of the route)
+    Raises:
+        ValueError: If indices are out of range or a leg has no recorded distance
+    """
+    route_array = np.asarray(route_array, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    routes, width = route_array.shape if route_array.ndim == 2 else (0, 0)
+
+    if width < 2:
+        totals = np.zeros(routes)
+        if speed is None:
+            return totals
+        arrivals = np.full((routes, width), np.nan)
+        if width:
+            arrivals[lengths > 0, 0] = np.broadcast_to(leave_time, (routes,))[lengths > 0]
+        return totals, arrivals
+
+    # Legs that lie inside each route
+    positions = np.arange(width - 1)
+    inside = positions[None, :] < (lengths - 1)[:, None]
+
+    starts = np.where(inside, route_array[:, :-1], 0)
+    ends = np.where(inside, route_array[:, 1:], 0)
+    if starts.min() < 0 or ends.min() < 0 or max(starts.max(), ends.max()) >= len(matrix):
+        raise ValueError("Invalid location indices in route array")
+
+    legs = np.where(inside, matrix[starts, ends], 0.0)
+    if np.isnan(legs).any():
+        row, leg = np.argwhere(np.isnan(legs))[0]
+        raise ValueError(f"Missing distance between points {route_array[row, leg]} "
+                         f"and {route_array[row, leg + 1]}")
+
+    cumulative = np.cumsum(legs, axis=1)
+    totals = cumulative[:, -1].copy()
+    if speed is None:
+        return totals
+
+    arrivals = np.empty((routes, width))
+    arrivals[:, 0] = leave_time
+    arrivals[:, 1:] = np.asarray(leave_time, dtype=np.float64).reshape(-1, 1) + cumulative / speed * 3600
+    arrivals[np.arange(width)[None, :] >= lengths[:, None]] = np.nan
+    return totals, arrivals
+
+
+def evaluate_route_lists(routes, distance_matrix, speed=None, leave_time=0.0):
+    """
+    Convenience wrapper scoring plain Python routes against a list-of-lists matrix.
+    Time Complexity: O(n² + r * m)
+
+    Args:
+        routes (list[list[int]]): Routes as location index sequences
+        distance_matrix (list[list[float]] | numpy.ndarray): Distance matrix
+        speed (float): Travel speed in mph for arrival times
+        leave_time (float): Departure in seconds since midnight
+    Returns:
+        Same as evaluate_routes()
+    """
+    matrix = distance_matrix if isinstance(distance_matrix, np.ndarray) else dense_matrix(distance_matrix)
+    route_array, lengths = pad_routes(routes)
+    return evaluate_routes(route_array, lengths, matrix, speed, leave_time)
@@ -1,31 +1,60 @@
-import datetime
 import locations as dist
 import parcels
+import speed_profiles
 import van
 
+# Address of the single hub used when no depot is given
+HUB_ADDRESS = "4001 South 700 East"
 
-def coordinate_deliveries():
+# Routes longer than this skip the copying 3-opt search and use 2-opt on a tour structure
+TOUR_SEARCH_THRESHOLD = 60
+
+
+def coordinate_deliveries(route_distances=None, dynamic_schedule=False, speed_profile=None, pack_loads=False):
     """
     Master delivery coordination function. Controls loading, route optimization, and delivery timing.
     Time Complexity: O(n³) where n is number of delivery points
 
+    Args:
+        route_distances (list[list[float]]): Distance matrix to plan with
+            (defaults to the direct mileage from distances.csv)
+        dynamic_schedule (bool): Compute departures, drivers and hub returns with the
+            trip scheduler instead of the fixed fleet departure times
+        speed_profile (SpeedProfile | ZonedSpeedProfile): Time-of-day speeds for every vehicle
+            (None keeps the constant vehicle speed)
+        pack_loads (bool | str): Load trucks with the weight-aware packer instead of the fixed
+            loading rules; 'spread' balances the loads across every truck instead of consolidating
+            and puts deadline parcels on the earliest truck with room
     Returns:
         float: Total combined mileage for all trucks
     """
     try:
         # Initialize data
-        shipments = parcels.import_parcels()
-        route_distances = dist.import_distances()
+        if pack_loads:
+            import load_packing
+            shipments = load_packing.pack_loads(parcels.read_parcels(), van.fleet, spread=pack_loads == 'spread',
+                                               earliest_deadlines=pack_loads == 'spread')
+        else:
+            shipments = parcels.import_parcels()
+        if route_distances is None:
+            route_distances = dist.import_distances()
         delivery_points = dist.import_addresses()
 
         # Initialize fleet
         van.initialize_fleet(shipments)
+        speed_profiles.apply_speed_profile(van.fleet, speed_profile)
 
         # Handle special cases and constraints
         # _handle_special_cases()
 
         # Optimize routes
-        best_routes = _optimize_all_routes(route_distances, delivery_points)
+        best_routes = _optimize_all_routes(route_distances, delivery_points,
+                                           return_to_hub=False if dynamic_schedule else None)
+
+        if dynamic_schedule:
+            import scheduling
+            hub_index = delivery_points.index(HUB_ADDRESS)
+            best_routes, _ = scheduling.schedule_fleet(van.fleet, best_routes, route_distances, hub_index)
 
         # Assign routes and verify constraints
         _assign_and_verify_routes(best_routes, route_distances, delivery_points)
@@ -37,7 +66,7 @@ def coordinate_deliveries():
         raise Exception(f"Error coordinating deliveries: {str(e)}")
 
 
-def _optimize_all_routes(distances, locations):
+def _optimize_all_routes(distances, locations, return_to_hub=None):
     """
     Optimizes routes for all vehicles using 3-opt algorithm.
     Time Complexity: O(n³) where n is number of delivery points
@@ -46,7 +75,7 @@ def _optimize_all_routes(distances, locations):
     best_distances = []
 
     for vehicle in van.fleet:
-        route = _create_initial_route(vehicle, locations)
+        route = _create_initial_route(vehicle, locations, return_to_hub)
         optimized_route = _optimize_route(route, distances)
         best_routes.append(optimized_route)
         best_distances.append(dist.calculate_distance(optimized_route, distances))
@@ -54,33 +83,58 @@ def _optimize_all_routes(distances, locations):
     return best_routes
 
 
-def _create_initial_route(vehicle, locations):
-    hub_index = locations.index("4001 South 700 East")
+def _create_initial_route(vehicle, locations, return_to_hub=None):
+    hub_index = vehicle.depot if vehicle.depot is not None else locations.index(HUB_ADDRESS)
     delivery_points = []
+    seen = set()
 
     # Map package destinations to location indices
     for package in vehicle.shipments:
         try:
             point_index = dist.get_location_index(package.destination)
-            if point_index not in delivery_points:
+            if point_index not in seen:
+                seen.add(point_index)
                 delivery_points.append(point_index)
         except ValueError:
             continue
 
-    # Only add return to hub for first vehicle
+    # Only add return to hub for first vehicle unless the caller decides
     route = [hub_index]
     route.extend(delivery_points)
-    if vehicle.id == 1:  # Only first truck returns to hub
+    if return_to_hub is None:
+        return_to_hub = vehicle.id == 1  # Only first truck returns to hub
+    if return_to_hub:
         route.append(hub_index)
 
     return route
 
 
+def _compiled_kernels():
+    """
+    Helper function returning the optimizer_kernels module when its kernels are compiled
+    and enabled, or None. The kernels need numpy; without it the planner stays pure Python.
+    """
+    try:
+        import optimizer_kernels
+    except ImportError:
+        return None
+    return optimizer_kernels if optimizer_kernels.ENABLED else None
+
+
 def _optimize_route(route, distances, max_iterations=100):
     """
     Optimizes route using 3-opt local search algorithm.
+    Routes longer than TOUR_SEARCH_THRESHOLD are improved with tour.optimize_route instead,
+    and the search runs in the compiled optimizer kernels when Numba is installed.
     Time Complexity: O(n³) where n is route length
     """
+    if len(route) > TOUR_SEARCH_THRESHOLD:
+        import tour
+        return tour.optimize_route(route, distances)
+    kernels = _compiled_kernels()
+    if kernels is not None and kernels.supports(route, distances):
+        return kernels.optimize_route(route, distances, max_iterations)
+
     best_route = _greedy_improve(route.copy(), distances)
     best_distance = dist.calculate_distance(best_route, distances)
 
@@ -105,6 +159,9 @@ def _optimize_route(route, distances, max_iterations=100):
     return best_route
 
 def _greedy_improve(route, distances):
+    kernels = _compiled_kernels()
+    if kernels is not None and kernels.supports(route, distances):
+        return kernels.greedy_improve(route, distances)
     improved = True
     while improved:
         improved = False
@@ -134,31 +191,34 @@ def _verify_delivery_times(vehicle, distances, locations):
     Verifies all packages will be delivered on time.
     Time Complexity: O(n) where n is number of route points
     """
-    current_time = vehicle.leave_time
     current_loc = 0
+    arrival_times, _ = speed_profiles.route_arrival_times(
+        vehicle.route, distances, vehicle.leave_time, vehicle.speed, vehicle.speed_profile)
+
+    # Resolve each package's stop once rather than at every point of the route
+    packages_by_stop = {}
+    for package in vehicle.shipments:
+        try:
+            packages_by_stop.setdefault(dist.get_location_index(package.destination), []).append(package)
+        except ValueError:
+            continue
 
     # Track progress through route
     for i in range(len(vehicle.route) - 1):
-        current = vehicle.route[i]
         next_stop = vehicle.route[i + 1]
 
-        # Calculate arrival time at next stop
-        segment_distance = dist.calculate_distance([current, next_stop], distances)
-        travel_time = segment_distance / vehicle.speed
-        arrival_time = current_time + datetime.timedelta(hours=travel_time)
+        # Arrival time at next stop (seconds since midnight)
+        arrival_time = arrival_times[i + 1]
 
         # Update delivery times and verify deadlines
-        for package in vehicle.shipments:
+        for package in packages_by_stop.get(next_stop, ()):
             try:
-                delivery_point = dist.get_location_index(package.destination)
-                if delivery_point == next_stop:
-                    package.delivery_time = arrival_time
-                    if arrival_time.time() > package.deadline.time():
-                        raise ValueError(f"Package {package.tracking_id} will miss deadline")
+                package.delivery_time = arrival_time
+                if arrival_time > package.deadline:
+                    raise ValueError(f"Package {package.tracking_id} will miss deadline")
             except ValueError:
                 continue
 
-        current_time = arrival_time
         current_loc = next_stop
 
 
@@ -170,7 +230,8 @@ def rebalance_loads(van1, van2, distances, locations):
     # Try swapping non-constrained packages
     for pkg1 in van1.shipments:
         for pkg2 in van2.shipments:
-            if not pkg1.special_instructions and not pkg2.special_instructions:
+            if (not parcels.delivery_constraints.is_constrained(pkg1.tracking_id)
+                    and not parcels.delivery_constraints.is_constrained(pkg2.tracking_id)):
                 # Backup current routes
                 route1_backup = van1.route.copy()
                 route2_backup = van2.route.copy()
@@ -0,0 +1,209 @@
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import clock
+import constraints
+import van
+from planning_context import PlanningContext, summarize_plan
+
+Scenario = namedtuple('Scenario', ['name', 'extra_vans', 'speed', 'departure_shift', 'flight_delay',
+                                   'pack_loads', 'dynamic_schedule'],
+                      defaults=(0, None, 0, 0, False, False))
+
+COMPARISON_FIELDS = ('scenario', 'status', 'loading', 'vans', 'total_miles', 'late', 'minutes_late', 'last_delivery',
+                     'vehicle_completion', 'plan_seconds', 'error')
+
+# The first scenario of each loading mode is the reference for the others in that mode
+DEFAULT_SCENARIOS = (
+    Scenario('baseline'),
+    Scenario('20 mph', speed=20.0),
+    Scenario('depart 30 min later', departure_shift=30 * 60),
+    # The fixed loading rules only know trucks 1-3, so an extra van needs spread packing
+    Scenario('spread loads', pack_loads='spread'),
+    Scenario('spread, one more van', extra_vans=1, pack_loads='spread'),
+    # The fixed loading rules do not compare parcel arrival with departure, so delays are packed
+    Scenario('packed loads', pack_loads=True),
+    Scenario('packed, flight 45 min late', flight_delay=45 * 60, pack_loads=True),
+)
+
+
+def base_vehicles(fleet=None):
+    """
+    (departure, operator) of each truck in the standard fleet.
+    Time Complexity: O(v)
+    """
+    fleet = fleet if fleet is not None else van.fleet
+    return tuple((vehicle.scheduled_departure, vehicle.scheduled_operator) for vehicle in fleet)
+
+
+def delay_manifest(source_path, target_path, delay):
+    """
+    Copies a manifest with every 'Delayed ... until H:MM' arrival pushed back by delay seconds.
+    Time Complexity: O(n) where n is number of parcels
+
+    Args:
+        source_path (str): Manifest to read
+        target_path (str): Manifest to write
+        delay (int): Seconds added to each delayed arrival
+    Returns:
+        int: Number of parcels whose arrival moved
+    """
+    moved = 0
+    with open(source_path, newline='') as source, open(target_path, 'w', newline='') as target:
+        writer = csv.writer(target)
+        for row in csv.reader(source):
+            if len(row) > 7 and 'Delayed' in row[7]:
+                match = constraints._DELAY_PATTERN.search(row[7])
+                if match:
+                    arrival = clock.parse_time(match.group(1) + (match.group(2) or '')) + delay
+                    row[7] = row[7][:match.start()] + clock.format_time(arrival, '%I:%M %p').lstrip('0').lower() \
+                        + row[7][match.end():]
+                    moved += 1
+            writer.writerow(row)
+    return moved
+
+
+def scenario_context(base, scenario, vehicles, parcels_path=None):
+    """
+    The planning context for a scenario: the base context with the scenario's overrides.
+    Extra vans depart with the earliest truck and get new drivers.
+    Time Complexity: O(v)
+
+    Args:
+        base (PlanningContext): Context the scenario starts from
+        scenario (Scenario): Overrides
+        vehicles (tuple[tuple]): Base (departure, operator) of each truck
+        parcels_path (str): Rewritten manifest (None keeps the base manifest)
+    Returns:
+        PlanningContext: Context for the scenario
+    """
+    shifted = [(departure + scenario.departure_shift, operator) for departure, operator in vehicles]
+    first_departure = min((departure for departure, _ in shifted), default=clock.parse_time('08:00'))
+    next_operator = 1 + max((operator for _, operator in shifted), default=0)
+    shifted.extend((first_departure, next_operator + i) for i in range(scenario.extra_vans))
+    return PlanningContext(
+        distances_path=base.distances_path, parcels_path=parcels_path or base.parcels_path, name=scenario.name,
+        metric_closure=base.metric_closure, dynamic_schedule=scenario.dynamic_schedule or base.dynamic_schedule,
+        speed_profile=base.speed_profile, coordinates_path=base.coordinates_path, vehicles=shifted,
+        speed=scenario.speed if scenario.speed is not None else base.speed,
+        pack_loads=scenario.pack_loads or base.pack_loads)
+
+
+def evaluate_scenario(base, scenario, vehicles):
+    """
+    Plans one scenario and measures it. Pure with respect to the caller: the plan runs in a
+    context that restores all module state, and any rewritten manifest lives in a temporary
+    directory. Failures are reported in the row instead of raised.
+    Time Complexity: O(n³) where n is number of delivery points
+
+    Args:
+        base (PlanningContext): Context the scenario starts from
+        scenario (Scenario): Overrides
+        vehicles (tuple[tuple]): Base (departure, operator) of each truck
+    Returns:
+        dict: Comparison row (see COMPARISON_FIELDS)
+    """
+    row = dict.fromkeys(COMPARISON_FIELDS, '')
+    row['scenario'] = scenario.name
+    row['vans'] = len(vehicles) + scenario.extra_vans
+    row['loading'] = loading_mode(scenario.pack_loads or base.pack_loads)
+    started = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory(prefix='wgups-scenario-') as work_dir:
+            parcels_path = None
+            if scenario.flight_delay:
+                parcels_path = os.path.join(work_dir, 'parcels.csv')
+                delay_manifest(base.parcels_path, parcels_path, scenario.flight_delay)
+            delivery_plan = scenario_context(base, scenario, vehicles, parcels_path).plan()
+
+        summary = summarize_plan(delivery_plan)
+        records = delivery_plan.parcels.values()
+        row.update({key: summary[key] for key in ('total_miles', 'late', 'last_delivery')})
+        row['minutes_late'] = round(sum(max(r.delivery_time - r.deadline, 0) for r in records
+                                        if r.delivery_time is not None) / 60, 1)
+        row['vehicle_completion'] = ' '.join(
+            f"{vehicle_id}@{clock.format_seconds(delivery_plan.vehicles[vehicle_id].arrival_times[-1])}"
+            for vehicle_id in delivery_plan.vehicle_ids if len(delivery_plan.vehicles[vehicle_id].route) > 1)
+        row['status'] = 'ok'
+    except Exception as e:
+        row['status'] = 'failed'
+        row['error'] = str(e)
+    row['plan_seconds'] = round(time.perf_counter() - started, 3)
+    return row
+
+
+def loading_mode(pack_loads):
+    """Name of a pack_loads setting: 'fixed', 'packed' or 'spread'. Time Complexity: O(1)"""
+    return 'spread' if pack_loads == 'spread' else 'packed' if pack_loads else 'fixed'
+
+
+def run_scenarios(scenarios=DEFAULT_SCENARIOS, base=None, workers=None):
+    """
+    Evaluates scenarios side by side, each in its own worker process.
+    Time Complexity: O(s * n³ / w) for s scenarios on w workers
+
+    Args:
+        scenarios (list[Scenario]): Scenarios to compare (the first of each loading mode is its reference)
+        base (PlanningContext): Context every scenario starts from (defaults to ./data)
+        workers (int): Worker processes (1 evaluates in this process; default CPU count)
+    Returns:
+        list[dict]: Comparison rows in scenario order
+    """
+    base = base if base is not None else PlanningContext()
+    vehicles = base.vehicles if base.vehicles is not None else base_vehicles()
+    if workers == 1 or len(scenarios) == 1:
+        return [evaluate_scenario(base, scenario, vehicles) for scenario in scenarios]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(evaluate_scenario, [base] * len(scenarios), scenarios, [vehicles] * len(scenarios)))
+
+
+def format_comparison(rows):
+    """
+    Renders comparison rows as a fixed-width table with mileage and lateness deltas
+    against the first row with the same loading mode, so each delta changes one thing.
+    Time Complexity: O(s) where s is number of scenarios
+    """
+    references = {}
+    for row in rows:
+        references.setdefault(row['loading'], row)
+    lines = [f"{'SCENARIO':<27} {'LOADING':<7} {'VANS':>4} {'MILES':>7} {'Δ MILES':>8} {'LATE':>4} {'MIN LATE':>9} "
+             f"{'Δ MIN':>7} {'LAST DELIVERY':>13}  VEHICLE COMPLETION"]
+    for row in rows:
+        if row['status'] != 'ok':
+            lines.append(f"{row['scenario']:<27} {row['loading']:<7} failed: {row['error']}")
+            continue
+        reference = references[row['loading']]
+        reference = reference if reference['status'] == 'ok' else None
+        delta_miles = row['total_miles'] - reference['total_miles'] if reference else 0.0
+        delta_late = row['minutes_late'] - reference['minutes_late'] if reference else 0.0
+        lines.append(f"{row['scenario'][:27]:<27} {row['loading']:<7} {row['vans']:>4} {row['total_miles']:>7.1f} {delta_miles:>+8.1f} "
+                     f"{row['late']:>4} {row['minutes_late']:>9.1f} {delta_late:>+7.1f} "
+                     f"{row['last_delivery']:>13}  {row['vehicle_completion']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare what-if planning scenarios side by side")
+    parser.add_argument("--data-dir", default=None, help="directory with distances.csv and parcels.csv")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--csv", metavar="PATH", help="also write the comparison rows to a CSV file")
+    args = parser.parse_args(argv)
+
+    rows = run_scenarios(DEFAULT_SCENARIOS, PlanningContext(data_dir=args.data_dir), args.workers)
+    print(format_comparison(rows))
+    if args.csv:
+        with open(args.csv, 'w', newline='') as stream:
+            writer = csv.DictWriter(stream, fieldnames=COMPARISON_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    return 1 if any(row['status'] != 'ok' for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import itertools
+from collections import namedtuple
+
+import clock
+import locations as dist
+import parcels
+import speed_profiles
+
+DAY_START = clock.parse_time('08:00')
+DEFAULT_DRIVERS = (1, 2)
+DEFAULT_TRUCKS = (1, 2, 3)
+
+# Exhaustive dispatch-order search up to this many trips, ready-time order beyond it
+MAX_EXHAUSTIVE_TRIPS = 7
+
+# Cost weights: one mile is worth one minute of lateness
+MILE_COST = 1.0
+LATE_SECOND_COST = 1.0 / 60
+
+Trip = namedtuple('Trip', ['trip_id', 'route', 'speed', 'profile', 'ready_time', 'outbound_miles',
+                           'return_miles', 'leg_miles', 'leg_seconds', 'return_seconds', 'deadlines'])
+
+TripAssignment = namedtuple('TripAssignment', ['trip_id', 'driver_id', 'truck_id', 'departure', 'finish',
+                                               'returns_to_hub', 'miles', 'lateness'])
+
+Schedule = namedtuple('Schedule', ['assignments', 'total_miles', 'total_lateness', 'cost'])
+
+
+def trip_ready_time(package_ids, constraint_set, day_start=DAY_START):
+    """
+    Earliest time a trip can leave: every parcel must be at the hub and every
+    address correction must be known.
+    Time Complexity: O(p) where p is number of packages on the trip
+
+    Args:
+        package_ids (iterable[int]): Tracking IDs loaded on the trip
+        constraint_set (ConstraintSet): Compiled parcel constraints
+        day_start (int): Opening time in seconds since midnight
+    Returns:
+        int: Ready time in seconds since midnight
+    """
+    ready = day_start
+    for tracking_id in package_ids:
+        available = constraint_set.available_at(tracking_id)
+        if available is not None and available > ready:
+            ready = available
+        change = constraint_set.address_change(tracking_id)
+        if change is not None and change[0] > ready:
+            ready = change[0]
+    return ready
+
+
+def build_trip(vehicle, route, distances, hub_index, constraint_set, day_start=DAY_START):
+    """
+    Precomputes everything the scheduler needs about one loaded, routed trip.
+    Time Complexity: O(n + p) where n is number of route points and p is number of packages
+
+    Args:
+        vehicle (DeliveryVehicle): Loaded vehicle (one trip)
+        route (list[int]): Outbound route starting at the hub, without the return leg
+        distances (list[list[float]]): Distance matrix
+        hub_index (int): Location index of the hub
+        constraint_set (ConstraintSet): Compiled parcel constraints
+        day_start (int): Opening time in seconds since midnight
+    Returns:
+        Trip: Trip summary
+    """
+    if route and route[-1] == hub_index and len(route) > 1:
+        route = route[:-1]
+
+    packages_by_stop = {}
+    for package in vehicle.shipments:
+        try:
+            packages_by_stop.setdefault(dist.get_location_index(package.destination), []).append(package)
+        except ValueError:
+            continue
+
+    # Leg miles around the closed tour, and constant-speed seconds from departure to each point
+    closed = list(route) + [hub_index]
+    leg_miles = tuple(dist.calculate_distance([point_a, point_b], distances)
+                      for point_a, point_b in zip(closed, closed[1:]))
+    _, cumulative = speed_profiles.route_arrival_times(closed, distances, 0, vehicle.speed)
+    offsets = [clock.travel_seconds(miles, vehicle.speed) for miles in cumulative]
+
+    outbound_miles = cumulative[-2] if route else 0.0
+    return_miles = leg_miles[-1] if route else 0.0
+    deadlines = tuple((position, package.deadline)
+                      for position, stop in enumerate(route)
+                      for package in packages_by_stop.get(stop, ()))
+    ready = trip_ready_time((package.tracking_id for package in vehicle.shipments), constraint_set, day_start)
+
+    return Trip(vehicle.id, list(route), vehicle.speed, vehicle.speed_profile, ready, outbound_miles,
+                return_miles, leg_miles, tuple(offsets[:-1]), offsets[-1], deadlines)
+
+
+def _timing(trip, departure):
+    """
+    Helper function returning (arrival at each outbound point, hub return time) for a departure.
+    Constant speed shifts precomputed offsets; a speed profile walks the legs.
+    """
+    if trip.profile is None:
+        return [departure + offset for offset in trip.leg_seconds], departure + trip.return_seconds
+    arrivals = [departure]
+    clock_time = float(departure)
+    for origin, miles in zip(trip.route, trip.leg_miles):
+        clock_time = trip.profile.arrival(clock_time, miles, origin)
+        arrivals.append(int(round(clock_time)))
+    return arrivals[:-1], arrivals[-1]
+
+
+def _lateness(arrivals, trip):
+    """Helper function totalling seconds past deadline given the trip's arrival times"""
+    return sum(max(0, arrivals[position] - deadline) for position, deadline in trip.deadlines)
+
+
+def _dispatch(order, trips, driver_ids, truck_ids, day_start, required_trucks=None):
+    """Helper function list-scheduling trips in the given order onto the first free driver and truck"""
+    driver_free = {driver: day_start for driver in driver_ids}
+    truck_free = {truck: day_start for truck in truck_ids}
+    placed = []
+    for trip_id in order:
+        trip = trips[trip_id]
+        driver = min(driver_ids, key=lambda d: (driver_free[d], d))
+        if required_trucks is not None:
+            truck = required_trucks.get(trip_id) or min(truck_ids, key=lambda t: (truck_free[t], t))
+        else:
+            truck = trip_id if trip_id in truck_free else min(truck_ids, key=lambda t: (truck_free[t], t))
+        departure = max(trip.ready_time, driver_free[driver], truck_free[truck])
+        arrivals, finish = _timing(trip, departure)
+        driver_free[driver] = finish
+        truck_free[truck] = finish
+        placed.append([trip_id, driver, truck, departure, finish, arrivals])
+
+    # A driver's final trip ends at its last stop unless its truck runs again later;
+    # earlier trips must come back to the hub
+    last_trip, last_truck_trip = {}, {}
+    for entry in placed:
+        last_trip[entry[1]] = entry[0]
+        last_truck_trip[entry[2]] = entry[0]
+
+    assignments = []
+    total_miles = 0.0
+    total_lateness = 0
+    for trip_id, driver, truck, departure, finish, arrivals in placed:
+        trip = trips[trip_id]
+        returns = last_trip[driver] != trip_id or last_truck_trip[truck] != trip_id
+        miles = trip.outbound_miles + (trip.return_miles if returns else 0.0)
+        if not returns:
+            finish = arrivals[-1]
+        lateness = _lateness(arrivals, trip)
+        total_miles += miles
+        total_lateness += lateness
+        assignments.append(TripAssignment(trip_id, driver, truck, departure, finish, returns, miles, lateness))
+
+    cost = total_miles * MILE_COST + total_lateness * LATE_SECOND_COST
+    return Schedule(tuple(assignments), total_miles, total_lateness, cost)
+
+
+def schedule_trips(trips, driver_ids=DEFAULT_DRIVERS, truck_ids=DEFAULT_TRUCKS, day_start=DAY_START,
+                   required_trucks=None):
+    """
+    Chooses the dispatch order, driver and truck for each trip, minimizing miles plus lateness.
+    A trip leaves once its parcels are ready and both its driver and truck are back at the hub.
+    Trucks are matched to trips with the same ID when one exists (truck restrictions refer to it),
+    unless required_trucks is given: then listed trips take their truck and the others the
+    first truck free.
+    Time Complexity: O(t! * t) for t <= MAX_EXHAUSTIVE_TRIPS, otherwise O(t log t)
+
+    Args:
+        trips (list[Trip]): Trips from build_trip()
+        driver_ids (iterable[int]): Available drivers
+        truck_ids (iterable[int]): Available trucks
+        day_start (int): Opening time in seconds since midnight
+        required_trucks (dict[int, int]): Truck each restricted trip must use, by trip ID
+    Returns:
+        Schedule: Best schedule found
+    Raises:
+        ValueError: If there is no driver or truck, or a required truck is not available
+    """
+    driver_ids = tuple(driver_ids)
+    truck_ids = tuple(truck_ids)
+    if not driver_ids or not truck_ids:
+        raise ValueError("At least one driver and one truck are required")
+    missing = sorted(set((required_trucks or {}).values()) - set(truck_ids))
+    if missing:
+        raise ValueError(f"Required truck(s) {', '.join(map(str, missing))} not in the fleet")
+    by_id = {trip.trip_id: trip for trip in trips}
+
+    if len(trips) <= MAX_EXHAUSTIVE_TRIPS:
+        orders = itertools.permutations(by_id)
+    else:
+        orders = [sorted(by_id, key=lambda trip_id: (by_id[trip_id].ready_time, trip_id))]
+
+    best = None
+    for order in orders:
+        candidate = _dispatch(order, by_id, driver_ids, truck_ids, day_start, required_trucks)
+        if best is None or candidate.cost < best.cost:
+            best = candidate
+    return best
+
+
+def apply_schedule(fleet, routes, schedule, hub_index):
+    """
+    Writes a schedule back onto the fleet: departure, driver, return leg and parcel start times.
+    Time Complexity: O(n) where n is number of packages and route points
+
+    Args:
+        fleet (list[DeliveryVehicle]): Loaded vehicles (one per trip)
+        routes (list[list[int]]): Outbound routes in fleet order
+        schedule (Schedule): Result of schedule_trips()
+        hub_index (int): Location index of the hub
+    Returns:
+        list[list[int]]: Final routes in fleet order, with the return leg where scheduled
+    """
+    by_trip = {assignment.trip_id: assignment for assignment in schedule.assignments}
+    final_routes = []
+    for vehicle, route in zip(fleet, routes):
+        assignment = by_trip[vehicle.id]
+        route = list(route[:-1] if len(route) > 1 and route[-1] == hub_index else route)
+        if assignment.returns_to_hub:
+            route.append(hub_index)
+        vehicle.leave_time = assignment.departure
+        vehicle.operator = assignment.driver_id
+        for package in vehicle.shipments:
+            package.start_time = assignment.departure
+        final_routes.append(route)
+    return final_routes
+
+
+def schedule_fleet(fleet, routes, distances, hub_index, driver_ids=DEFAULT_DRIVERS,
+                   truck_ids=DEFAULT_TRUCKS, constraint_set=None, day_start=DAY_START, required_trucks=None):
+    """
+    Builds trips from routed vehicles, schedules them and applies the result.
+    Time Complexity: see schedule_trips()
+
+    Returns:
+        tuple: (final routes in fleet order, Schedule)
+    """
+    constraint_set = constraint_set if constraint_set is not None else parcels.delivery_constraints
+    trips = [build_trip(vehicle, route, distances, hub_index, constraint_set, day_start)
+             for vehicle, route in zip(fleet, routes)]
+    schedule = schedule_trips(trips, driver_ids, truck_ids, day_start, required_trucks)
+    return apply_schedule(fleet, routes, schedule, hub_index), schedule
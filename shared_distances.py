@@ -0,0 +1,217 @@
+import atexit
+import math
+import multiprocessing
+import struct
+from multiprocessing import shared_memory
+
+import locations as dist
+
+# Header: magic tag, matrix size and the publisher's resource tracker pid (0 = none),
+# followed by size * size float64 cells (NaN = missing)
+HEADER_FORMAT = '<8sQq'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAGIC = b'WGUPSDM2'
+
+# Matrix attached by pool workers through init_worker()
+worker_distances = None
+
+
+def _tracker_pid():
+    """Helper function returning the pid of this process's resource tracker (None before it starts)"""
+    from multiprocessing import resource_tracker
+    return resource_tracker._resource_tracker._pid
+
+
+class _SharedRow:
+    """
+    Read-only row view over the shared buffer.
+    Supports row[col] exactly like a row of the list-of-lists matrix.
+    """
+
+    __slots__ = ('_cells', '_offset', '_size')
+
+    def __init__(self, cells, offset, size):
+        self._cells = cells
+        self._offset = offset
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, col):
+        if not 0 <= col < self._size:
+            raise IndexError(f"Invalid location index: {col}")
+        value = self._cells[self._offset + col]
+        return None if value != value else value
+
+
+class SharedDistanceMatrix:
+    """
+    Distance matrix stored once in multiprocessing.shared_memory as a flat float64 buffer.
+    Behaves like the list-of-lists from locations.import_distances() (len(), matrix[i][j],
+    None for missing entries) so locations.calculate_distance and the routing optimizers
+    can use it unchanged. The publishing process owns the segment and unlinks it;
+    attached workers only close their mapping.
+    """
+
+    def __init__(self, segment, owner):
+        """
+        Wraps an open shared memory segment.
+        Time Complexity: O(1)
+        """
+        magic, size, _ = struct.unpack_from(HEADER_FORMAT, segment.buf, 0)
+        if magic != MAGIC:
+            segment.close()
+            raise ValueError(f"Shared memory block {segment.name} is not a distance matrix")
+        self.segment = segment
+        self.name = segment.name
+        self.size = size
+        self.owner = owner
+        self._cells = segment.buf[HEADER_SIZE:HEADER_SIZE + size * size * 8].cast('d')
+        self._closed = False
+
+    @classmethod
+    def publish(cls, distance_matrix, name=None):
+        """
+        Copies a list-of-lists distance matrix into a new shared memory segment.
+        Time Complexity: O(n²) where n is number of locations
+
+        Args:
+            distance_matrix (list[list[float]]): Matrix from locations.import_distances()
+            name (str): Optional segment name (generated when omitted)
+        Returns:
+            SharedDistanceMatrix: Owning handle; use as a context manager or call close()
+        """
+        size = len(distance_matrix)
+        segment = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + size * size * 8)
+        try:
+            struct.pack_into(HEADER_FORMAT, segment.buf, 0, MAGIC, size, _tracker_pid() or 0)
+            cells = segment.buf[HEADER_SIZE:HEADER_SIZE + size * size * 8].cast('d')
+            try:
+                for i, row in enumerate(distance_matrix):
+                    if len(row) != size:
+                        raise ValueError(f"Distance matrix row {i} has {len(row)} entries, expected {size}")
+                    base = i * size
+                    for j, distance in enumerate(row):
+                        cells[base + j] = math.nan if distance is None else distance
+            finally:
+                cells.release()
+            matrix = cls(segment, owner=True)
+        except Exception:
+            segment.close()
+            segment.unlink()
+            raise
+
+        # Make sure the segment does not outlive the interpreter
+        atexit.register(matrix.close)
+        return matrix
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attaches zero-copy to a segment published by another process.
+        Time Complexity: O(1)
+
+        Args:
+            name (str): Segment name from the publishing matrix
+        Returns:
+            SharedDistanceMatrix: Non-owning handle
+        Raises:
+            FileNotFoundError: If no segment with that name exists
+        """
+        try:
+            segment = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 registers every attached segment with the resource tracker, whose
+            # exit would unlink the owner's segment. The publisher and its pool workers share
+            # one tracker, where this only repeats the owner's registration; any other process
+            # drops the registration it just made for this segment.
+            from multiprocessing import resource_tracker
+            segment = shared_memory.SharedMemory(name=name)
+            if segment.size >= HEADER_SIZE and \
+                    struct.unpack_from(HEADER_FORMAT, segment.buf, 0)[2] != _tracker_pid():
+                resource_tracker.unregister(segment._name, 'shared_memory')
+        return cls(segment, owner=False)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.size:
+            raise IndexError(f"Invalid location index: {row}")
+        return _SharedRow(self._cells, row * self.size, self.size)
+
+    def __iter__(self):
+        for row in range(self.size):
+            yield self[row]
+
+    def lookup(self, point_a, point_b):
+        """
+        Returns the distance between two location indices, or None if unrecorded.
+        Time Complexity: O(1)
+
+        Raises:
+            IndexError: If either index is outside the matrix (negative indices included)
+        """
+        for point in (point_a, point_b):
+            if not 0 <= point < self.size:
+                raise IndexError(f"Invalid location index: {point}")
+        value = self._cells[point_a * self.size + point_b]
+        return None if value != value else value
+
+    def close(self):
+        """
+        Releases this process's mapping; the owner also unlinks the segment.
+        Safe to call more than once.
+        Time Complexity: O(1)
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._cells.release()
+        self.segment.close()
+        if self.owner:
+            try:
+                self.segment.unlink()
+            except FileNotFoundError:
+                pass
+            atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def init_worker(name):
+    """
+    Pool initializer: attaches the shared matrix once per worker process.
+    Time Complexity: O(1)
+    """
+    global worker_distances
+    worker_distances = SharedDistanceMatrix.attach(name)
+    atexit.register(worker_distances.close)
+
+
+def _route_distance(route):
+    """Helper function run in workers to score one route"""
+    return dist.calculate_distance(route, worker_distances)
+
+
+def evaluate_routes_parallel(routes, distance_matrix, processes=None):
+    """
+    Scores many routes across a process pool that shares one copy of the matrix.
+    Time Complexity: O(n² + r * m / p) for n locations, r routes of length m, p processes
+
+    Args:
+        routes (list[list[int]]): Routes as location index sequences
+        distance_matrix (list[list[float]]): Matrix from locations.import_distances()
+        processes (int): Worker count (defaults to CPU count)
+    Returns:
+        list[float]: Total distance of each route
+    """
+    with SharedDistanceMatrix.publish(distance_matrix) as shared:
+        with multiprocessing.Pool(processes, initializer=init_worker, initargs=(shared.name,)) as pool:
+            return pool.map(_route_distance, routes, chunksize=max(len(routes) // (4 * (processes or 4)), 1))
@@ -0,0 +1,147 @@
+import hashlib
+import os
+
+import numpy as np
+
+import locations as dist
+from route_evaluation import dense_matrix
+
+DEFAULT_CACHE_PATH = './data/.distances_closure.npz'
+
+# Rows updated per step; bounds temporary memory to block_size * n per pivot
+DEFAULT_BLOCK_SIZE = 1024
+
+NO_PATH = -1
+
+
+def floyd_warshall(matrix, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    All-pairs shortest paths over a dense distance matrix.
+    Each pivot k relaxes every pair at once with NumPy broadcasting; rows are processed
+    in blocks so the temporary array never exceeds block_size x n.
+    Time Complexity: O(n³) arithmetic, O(n) Python-level iterations per block
+
+    Args:
+        matrix (numpy.ndarray): (n, n) direct distances, NaN or inf for missing edges
+        block_size (int): Number of rows relaxed per vectorized step
+    Returns:
+        tuple: (shortest distances, next-hop table) where next_hop[i, j] is the stop
+               after i on the shortest path to j, or NO_PATH if unreachable
+    """
+    distances = np.array(matrix, dtype=np.float64, copy=True)
+    size = len(distances)
+    distances[np.isnan(distances)] = np.inf
+    np.fill_diagonal(distances, 0.0)
+
+    next_hop = np.where(np.isfinite(distances), np.arange(size)[None, :], NO_PATH).astype(np.int32)
+    block_size = max(int(block_size), 1)
+
+    for k in range(size):
+        through_row = distances[k, :]
+        for start in range(0, size, block_size):
+            stop = min(start + block_size, size)
+            candidate = distances[start:stop, k, None] + through_row[None, :]
+            improved = candidate < distances[start:stop]
+            if improved.any():
+                distances[start:stop][improved] = candidate[improved]
+                rows = np.nonzero(improved)[0]
+                next_hop[start:stop][improved] = next_hop[start + rows, k]
+
+    return distances, next_hop
+
+
+def reconstruct_path(next_hop, origin, destination):
+    """
+    Expands a shortest path into the full sequence of location indices.
+    Time Complexity: O(p) where p is number of hops
+
+    Args:
+        next_hop (numpy.ndarray): Next-hop table from floyd_warshall()
+        origin (int): Start location index
+        destination (int): End location index
+    Returns:
+        list[int]: Locations from origin to destination inclusive
+    Raises:
+        ValueError: If destination is unreachable from origin
+    """
+    if next_hop[origin, destination] == NO_PATH:
+        raise ValueError(f"No path between points {origin} and {destination}")
+    path = [origin]
+    while origin != destination:
+        origin = int(next_hop[origin, destination])
+        path.append(origin)
+    return path
+
+
+def expand_route(route, next_hop):
+    """
+    Expands a stop sequence into the full driven path through intermediate locations.
+    Time Complexity: O(p) where p is total number of hops
+
+    Args:
+        route (list[int]): Stops as location indices
+        next_hop (numpy.ndarray): Next-hop table from floyd_warshall()
+    Returns:
+        list[int]: Every location visited in order
+    """
+    if not route:
+        return []
+    path = [route[0]]
+    for origin, destination in zip(route, route[1:]):
+        path.extend(reconstruct_path(next_hop, origin, destination)[1:])
+    return path
+
+
+def _checksum(matrix):
+    """Helper function to fingerprint a dense matrix for cache validation"""
+    return hashlib.sha256(np.ascontiguousarray(matrix, dtype=np.float64).tobytes()).hexdigest()
+
+
+def load_or_compute(matrix, cache_path=DEFAULT_CACHE_PATH, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Returns the shortest-path closure of a dense matrix, reusing a cached .npz file when
+    it was computed from identical input.
+    Time Complexity: O(n²) on a cache hit, O(n³) otherwise
+
+    Args:
+        matrix (numpy.ndarray): Dense direct-distance matrix
+        cache_path (str): Location of the compiled cache (None disables caching)
+        block_size (int): Rows relaxed per vectorized step
+    Returns:
+        tuple: (shortest distances, next-hop table)
+    """
+    checksum = _checksum(matrix)
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cached:
+                if str(cached['checksum']) == checksum:
+                    return cached['distances'], cached['next_hop']
+        except (OSError, KeyError, ValueError):
+            pass  # Unreadable or stale cache; recompute below
+
+    distances, next_hop = floyd_warshall(matrix, block_size)
+    if cache_path:
+        # Per-process temporary name so parallel planners never write the same file
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+        np.savez(temporary_path, distances=distances, next_hop=next_hop, checksum=np.array(checksum))
+        os.replace(temporary_path, cache_path)
+    return distances, next_hop
+
+
+def metric_distances(distance_matrix=None, cache_path=DEFAULT_CACHE_PATH):
+    """
+    Optional preprocessing stage: replaces direct mileage with shortest-path mileage
+    so the result satisfies the triangle inequality.
+    Returns the same list-of-lists shape the routing module consumes.
+    Time Complexity: O(n³) uncached, O(n²) cached
+
+    Args:
+        distance_matrix (list[list[float]]): Direct distances (loaded from CSV when omitted)
+        cache_path (str): Location of the compiled cache (None disables caching)
+    Returns:
+        list[list[float]]: Shortest-path distances (None where unreachable)
+    """
+    if distance_matrix is None:
+        distance_matrix = dist.import_distances()
+    distances, _ = load_or_compute(dense_matrix(distance_matrix), cache_path)
+    return [[float(value) if np.isfinite(value) else None for value in row] for row in distances]
@@ -0,0 +1,236 @@
+import bisect
+import csv
+
+import clock
+import locations as dist
+
+# Zone name used for rows that apply to the whole network
+NETWORK_ZONE = '*'
+
+
+class SpeedProfile:
+    """
+    Piecewise-constant speed by time of day.
+    Precomputes the miles a vehicle would cover driving from midnight to each breakpoint,
+    so "where am I after driving m miles from time t" is two binary searches:
+    arrival = time_at(miles_at(t) + m). Travel is FIFO: leaving later never arrives earlier.
+    """
+
+    def __init__(self, breakpoints, speeds):
+        """
+        Builds the cumulative table.
+        Time Complexity: O(k log k) where k is number of breakpoints
+
+        Args:
+            breakpoints (list[int]): Start of each period in seconds since midnight
+            speeds (list[float]): Speed in mph from each breakpoint until the next;
+                the first speed also applies before the first breakpoint, the last one after it
+        Raises:
+            ValueError: If the lists differ in length, are empty, or a speed is not positive
+        """
+        if not breakpoints or len(breakpoints) != len(speeds):
+            raise ValueError("Speed profile needs one speed per breakpoint")
+        periods = sorted(zip(breakpoints, speeds))
+        if any(speed <= 0 for _, speed in periods):
+            raise ValueError("Speed profile speeds must be positive")
+        if periods[0][0] > 0:
+            periods.insert(0, (0, periods[0][1]))
+
+        self.breakpoints = [int(start) for start, _ in periods]
+        self.speeds = [float(speed) for _, speed in periods]
+        self.cumulative_miles = [0.0]
+        for i in range(1, len(periods)):
+            elapsed = self.breakpoints[i] - self.breakpoints[i - 1]
+            miles = self.speeds[i - 1] * elapsed / clock.SECONDS_PER_HOUR
+            self.cumulative_miles.append(self.cumulative_miles[-1] + miles)
+        self._arrays = None  # NumPy copies of the tables, built on first vectorized use
+
+    @classmethod
+    def constant(cls, speed):
+        """Profile with the same speed all day"""
+        return cls([0], [speed])
+
+    def __repr__(self):
+        periods = ", ".join(f"{clock.format_seconds(start)}={speed:g}"
+                            for start, speed in zip(self.breakpoints, self.speeds))
+        return f"SpeedProfile({periods})"
+
+    def miles_at(self, seconds):
+        """
+        Miles covered when driving from midnight until the given time.
+        Time Complexity: O(log k)
+        """
+        i = max(bisect.bisect_right(self.breakpoints, seconds) - 1, 0)
+        elapsed = seconds - self.breakpoints[i]
+        return self.cumulative_miles[i] + self.speeds[i] * elapsed / clock.SECONDS_PER_HOUR
+
+    def time_at(self, miles):
+        """
+        Time at which a vehicle driving since midnight has covered the given miles.
+        Time Complexity: O(log k)
+        """
+        i = max(bisect.bisect_right(self.cumulative_miles, miles) - 1, 0)
+        return self.breakpoints[i] + (miles - self.cumulative_miles[i]) * clock.SECONDS_PER_HOUR / self.speeds[i]
+
+    def arrival(self, depart, miles, origin=None):
+        """
+        Arrival time (float seconds) after driving miles starting at depart.
+        Time Complexity: O(log k)
+        """
+        return self.time_at(self.miles_at(depart) + miles)
+
+    def arrival_array(self, departs, miles, origin=None):
+        """
+        Vectorized arrival() over arrays of departure times and/or miles (requires NumPy).
+        Time Complexity: O(c log k) where c is number of elements
+        """
+        import numpy as np
+
+        if self._arrays is None:
+            self._arrays = tuple(np.array(values, dtype=np.float64)
+                                 for values in (self.breakpoints, self.speeds, self.cumulative_miles))
+        breakpoints, speeds, cumulative = self._arrays
+
+        departs = np.asarray(departs, dtype=np.float64)
+        i = np.maximum(np.searchsorted(breakpoints, departs, side='right') - 1, 0)
+        target = cumulative[i] + speeds[i] * (departs - breakpoints[i]) / clock.SECONDS_PER_HOUR + miles
+        j = np.maximum(np.searchsorted(cumulative, target, side='right') - 1, 0)
+        return breakpoints[j] + (target - cumulative[j]) * clock.SECONDS_PER_HOUR / speeds[j]
+
+
+class ZonedSpeedProfile:
+    """
+    Speed profiles by zone. A leg is driven at the profile of the zone it starts in;
+    locations without a zone use the network profile.
+    """
+
+    def __init__(self, network, zone_profiles=None, zone_of_location=None):
+        """
+        Args:
+            network (SpeedProfile): Profile for locations without a zone
+            zone_profiles (dict[str, SpeedProfile]): Profile of each zone
+            zone_of_location (dict[int, str]): Zone of each location index
+        """
+        self.network = network
+        self.zone_profiles = dict(zone_profiles or {})
+        self.zone_of_location = dict(zone_of_location or {})
+
+    def profile_for(self, origin):
+        """Profile governing legs that start at origin. Time Complexity: O(1)"""
+        return self.zone_profiles.get(self.zone_of_location.get(origin), self.network)
+
+    def arrival(self, depart, miles, origin=None):
+        """Arrival time (float seconds) for one leg. Time Complexity: O(log k)"""
+        return self.profile_for(origin).arrival(depart, miles)
+
+    def arrival_array(self, departs, miles, origin=None):
+        """Vectorized arrival() for one leg. Time Complexity: O(c log k)"""
+        return self.profile_for(origin).arrival_array(departs, miles)
+
+
+def route_arrival_times(route, distances, leave_time, speed, profile=None):
+    """
+    Arrival time and cumulative miles at every point of a route.
+    Without a profile this is the constant-speed model used throughout the planner;
+    with one, each leg starts when the previous one ends and takes its speed from the profile.
+    Time Complexity: O(n log k) where n is number of route points
+
+    Args:
+        route (list[int]): Location indices starting at the hub
+        distances (list[list[float]]): Distance matrix
+        leave_time (int): Departure in seconds since midnight
+        speed (float): Constant speed in mph, used when profile is None
+        profile (SpeedProfile | ZonedSpeedProfile): Time-dependent speeds
+    Returns:
+        tuple: (list of int arrival times, list of cumulative miles), one entry per route point
+    """
+    if not route:
+        return [], []
+    arrival_times = [leave_time]
+    cumulative_miles = [0.0]
+    clock_time = float(leave_time)
+    for point_a, point_b in zip(route, route[1:]):
+        segment = dist.calculate_distance([point_a, point_b], distances)
+        cumulative_miles.append(cumulative_miles[-1] + segment)
+        if profile is None:
+            arrival_times.append(leave_time + clock.travel_seconds(cumulative_miles[-1], speed))
+        else:
+            clock_time = profile.arrival(clock_time, segment, point_a)
+            arrival_times.append(int(round(clock_time)))
+    return arrival_times, cumulative_miles
+
+
+def route_arrival_matrix(departures, route, distances, speed, profile=None):
+    """
+    Arrival time at every route point for many departure times at once (requires NumPy).
+    Time Complexity: O(n) vectorized steps of O(c log k) where c is number of departures
+
+    Args:
+        departures (numpy.ndarray): Candidate departure times in seconds since midnight
+        route (list[int]): Location indices starting at the hub
+        distances (list[list[float]]): Distance matrix
+        speed (float): Constant speed in mph, used when profile is None
+        profile (SpeedProfile | ZonedSpeedProfile): Time-dependent speeds
+    Returns:
+        numpy.ndarray: (c, n) int64 arrival times
+    """
+    import numpy as np
+
+    departures = np.asarray(departures, dtype=np.int64)
+    if profile is None:
+        _, cumulative_miles = route_arrival_times(route, distances, 0, speed)
+        offsets = np.array([clock.travel_seconds(miles, speed) for miles in cumulative_miles], dtype=np.int64)
+        return departures[:, None] + offsets[None, :]
+
+    columns = [departures.astype(np.float64)]
+    for point_a, point_b in zip(route, route[1:]):
+        segment = dist.calculate_distance([point_a, point_b], distances)
+        columns.append(profile.arrival_array(columns[-1], segment, point_a))
+    return np.rint(np.stack(columns, axis=1)).astype(np.int64)
+
+
+def load_speed_profile(path, zones_path=None):
+    """
+    Reads speed profiles from CSV rows of zone,start,mph (zone '*' is the whole network).
+    An optional second CSV of address,zone places locations in zones.
+    Time Complexity: O(r log r) where r is number of rows
+
+    Args:
+        path (str): Profile CSV
+        zones_path (str): Location-to-zone CSV
+    Returns:
+        SpeedProfile | ZonedSpeedProfile: Network profile, or zoned profiles when zones are given
+    Raises:
+        ValueError: If the file has no network rows or a row is malformed
+    """
+    periods = {}
+    with open(path, newline='') as profile_data:
+        for row in csv.reader(profile_data):
+            if not row or row[0].strip().startswith('#') or row[0].strip().lower() == 'zone':
+                continue
+            try:
+                zone, start, speed = (field.strip() for field in row[:3])
+                periods.setdefault(zone, []).append((clock.parse_time(start), float(speed)))
+            except ValueError:
+                raise ValueError(f"Invalid speed profile row: {row}")
+
+    if NETWORK_ZONE not in periods:
+        raise ValueError(f"Speed profile {path} has no network ('{NETWORK_ZONE}') rows")
+    profiles = {zone: SpeedProfile(*zip(*rows)) for zone, rows in periods.items()}
+    network = profiles.pop(NETWORK_ZONE)
+    if not zones_path:
+        return network
+
+    zone_of_location = {}
+    with open(zones_path, newline='') as zone_data:
+        for row in csv.reader(zone_data):
+            if len(row) < 2 or row[0].strip().lower() == 'address':
+                continue
+            zone_of_location[dist.get_location_index(row[0].strip())] = row[1].strip()
+    return ZonedSpeedProfile(network, profiles, zone_of_location)
+
+
+def apply_speed_profile(fleet, profile):
+    """Assigns a speed profile (or None for constant speed) to every vehicle. Time Complexity: O(v)"""
+    for vehicle in fleet:
+        vehicle.speed_profile = profile
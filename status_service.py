@@ -0,0 +1,281 @@
+import argparse
+import asyncio
+import json
+import threading
+import urllib.parse
+
+import clock
+import plan as delivery_plan
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class PlanStore:
+    """
+    Holds the current DeliveryPlan snapshot.
+    Readers grab the reference once per request; re-planning builds a complete new
+    snapshot off the event loop and publishes it with a single reference swap, so a
+    request never observes a half-updated plan.
+    """
+
+    def __init__(self, planner=delivery_plan.plan_deliveries):
+        """
+        Initializes an empty store around a planning function.
+        Time Complexity: O(1)
+
+        Args:
+            planner (callable): Function taking a version number and returning a DeliveryPlan
+        """
+        self.planner = planner
+        self.current = None
+        self._replan_lock = threading.Lock()
+
+    def publish(self, snapshot):
+        """
+        Atomically replaces the current snapshot.
+        Time Complexity: O(1)
+        """
+        self.current = snapshot
+        return snapshot
+
+    def rebuild(self):
+        """
+        Builds and publishes a new plan on the calling thread.
+        Concurrent re-plans are serialized since planning mutates module state.
+        Time Complexity: O(n³) where n is number of delivery points
+
+        Returns:
+            DeliveryPlan: Newly published snapshot
+        """
+        with self._replan_lock:
+            version = self.current.version + 1 if self.current else 1
+            return self.publish(self.planner(version))
+
+    async def replan(self):
+        """
+        Runs rebuild() in a worker thread so the event loop keeps serving queries.
+        Time Complexity: O(n³) where n is number of delivery points
+
+        Returns:
+            DeliveryPlan: Newly published snapshot
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.rebuild)
+
+
+def parcel_to_dict(row):
+    """
+    Converts a ParcelStatus row into a JSON-ready dictionary.
+    Time Complexity: O(1)
+    """
+    return {
+        "tracking_id": row.tracking_id,
+        "destination": row.destination,
+        "city": row.city,
+        "state": row.state,
+        "zip_code": row.zip_code,
+        "deadline": clock.format_seconds(row.deadline),
+        "weight": row.weight,
+        "special_instructions": row.special_instructions,
+        "status": row.status,
+        "vehicle_id": row.vehicle_id,
+        "start_time": clock.format_seconds(row.start_time) or None,
+        "delivery_time": clock.format_seconds(row.delivery_time) or None,
+    }
+
+
+def vehicle_to_dict(row):
+    """
+    Converts a VehicleStatus row into a JSON-ready dictionary.
+    Time Complexity: O(1)
+    """
+    return {
+        "vehicle_id": row.vehicle_id,
+        "operator": row.operator,
+        "status": row.status,
+        "location": row.location,
+        "distance_traveled": round(row.distance_traveled, 2),
+        "packages": row.packages,
+    }
+
+
+class StatusService:
+    """
+    Minimal HTTP/1.1 JSON service answering status queries from a PlanStore.
+
+    Endpoints (all GET accept ?at=HH:MM, defaulting to end of day):
+        GET  /parcels/{id}    One parcel
+        GET  /parcels         All parcels
+        GET  /vehicles/{id}   One vehicle
+        GET  /plan            Current plan version
+        POST /replan          Re-plan and swap the snapshot
+    """
+
+    def __init__(self, store):
+        """
+        Initializes service around a plan store.
+        Time Complexity: O(1)
+        """
+        self.store = store
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        Starts listening. Port 0 picks a free ephemeral port.
+        Time Complexity: O(n³) if an initial plan must be computed
+
+        Returns:
+            tuple: Bound (host, port)
+        """
+        if self.store.current is None:
+            await self.store.replan()
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        """
+        Stops accepting connections and waits for the listener to close.
+        Time Complexity: O(1)
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Serves requests on one keep-alive connection until the client closes it.
+        Time Complexity: O(r) where r is number of requests on the connection
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._send(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                # Request bodies are not used; drain them to keep the stream aligned
+                try:
+                    body_length = int(headers.get('content-length', 0) or 0)
+                    if body_length < 0:
+                        raise ValueError(body_length)
+                except ValueError:
+                    # The body cannot be skipped reliably, so the connection ends here
+                    await self._send(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                if body_length:
+                    await reader.readexactly(body_length)
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+                try:
+                    status, payload = await self.dispatch(method.upper(), target)
+                except Exception as e:
+                    # A failed re-plan leaves the previous snapshot published
+                    status, payload = 500, {"error": str(e)}
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target):
+        """
+        Routes a request to its handler against a single snapshot.
+        Time Complexity: O(1) for single lookups, O(n) for all parcels
+
+        Returns:
+            tuple: HTTP status code and JSON-ready payload
+        """
+        url = urllib.parse.urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = urllib.parse.parse_qs(url.query)
+
+        if parts == ['replan']:
+            if method != 'POST':
+                return 405, {"error": "Use POST to re-plan"}
+            snapshot = await self.store.replan()
+            return 200, {"version": snapshot.version}
+
+        if method != 'GET':
+            return 405, {"error": f"Method {method} not allowed"}
+
+        # One reference for the whole request so a concurrent swap cannot mix versions
+        snapshot = self.store.current
+        try:
+            query_seconds = clock.parse_time(query.get('at', ['17:00'])[0])
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        at_label = clock.format_seconds(query_seconds)
+
+        try:
+            if parts == ['plan']:
+                return 200, {"version": snapshot.version, "parcels": len(snapshot.parcel_ids),
+                             "vehicles": list(snapshot.vehicle_ids)}
+            if parts == ['parcels']:
+                return 200, {"version": snapshot.version, "at": at_label,
+                             "total_mileage": round(snapshot.total_mileage(query_seconds), 2),
+                             "parcels": [parcel_to_dict(row)
+                                         for row in snapshot.all_parcel_statuses(query_seconds)]}
+            if len(parts) == 2 and parts[0] == 'parcels':
+                row = snapshot.parcel_status(int(parts[1]), query_seconds)
+                return 200, {"version": snapshot.version, "at": at_label, "parcel": parcel_to_dict(row)}
+            if len(parts) == 2 and parts[0] == 'vehicles':
+                row = snapshot.vehicle_progress(int(parts[1]), query_seconds)
+                return 200, {"version": snapshot.version, "at": at_label, "vehicle": vehicle_to_dict(row)}
+        except ValueError:
+            return 400, {"error": "Identifiers must be integers"}
+        except LookupError as e:
+            return 404, {"error": str(e)}
+
+        return 404, {"error": f"Unknown endpoint: {url.path}"}
+
+    async def _send(self, writer, status, payload, keep_alive):
+        """Helper function to write a JSON response"""
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host, port):
+    """
+    Runs the status service until cancelled.
+    Time Complexity: O(n³) for the initial plan
+    """
+    service = StatusService(PlanStore())
+    bound_host, bound_port = await service.start(host, port)
+    print(f"WGUPS status service listening on http://{bound_host}:{bound_port}")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WGUPS local status query service")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8950, help="port to listen on (default: 8950)")
+    arguments = parser.parse_args()
+    try:
+        asyncio.run(serve(arguments.host, arguments.port))
+    except KeyboardInterrupt:
+        pass
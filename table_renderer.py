@@ -0,0 +1,239 @@
+import sys
+
+import clock
+import parcels
+
+HEADERS = ["ID", "DELIVERY ADDRESS", "DEADLINE", "SPECIAL NOTES", "STATUS", "VAN", "TIME OF DELIVERY"]
+
+HEADER_LINE = (f"{HEADERS[0]:<5} {HEADERS[1]:<30} {HEADERS[2]:<20} {HEADERS[3]:<35} "
+               f"{HEADERS[4]:<15} {HEADERS[5]:<10} {HEADERS[6]:<21}")
+
+DEFAULT_PAGE_SIZE = 40
+
+RESET = "\033[0m"
+
+# Orderings available to sort(); each maps a parcel to its sort key
+SORT_KEYS = {
+    'id': lambda parcel: parcel.tracking_id,
+    'deadline': lambda parcel: (parcel.deadline, parcel.tracking_id),
+    'address': lambda parcel: (parcel.destination, parcel.tracking_id),
+    'vehicle': lambda parcel: (parcel.assigned_vehicle or 0, parcel.tracking_id),
+    'delivery': lambda parcel: (parcel.delivery_time is None, parcel.delivery_time or 0, parcel.tracking_id),
+}
+
+
+def registry_parcels(registry=None):
+    """
+    Every parcel in a registry in tracking ID order.
+    Time Complexity: O(n log n) where n is number of parcels
+    """
+    registry = registry if registry is not None else parcels.delivery_registry
+    return sorted((package for bucket in registry.storage for _, package in bucket),
+                  key=lambda package: package.tracking_id)
+
+
+class ParcelTableRenderer:
+    """
+    Renders parcel status tables for the CLI.
+    The static columns (ID, address, deadline, notes) are formatted once per parcel and
+    reused; only the status, van and delivery-time columns are formatted per render, and
+    only for the rows in the visible window. Filtering and sorting rearrange an index
+    list over the same parcels, and each render goes to the terminal in one write.
+    """
+
+    def __init__(self, parcel_list, constraint_set=None):
+        """
+        Time Complexity: O(n) where n is number of parcels
+
+        Args:
+            parcel_list (list[Parcel]): Parcels to display
+            constraint_set (ConstraintSet): Compiled constraints for the notes column
+                (defaults to the loaded manifest)
+        """
+        self.constraint_set = constraint_set if constraint_set is not None else parcels.delivery_constraints
+        self.parcels = list(parcel_list)
+        self.view = list(range(len(self.parcels)))  # Parcel positions after filtering and sorting
+        self.sort_key = 'id'
+        self.sort_reverse = False
+        self._static = [None] * len(self.parcels)
+        self._static_destination = [None] * len(self.parcels)
+        self._times = {}
+
+    def __len__(self):
+        return len(self.view)
+
+    def _time_text(self, seconds):
+        """Helper function formatting a time once and reusing the text for repeats"""
+        text = self._times.get(seconds)
+        if text is None:
+            text = self._times[seconds] = clock.format_time(seconds)
+        return text
+
+    def _static_columns(self, position):
+        """
+        Helper function returning the pre-formatted static columns of a parcel.
+        Reformatted only when the destination changed (the parcel 9 correction).
+        """
+        package = self.parcels[position]
+        if self._static_destination[position] is not package.destination:
+            deadline = self._time_text(package.deadline) if package.deadline is not None else "04:59 PM"
+            note = self.constraint_set.note(package.tracking_id)
+            self._static[position] = (f"{str(package.tracking_id):<5} {package.destination[:25]:<30} "
+                                      f"{deadline:<20} {note:<35}")
+            self._static_destination[position] = package.destination
+        return self._static[position]
+
+    @staticmethod
+    def status_of(package, query_seconds):
+        """
+        Status shown for a parcel at a time, as format_package_info decides it.
+        Time Complexity: O(1)
+        """
+        if query_seconds is None:
+            return "at hub"
+        if package.start_time is not None and query_seconds < package.start_time:
+            return "at hub"
+        if package.delivery_time is not None and query_seconds >= package.delivery_time:
+            return "delivered"
+        return "en route"
+
+    def format_row(self, position, query_seconds):
+        """
+        One table row, identical to cli_interface.format_package_info().
+        Time Complexity: O(1)
+        """
+        package = self.parcels[position]
+        status = self.status_of(package, query_seconds)
+        if status == "delivered":
+            predicted_time = self._time_text(package.delivery_time)
+        elif package.delivery_time is not None:
+            predicted_time = f"🦉 {self._time_text(package.delivery_time)}"
+        else:
+            predicted_time = "🦉"
+        van = f"VAN: {package.assigned_vehicle}" if package.assigned_vehicle else ""
+        return f"{self._static_columns(position)} {status:<15} {van:<10} {predicted_time:<20}"
+
+    def sort(self, key='id', reverse=False):
+        """
+        Reorders the current view without re-reading any parcel source.
+        Time Complexity: O(m log m) where m is number of rows in the view
+
+        Raises:
+            ValueError: If key is not one of SORT_KEYS
+        """
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {key} (choose from {', '.join(SORT_KEYS)})")
+        order = SORT_KEYS[key]
+        self.view.sort(key=lambda position: order(self.parcels[position]), reverse=reverse)
+        self.sort_key = key
+        self.sort_reverse = reverse
+
+    def filter(self, query_seconds=None, status=None, vehicle=None, text=None):
+        """
+        Restricts the view to matching parcels, keeping the current sort order.
+        Each call filters the full parcel list, so filters replace rather than stack.
+        Time Complexity: O(n) where n is number of parcels
+
+        Args:
+            query_seconds (int): Time the status filter is evaluated at
+            status (str): 'at hub', 'en route' or 'delivered'
+            vehicle (int): Assigned vehicle
+            text (str): Case-insensitive text the static columns must contain
+        Returns:
+            int: Number of rows in the view
+        """
+        needle = text.lower() if text else None
+        selected = []
+        for position, package in enumerate(self.parcels):
+            if status is not None and self.status_of(package, query_seconds) != status:
+                continue
+            if vehicle is not None and package.assigned_vehicle != vehicle:
+                continue
+            if needle is not None and needle not in self._static_columns(position).lower():
+                continue
+            selected.append(position)
+        self.view = selected
+        self.sort(self.sort_key, self.sort_reverse)
+        return len(self.view)
+
+    def page_count(self, page_size=DEFAULT_PAGE_SIZE):
+        """Number of pages in the view (at least 1). Time Complexity: O(1)"""
+        return max(1, -(-len(self.view) // page_size))
+
+    def render(self, query_seconds, page=0, page_size=DEFAULT_PAGE_SIZE, out=None, row_color="\033[0;36m"):
+        """
+        Writes one page of rows in a single write.
+        Time Complexity: O(page_size)
+
+        Args:
+            query_seconds (int): Time statuses are shown for (None shows every parcel at the hub)
+            page (int): Zero-based page number (clamped to the last page)
+            page_size (int): Rows per page (None renders the whole view)
+            out (file): Destination (defaults to sys.stdout)
+            row_color (str): ANSI prefix for each row ('' for plain text)
+        Returns:
+            int: Number of rows written
+        """
+        out = out if out is not None else sys.stdout
+        if page_size is None:
+            window = self.view
+        else:
+            page = min(max(page, 0), self.page_count(page_size) - 1)
+            window = self.view[page * page_size:(page + 1) * page_size]
+        suffix = RESET if row_color else ''
+        lines = [f"{row_color}{self.format_row(position, query_seconds)}{suffix}" for position in window]
+        if lines:
+            out.write("\n".join(lines) + "\n")
+        return len(lines)
+
+
+def browse(renderer, query_seconds, page_size=DEFAULT_PAGE_SIZE, prompt=input, out=None, row_color="\033[0;36m"):
+    """
+    Shows the table a page at a time with commands for paging, filtering and sorting.
+    A view that fits on one page is rendered without prompting.
+    Time Complexity: O(page_size) per command, O(n) per filter
+
+    Commands: n (next), p (previous), g N (go to page), f TEXT (filter by text),
+    status STATUS, van ID, clear, s KEY (sort), q (quit)
+    """
+    out = out if out is not None else sys.stdout
+    page = 0
+    while True:
+        renderer.render(query_seconds, page, page_size, out, row_color)
+        pages = renderer.page_count(page_size)
+        if pages == 1 and len(renderer) == len(renderer.parcels):
+            return
+        out.write(f"\033[37;97mPage {page + 1}/{pages} ({len(renderer)} rows) | n, p, g N, f TEXT, "
+                  f"status STATUS, van ID, clear, s {'/'.join(SORT_KEYS)}, q{RESET}\n")
+        out.flush()
+        command, _, argument = prompt("> ").strip().partition(' ')
+        command = command.lower()
+        try:
+            if command in ('', 'n'):
+                if page + 1 >= pages:
+                    return
+                page += 1
+            elif command == 'p':
+                page = max(page - 1, 0)
+            elif command == 'g':
+                page = min(max(int(argument) - 1, 0), pages - 1)
+            elif command == 'f':
+                renderer.filter(query_seconds, text=argument)
+                page = 0
+            elif command == 'status':
+                renderer.filter(query_seconds, status=argument.lower())
+                page = 0
+            elif command == 'van':
+                renderer.filter(query_seconds, vehicle=int(argument))
+                page = 0
+            elif command == 'clear':
+                renderer.filter(query_seconds)
+                page = 0
+            elif command == 's':
+                key, _, direction = argument.partition(' ')
+                renderer.sort(key or 'id', reverse=direction.lower() == 'desc')
+                page = 0
+            elif command == 'q':
+                return
+        except ValueError as e:
+            out.write(f"\033[31;91;40m{e}{RESET}\n")
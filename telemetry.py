@@ -0,0 +1,339 @@
+import bisect
+import socket
+import sys
+from collections import namedtuple
+
+import clock
+import event_log
+import plan
+
+STOP = 'stop'
+DELIVERED = 'delivered'
+
+ScanEvent = namedtuple('ScanEvent', ['vehicle_id', 'time', 'kind', 'value'])
+
+
+def parse_scan(line):
+    """
+    Parses one 'vehicle,time,kind,value' telemetry line. kind is 'stop' (value is the
+    location index reached) or 'delivered' (value is the tracking ID scanned).
+    Time Complexity: O(1)
+
+    Returns:
+        ScanEvent: Parsed event, or None for blank and '#' comment lines
+    Raises:
+        ValueError: If the line is malformed
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    try:
+        vehicle, time, kind, value = line.split(',')
+        kind = kind.strip().lower()
+        if kind not in (STOP, DELIVERED):
+            raise ValueError
+        return ScanEvent(int(vehicle), clock.parse_time(time), kind, int(value))
+    except ValueError:
+        raise ValueError(f"Invalid telemetry line: {line}")
+
+
+def read_scans(source):
+    """
+    Yields scan events from a file path, '-' for stdin, 'tcp://host:port' for a socket,
+    or any iterable of text lines. Events are yielded as soon as their line arrives.
+    Time Complexity: O(1) per event
+
+    Args:
+        source (str | iterable[str]): Telemetry source
+    Yields:
+        ScanEvent: Events in stream order
+    """
+    if not isinstance(source, str):
+        lines, closer = source, None
+    elif source == '-':
+        lines, closer = sys.stdin, None
+    elif source.startswith('tcp://'):
+        host, _, port = source[len('tcp://'):].rpartition(':')
+        connection = socket.create_connection((host or '127.0.0.1', int(port)))
+        lines = connection.makefile('r', encoding='utf-8', newline='')
+        closer = connection
+    else:
+        lines = open(source, newline='')
+        closer = lines
+
+    try:
+        for line in lines:
+            event = parse_scan(line)
+            if event is not None:
+                yield event
+    finally:
+        if closer is not None:
+            closer.close()
+
+
+class LiveTimeline:
+    """
+    A vehicle timeline corrected by telemetry.
+    Planned arrival times are kept unchanged; the stops reached so far carry their actual
+    times, and every later stop is estimated as planned time plus the delay observed at
+    the last stop reached. A scan therefore shifts the whole remaining suffix by
+    updating one number instead of rewriting it.
+    """
+
+    def __init__(self, timeline):
+        """
+        Time Complexity: O(n) where n is number of route points
+
+        Args:
+            timeline (VehicleTimeline): Planned timeline from a DeliveryPlan
+        """
+        self.timeline = timeline
+        self.position = 0  # Last route position reached
+        self.delay = 0  # Actual minus planned time at that position
+        self.reached = [timeline.leave_time]  # Actual times of the reached positions in order
+        self.reached_positions = [0]
+        self.positions_of = {}
+        for position, stop in enumerate(timeline.route):
+            self.positions_of.setdefault(stop, []).append(position)
+
+    def next_position(self, stop):
+        """
+        Route position of the next visit to stop after the current position, or None.
+        A repeated scan of the stop the vehicle is at (such as the hub before leaving) is None.
+        Time Complexity: O(1) when the scan is for the next planned stop, O(log n) otherwise
+        """
+        route = self.timeline.route
+        if route[self.position] == stop:
+            return None
+        if self.position + 1 < len(route) and route[self.position + 1] == stop:
+            return self.position + 1
+        positions = self.positions_of.get(stop, ())
+        index = bisect.bisect_right(positions, self.position)
+        return positions[index] if index < len(positions) else None
+
+    def reach(self, position, time):
+        """
+        Records the vehicle at a route position at an actual time and shifts the suffix.
+        Scans for positions already passed, or timed before the last position reached,
+        are ignored so the reached times stay in order.
+        Time Complexity: O(1)
+
+        Returns:
+            bool: True if the timeline advanced
+        """
+        if position is None or position <= self.position or time < self.reached[-1]:
+            return False
+        self.position = position
+        self.delay = time - self.timeline.arrival_times[position]
+        self.reached.append(time)
+        self.reached_positions.append(position)
+        return True
+
+    def arrival(self, position):
+        """
+        Actual arrival for reached positions, planned time plus current delay for the rest.
+        Positions skipped by the scans take the delay of the next position reached.
+        Time Complexity: O(1) for the remaining suffix, O(log r) for passed positions
+        """
+        if position > self.position:
+            return self.timeline.arrival_times[position] + self.delay
+        index = bisect.bisect_left(self.reached_positions, position)
+        shift = self.reached[index] - self.timeline.arrival_times[self.reached_positions[index]]
+        return self.timeline.arrival_times[position] + shift
+
+    def progress(self, query_seconds):
+        """
+        Location and miles driven at a time, interpolating between corrected arrivals.
+        Time Complexity: O(log n)
+
+        Returns:
+            tuple: (route position of the last stop reached, miles driven)
+        """
+        timeline = self.timeline
+        if query_seconds >= self.reached[-1]:
+            # Suffix: compare against planned times shifted by the current delay
+            position = max(bisect.bisect_right(timeline.arrival_times, query_seconds - self.delay) - 1,
+                           self.position)
+        else:
+            index = bisect.bisect_right(self.reached, query_seconds) - 1
+            if index < 0:
+                return 0, 0.0
+            following = self.reached_positions[index + 1]
+            # Planned position on the stretch between two scans
+            shift = self.reached[index + 1] - timeline.arrival_times[following]
+            position = max(bisect.bisect_right(timeline.arrival_times, query_seconds - shift) - 1,
+                           self.reached_positions[index])
+            position = min(position, following)
+        miles = timeline.cumulative_miles[position]
+        if position < len(timeline.route) - 1:
+            start, end = self.arrival(position), self.arrival(position + 1)
+            if end > start and query_seconds > start:
+                fraction = min((query_seconds - start) / (end - start), 1.0)
+                miles += (timeline.cumulative_miles[position + 1] - miles) * fraction
+        return position, miles
+
+
+class TelemetryTracker:
+    """
+    Applies scan events to a DeliveryPlan's vehicle timelines and answers the same status
+    queries with corrected positions and ETAs. Each event costs O(1) (O(log n) when a
+    vehicle skips or revisits stops); nothing is re-simulated.
+    """
+
+    def __init__(self, delivery_plan, log=None):
+        """
+        Time Complexity: O(n + p) where n is number of route points and p is number of parcels
+
+        Args:
+            delivery_plan (DeliveryPlan): Plan the telemetry refers to
+            log (EventLog): Optional event log that receives every accepted scan
+        """
+        self.plan = delivery_plan
+        self.log = log
+        self.timelines = {vehicle_id: LiveTimeline(timeline)
+                          for vehicle_id, timeline in delivery_plan.vehicles.items()}
+        self.delivered = {}  # Tracking ID -> scanned delivery time
+        self.parcel_position = {}  # Tracking ID -> route position of its planned delivery
+        for tracking_id, record in delivery_plan.parcels.items():
+            live = self.timelines.get(record.vehicle_id)
+            if live is None or record.delivery_time is None:
+                continue
+            times = live.timeline.arrival_times
+            # Last route position with the planned delivery time, as later visits deliver
+            position = bisect.bisect_right(times, record.delivery_time) - 1
+            if position > 0 and times[position] == record.delivery_time:
+                self.parcel_position[tracking_id] = position
+        self.accepted = 0
+        self.ignored = 0
+
+    def apply(self, event):
+        """
+        Applies one scan event.
+        Time Complexity: O(1), O(log n) for out-of-sequence stops
+
+        Args:
+            event (ScanEvent): Scan to apply
+        Returns:
+            bool: True if the event changed the tracker
+        """
+        live = self.timelines.get(event.vehicle_id)
+        if live is None:
+            self.ignored += 1
+            return False
+
+        if event.kind == STOP:
+            position = live.next_position(event.value)
+            changed = live.reach(position, event.time)
+            if changed and self.log is not None:
+                self.log.append(event.time, event_log.ARRIVED, event.vehicle_id, location=event.value,
+                                miles=live.timeline.cumulative_miles[position])
+        else:
+            changed = event.value not in self.delivered
+            if changed:
+                self.delivered[event.value] = event.time
+                # A delivery scan also places the vehicle at the parcel's stop, when it is the
+                # vehicle the parcel was planned on (route positions belong to that vehicle)
+                record = self.plan.parcels.get(event.value)
+                position = self.parcel_position.get(event.value)
+                if (position is not None and record.vehicle_id == event.vehicle_id
+                        and position > live.position):
+                    live.reach(position, event.time)
+                if self.log is not None:
+                    self.log.append(event.time, event_log.DELIVERED, event.vehicle_id, event.value)
+
+        if changed:
+            self.accepted += 1
+        else:
+            self.ignored += 1
+        return changed
+
+    def consume(self, events):
+        """
+        Applies a stream of events.
+        Time Complexity: O(e) where e is number of events
+
+        Returns:
+            int: Number of events that changed the tracker
+        """
+        before = self.accepted
+        for event in events:
+            self.apply(event)
+        return self.accepted - before
+
+    def eta(self, tracking_id):
+        """
+        Scanned delivery time, or the corrected estimate for an undelivered parcel.
+        Time Complexity: O(1) for parcels still ahead of their vehicle
+
+        Returns:
+            int: Seconds since midnight, or None if the parcel is not planned for delivery
+        """
+        if tracking_id in self.delivered:
+            return self.delivered[tracking_id]
+        position = self.parcel_position.get(tracking_id)
+        if position is None:
+            return None
+        return self.timelines[self.plan.parcels[tracking_id].vehicle_id].arrival(position)
+
+    def parcel_status(self, tracking_id, query_seconds):
+        """
+        Parcel status at a time using scanned and corrected delivery times.
+        Time Complexity: O(log k) as DeliveryPlan.parcel_status()
+
+        Raises:
+            LookupError: If package not found
+        """
+        row = self.plan.parcel_status(tracking_id, query_seconds)
+        delivery_time = self.eta(tracking_id)
+        if row.start_time is None or query_seconds < row.start_time:
+            status = "at hub"
+        elif delivery_time is None or query_seconds < delivery_time:
+            status = "en route"
+        else:
+            status = "delivered"
+        return row._replace(status=status, delivery_time=delivery_time)
+
+    def vehicle_progress(self, vehicle_id, query_seconds):
+        """
+        Vehicle location and miles at a time along its corrected timeline.
+        Time Complexity: O(log n)
+
+        Raises:
+            LookupError: If vehicle not found
+        """
+        live = self.timelines.get(vehicle_id)
+        if live is None:
+            raise LookupError(f"Vehicle #{vehicle_id} not found")
+        timeline = live.timeline
+        packages = len(timeline.shipments)
+        if query_seconds < timeline.leave_time or len(timeline.route) < 2:
+            location = timeline.route[0] if timeline.route else 0
+            return plan.VehicleStatus(vehicle_id, plan.operator_at(timeline, query_seconds), "at hub", location, 0.0,
+                                      packages)
+        position, miles = live.progress(query_seconds)
+        status = "completed deliveries" if position == len(timeline.route) - 1 else "en route"
+        return plan.VehicleStatus(vehicle_id, plan.operator_at(timeline, query_seconds), status,
+                                  timeline.route[position], miles, packages)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Apply vehicle scan telemetry to the day's plan")
+    parser.add_argument("source", nargs='?', default='-',
+                        help="telemetry file, '-' for stdin, or tcp://host:port (default: stdin)")
+    parser.add_argument("--at", default='17:00', metavar="TIME", help="time to report ETAs for")
+    arguments = parser.parse_args()
+
+    tracker = TelemetryTracker(plan.plan_deliveries())
+    started = time.perf_counter()
+    tracker.consume(read_scans(arguments.source))
+    elapsed = time.perf_counter() - started
+    print(f"Applied {tracker.accepted} events ({tracker.ignored} ignored) in {elapsed:.3f}s")
+
+    query_seconds = clock.parse_time(arguments.at)
+    for tracking_id in tracker.plan.parcel_ids:
+        row = tracker.parcel_status(tracking_id, query_seconds)
+        print(f"#{tracking_id:>3} {row.status:<10} vehicle {row.vehicle_id} "
+              f"ETA {clock.format_seconds(row.delivery_time) or '-'}")
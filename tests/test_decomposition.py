@@ -0,0 +1,82 @@
+import unittest
+
+import decomposition
+import parcels
+import plan
+import scheduling
+import van
+
+
+def _timeline(trip_id, operator, leave_time, route, shipments):
+    arrivals = tuple(leave_time + 600 * position for position in range(len(route)))
+    miles = tuple(float(position) for position in range(len(route)))
+    return plan.VehicleTimeline(trip_id, operator, leave_time, 18.0, tuple(route), arrivals, miles, shipments)
+
+
+def _assignment(trip_id, driver_id, truck_id, departure):
+    return scheduling.TripAssignment(trip_id, driver_id, truck_id, departure, departure + 1800, True, 3.0, 0)
+
+
+class MergeTripsTest(unittest.TestCase):
+    def test_merged_truck_keeps_each_trips_driver(self):
+        timelines = {1: _timeline(1, 1, 28800, (0, 5, 0), (1,)),
+                     2: _timeline(2, 2, 36000, (0, 7, 0), (2,))}
+        records = {tracking_id: plan.ParcelRecord(tracking_id, '', '', '', '', 61200, '1', '', trip_id,
+                                                  timelines[trip_id].leave_time, None, ())
+                   for tracking_id, trip_id in ((1, 1), (2, 2))}
+        schedule = scheduling.Schedule((_assignment(1, 1, 2, 28800), _assignment(2, 2, 2, 36000)), 6.0, 0, 6.0)
+
+        merged = decomposition._merge_trips(plan.DeliveryPlan(records, timelines), schedule)
+
+        self.assertEqual(merged.vehicle_ids, (2,))
+        timeline = merged.vehicles[2]
+        self.assertEqual(timeline.route, (0, 5, 0, 0, 7, 0))
+        self.assertEqual(timeline.driver_changes, ((36000, 2),))
+        self.assertEqual(merged.vehicle_progress(2, 30000).operator, 1)
+        self.assertEqual(merged.vehicle_progress(2, 36600).operator, 2)
+        self.assertEqual({record.vehicle_id for record in merged.parcels.values()}, {2})
+
+
+class RepairBoundariesTest(unittest.TestCase):
+    def test_stop_moves_to_the_route_it_sits_beside(self):
+        # Stops on a line: 1 and 2 near the hub, 3 and 4 far out; stop 3 starts on the near route
+        positions = [0, 1, 2, 9, 10]
+        distances = [[float(abs(a - b)) for b in positions] for a in positions]
+        routes = [[0, 1, 3, 2, 0], [0, 4, 0]]
+        saved = decomposition.repair_boundaries(routes, distances, dict.fromkeys(range(1, 5), 1), capacity=4,
+                                                neighbor_count=2)
+        self.assertGreater(saved, 0)
+        self.assertNotIn(3, routes[0])
+        self.assertIn(3, routes[1])
+
+
+class PlanDecomposedTest(unittest.TestCase):
+    def setUp(self):
+        parcels.import_parcels()
+
+    def test_delayed_parcels_split_from_their_stop(self):
+        constraint_set = parcels.delivery_constraints
+        split = decomposition._split_by_ready((9, 37), constraint_set)
+        self.assertEqual(len(split), 2)
+        self.assertEqual(split[scheduling.DAY_START], (37,))
+
+    def test_plan_uses_the_fleet_and_reports_late_parcels(self):
+        delivery_plan = decomposition.plan_decomposed(workers=1)
+        fleet_ids = {vehicle.id for vehicle in van.fleet}
+        self.assertLessEqual(set(delivery_plan.vehicle_ids), fleet_ids)
+        self.assertEqual(len(delivery_plan.parcel_ids), 40)
+        late = []
+        for tracking_id in delivery_plan.parcel_ids:
+            record = delivery_plan.parcels[tracking_id]
+            self.assertIn(record.vehicle_id, fleet_ids)
+            self.assertIsNotNone(record.delivery_time)
+            truck = parcels.delivery_constraints.truck_for(tracking_id)
+            if truck is not None:
+                self.assertEqual(record.vehicle_id, truck)
+            if record.delivery_time > record.deadline:
+                late.append(tracking_id)
+        self.assertEqual(decomposition.late_parcels(delivery_plan), late)
+        self.assertLessEqual(len(late), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+import clock
+import event_log
+import plan
+
+
+class EventLogTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'day.log')
+
+    def test_replay_matches_the_plan(self):
+        delivery_plan = plan.plan_deliveries()
+        with event_log.EventLog(self.path, checkpoint_interval=16) as log:
+            self.assertGreater(event_log.record_plan(log, delivery_plan), len(delivery_plan.parcel_ids))
+            for text in ('08:30', '09:30', '10:25', '12:00', '17:00'):
+                seconds = clock.parse_time(text)
+                state = log.state_at(seconds)
+                for tracking_id in delivery_plan.parcel_ids:
+                    expected = delivery_plan.parcel_status(tracking_id, seconds)
+                    replayed = state.parcels[tracking_id]
+                    self.assertEqual((replayed.status, replayed.destination),
+                                     (expected.status, expected.destination), (text, tracking_id))
+
+    def test_late_events_invalidate_checkpoints(self):
+        with event_log.EventLog(self.path, checkpoint_interval=2) as log:
+            for tracking_id in range(1, 6):
+                log.append(0, event_log.REGISTERED, tracking_id=tracking_id, payload=f"{tracking_id} Main St\t84101")
+            log.append(600, event_log.LOADED, 1, 1, 0)
+            log.append(700, event_log.DEPARTED, 1, location=0)
+            self.assertEqual(log.state_at(800).parcels[1].status, 'en route')
+            # Recorded after the fact, but happened before the departure
+            log.append(650, event_log.LOADED, 1, 2, 0)
+            state = log.state_at(800)
+            self.assertEqual(state.parcels[2].status, 'en route')
+            self.assertEqual(state.vehicles[1].cargo, (1, 2))
+            self.assertEqual([event.time for event in log.events()], [0] * 5 + [600, 650, 700])
+
+    def test_reopen_recovers_index_and_drops_torn_record(self):
+        with event_log.EventLog(self.path) as log:
+            log.append(0, event_log.REGISTERED, tracking_id=1, payload="1 Main St\t84101")
+            log.append(60, event_log.LOADED, 1, 1, 0)
+        with event_log.EventLog(self.path) as log:
+            log.append(120, event_log.DEPARTED, 1, location=0)
+            log._file.flush()
+            size = os.path.getsize(self.path)
+            log._file.write(b'\x01\x02\x03')  # A crash mid-write leaves a partial record
+            log._file.flush()
+            log._file.close()
+        self.assertEqual(os.path.getsize(self.path), size + 3)
+
+        with event_log.EventLog(self.path) as log:
+            self.assertEqual(len(log), 3)
+            self.assertEqual(os.path.getsize(self.path), size)
+            self.assertEqual(log.next_sequence, 3)
+            self.assertEqual(log.state_at(200).parcels[1].status, 'en route')
+
+    def test_rejects_unknown_kinds_and_foreign_files(self):
+        with event_log.EventLog(self.path) as log:
+            with self.assertRaises(ValueError):
+                log.append(0, 99)
+        other = self.path + '.txt'
+        with open(other, 'wb') as handle:
+            handle.write(b'not a log at all')
+        with self.assertRaises(ValueError):
+            event_log.EventLog(other)
+
+
+if __name__ == '__main__':
+    unittest.main()
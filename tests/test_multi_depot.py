@@ -0,0 +1,77 @@
+import unittest
+
+import clock
+import locations
+import multi_depot
+import parcels
+import van
+
+
+class MultiDepotTest(unittest.TestCase):
+    def setUp(self):
+        parcels.import_parcels()
+        self.addresses = locations.import_addresses()
+
+    def _plan(self, depots):
+        return multi_depot.plan_multi_depot_snapshot(depots, workers=1)
+
+    def test_uneven_depots_load_every_parcel_once(self):
+        depots = [multi_depot.Depot('A', self.addresses[0], multi_depot.DEFAULT_TRUCKS[:2]),
+                  multi_depot.Depot('B', self.addresses[17], multi_depot.DEFAULT_TRUCKS[2:])]
+        snapshot, result = self._plan(depots)
+
+        loaded = [package.tracking_id for vehicle in result.fleet for package in vehicle.shipments]
+        self.assertEqual(len(loaded), 40)
+        self.assertEqual(sorted(loaded), sorted(result.depot_of_parcel))
+        self.assertEqual([vehicle.id for vehicle in result.fleet], [1, 2, 3])
+        for vehicle in result.fleet:
+            self.assertLessEqual(len(vehicle.shipments), vehicle.max_cargo)
+            for package in vehicle.shipments:
+                self.assertEqual(result.depot_of_parcel[package.tracking_id], result.depot_of_vehicle[vehicle.id])
+        self.assertTrue(all(record.delivery_time is not None for record in snapshot.parcels.values()))
+
+    def test_truck_restriction_names_the_merged_fleet_truck(self):
+        depots = [multi_depot.Depot('A', self.addresses[0]), multi_depot.Depot('B', self.addresses[17])]
+        _, result = self._plan(depots)
+        restricted = 0
+        for vehicle in result.fleet:
+            for package in vehicle.shipments:
+                truck = parcels.delivery_constraints.truck_for(package.tracking_id)
+                if truck is not None:
+                    restricted += 1
+                    self.assertEqual(vehicle.id, truck)
+        self.assertGreater(restricted, 0)
+
+    def test_delayed_parcels_ride_trucks_leaving_after_they_arrive(self):
+        depots = [multi_depot.Depot('A', self.addresses[0], multi_depot.DEFAULT_TRUCKS[:2]),
+                  multi_depot.Depot('B', self.addresses[17], multi_depot.DEFAULT_TRUCKS[2:])]
+        _, result = self._plan(depots)
+        for vehicle in result.fleet:
+            for package in vehicle.shipments:
+                available = parcels.delivery_constraints.available_at(package.tracking_id)
+                self.assertGreaterEqual(vehicle.leave_time, available or 0)
+
+    def test_depot_trucks_have_their_own_drivers(self):
+        depots = [multi_depot.Depot('A', self.addresses[0]), multi_depot.Depot('B', self.addresses[17])]
+        _, result = self._plan(depots)
+        self.assertEqual([vehicle.operator for vehicle in result.fleet], [1, 2, 1, 3, 4, 3])
+
+    def test_parcel_without_an_eligible_truck_raises(self):
+        depots = [multi_depot.Depot('A', self.addresses[0], multi_depot.DEFAULT_TRUCKS[:1]),
+                  multi_depot.Depot('B', self.addresses[17], multi_depot.DEFAULT_TRUCKS[:1])]
+        with self.assertRaises(ValueError):
+            self._plan(depots)
+
+    def test_load_depot_uses_every_truck(self):
+        trucks = [van.DeliveryVehicle(vehicle_id, departure, 1)
+                  for vehicle_id, departure in ((4, '08:00:00'), (5, '09:05:00'))]
+        units = [multi_depot.DepotUnit((tracking_id,), None, 0, clock.END_OF_DAY)
+                 for tracking_id in range(1, 21)]
+        loads = multi_depot.load_depot(units, trucks)
+        self.assertEqual(sorted(len(ids) for ids in loads.values()), [10, 10])
+        with self.assertRaises(ValueError):
+            multi_depot.load_depot(units + [multi_depot.DepotUnit((99,), 6, 0, 0)], trucks)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import random
+import unittest
+
+import locations
+import optimizer_kernels
+import routing
+
+
+class OptimizerKernelsTest(unittest.TestCase):
+    def setUp(self):
+        self.distances = locations.import_distances()
+        self.rng = random.Random(950)
+        self.enabled = optimizer_kernels.ENABLED
+
+    def tearDown(self):
+        optimizer_kernels.ENABLED = self.enabled
+
+    def _python_search(self, route):
+        optimizer_kernels.ENABLED = False
+        try:
+            return routing._optimize_route(list(route), self.distances)
+        finally:
+            optimizer_kernels.ENABLED = self.enabled
+
+    def test_route_cost_matches_calculate_distance(self):
+        matrix = optimizer_kernels.prepare_matrix(self.distances)
+        route = [0] + self.rng.sample(range(1, len(self.distances)), 10) + [0]
+        self.assertAlmostEqual(optimizer_kernels.route_cost(optimizer_kernels._route_values(route), matrix),
+                               locations.calculate_distance(route, self.distances))
+
+    def test_kernels_return_the_python_search_route(self):
+        for number in range(6):
+            route = [0] + self.rng.sample(range(1, len(self.distances)), 8)
+            if number % 2 == 0:
+                route.append(0)
+            self.assertEqual(optimizer_kernels.optimize_route(list(route), self.distances),
+                             self._python_search(route))
+
+    def test_supports_rejects_missing_distances(self):
+        distances = [[0.0, None], [None, 0.0]]
+        self.assertFalse(optimizer_kernels.supports([0, 1, 0], distances))
+        self.assertFalse(optimizer_kernels.supports([0, 5], self.distances[:3]))
+
+    def test_routing_skips_kernels_when_disabled(self):
+        optimizer_kernels.ENABLED = False
+        self.assertIsNone(routing._compiled_kernels())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import locations
+import shared_distances
+
+
+class SharedDistanceMatrixTest(unittest.TestCase):
+    def setUp(self):
+        self.distances = locations.import_distances()
+        self.shared = shared_distances.SharedDistanceMatrix.publish(self.distances)
+        self.addCleanup(self.shared.close)
+
+    def test_matches_the_list_matrix(self):
+        self.assertEqual(len(self.shared), len(self.distances))
+        for i, row in enumerate(self.distances):
+            self.assertEqual([self.shared[i][j] for j in range(len(row))], row)
+        route = [0, 5, 9, 0]
+        self.assertAlmostEqual(locations.calculate_distance(route, self.shared),
+                               locations.calculate_distance(route, self.distances))
+
+    def test_lookup_rejects_out_of_range_indices(self):
+        self.assertEqual(self.shared.lookup(1, 0), self.distances[1][0])
+        for a, b in ((-1, 0), (0, -1), (len(self.distances), 0), (0, len(self.distances))):
+            with self.assertRaises(IndexError):
+                self.shared.lookup(a, b)
+        with self.assertRaises(IndexError):
+            self.shared[-1]
+        with self.assertRaises(IndexError):
+            self.shared[0][-1]
+
+    def test_attach_reads_the_same_cells(self):
+        attached = shared_distances.SharedDistanceMatrix.attach(self.shared.name)
+        self.assertFalse(attached.owner)
+        self.assertEqual(attached[3][1], self.distances[3][1])
+        attached.close()
+        attached.close()
+
+    def test_other_process_detaching_leaves_the_segment(self):
+        script = (f"import shared_distances; m = shared_distances.SharedDistanceMatrix.attach({self.shared.name!r}); "
+                  f"print(m[2][1]); m.close()")
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(shared_distances.__file__)))
+        self.assertEqual(float(result.stdout), self.distances[2][1])
+        self.assertNotIn('leaked', result.stderr)
+        reattached = shared_distances.SharedDistanceMatrix.attach(self.shared.name)
+        self.assertEqual(reattached[2][1], self.distances[2][1])
+        reattached.close()
+
+    def test_attach_missing_segment_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            shared_distances.SharedDistanceMatrix.attach('wgups_missing_matrix')
+
+    def test_parallel_evaluation_matches_serial(self):
+        routes = [[0, 1, 2, 0], [0, 3, 4, 5, 0], [0, 7]]
+        self.assertEqual(shared_distances.evaluate_routes_parallel(routes, self.distances, processes=2),
+                         [locations.calculate_distance(route, self.distances) for route in routes])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import io
+import unittest
+
+import parcels
+import table_renderer
+
+
+class ParcelTableRendererTest(unittest.TestCase):
+    def setUp(self):
+        parcels.import_parcels()
+        self.parcel_list = parcels.read_parcels()
+        for package in self.parcel_list:
+            package.assigned_vehicle = 1 + package.tracking_id % 3
+        self.renderer = table_renderer.ParcelTableRenderer(self.parcel_list)
+
+    def _ids(self):
+        return [self.renderer.parcels[position].tracking_id for position in self.renderer.view]
+
+    def test_filter_keeps_a_descending_sort(self):
+        self.renderer.sort('id', reverse=True)
+        self.renderer.filter(vehicle=2)
+        ids = self._ids()
+        self.assertEqual(ids, sorted((p.tracking_id for p in self.parcel_list if p.assigned_vehicle == 2),
+                                     reverse=True))
+        self.renderer.filter()
+        self.assertEqual(self._ids(), list(range(40, 0, -1)))
+
+    def test_filter_keeps_the_sort_key(self):
+        self.renderer.sort('deadline')
+        self.renderer.filter(text='salt lake')
+        deadlines = [self.renderer.parcels[position].deadline for position in self.renderer.view]
+        self.assertEqual(deadlines, sorted(deadlines))
+
+    def test_unknown_sort_key_raises(self):
+        with self.assertRaises(ValueError):
+            self.renderer.sort('weight')
+
+    def test_render_writes_one_page(self):
+        out = io.StringIO()
+        written = self.renderer.render(None, page=1, page_size=15, out=out, row_color='')
+        self.assertEqual(written, 15)
+        self.assertEqual(len(out.getvalue().splitlines()), 15)
+        self.assertTrue(out.getvalue().startswith("16 "))
+        self.assertEqual(self.renderer.page_count(15), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
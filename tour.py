@@ -0,0 +1,458 @@
+import heapq
+import math
+from collections import deque
+
+# Stand-in stop that closes an open route into a cycle; reaching it costs nothing
+OPEN_END = -1
+
+# Tours up to this many stops use ArrayTour; longer ones use TwoLevelTour
+ARRAY_TOUR_LIMIT = 1000
+
+# Smallest gain treated as an improvement, so rounding noise cannot cycle the search
+MIN_GAIN = 1e-9
+
+
+class ArrayTour:
+    """
+    Cyclic tour stored as an order array plus the inverse position index.
+    next, prev and between are O(1). reverse rewrites the shorter of the path and its
+    complement in place, which is O(n) in the worst case, so this suits tours of up to
+    a few thousand stops.
+    """
+
+    def __init__(self, stops):
+        """
+        Time Complexity: O(n) where n is number of stops
+
+        Args:
+            stops (list[int]): Stops in tour order, each visited once
+        Raises:
+            ValueError: If a stop appears twice
+        """
+        self.order = list(stops)
+        self.position = {stop: i for i, stop in enumerate(self.order)}
+        if len(self.position) != len(self.order):
+            raise ValueError("A tour visits each stop once")
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def next(self, stop):
+        """Stop visited after stop. Time Complexity: O(1)"""
+        following = self.position[stop] + 1
+        return self.order[following if following < len(self.order) else 0]
+
+    def prev(self, stop):
+        """Stop visited before stop. Time Complexity: O(1)"""
+        return self.order[self.position[stop] - 1]
+
+    def between(self, a, b, c):
+        """Whether b lies on the path from a forward to c, ends included. Time Complexity: O(1)"""
+        pa, pb, pc = self.position[a], self.position[b], self.position[c]
+        if pa <= pc:
+            return pa <= pb <= pc
+        return pb >= pa or pb <= pc
+
+    def reverse(self, a, b):
+        """
+        Reverses the path from a forward to b in place. When the complement is shorter it is
+        reversed instead, which gives the same cycle traversed in the opposite direction.
+        Time Complexity: O(min(k, n - k)) where k is the path length
+        """
+        order, position = self.order, self.position
+        size = len(order)
+        i, j = position[a], position[b]
+        length = (j - i) % size + 1
+        if 2 * length > size:
+            i, j, length = (j + 1) % size, (i - 1) % size, size - length
+        for _ in range(length // 2):
+            first, last = order[i], order[j]
+            order[i], order[j] = last, first
+            position[last], position[first] = i, j
+            i = i + 1 if i + 1 < size else 0
+            j = j - 1 if j else size - 1
+
+
+class TwoLevelTour:
+    """
+    Cyclic tour stored as a two-level doubly linked list.
+    Stops are grouped into about √n segments. Each segment keeps its stops in a linked
+    list with sequence numbers and carries a reversed bit, and the segments form a linked
+    list of their own with ranks. next, prev and between read a stop's segment and bit
+    in O(1). reverse splits at most two segments so the path is made of whole segments,
+    then relinks those segments in the opposite order and flips their bits, which is
+    O(√n). Splits add segments, so the list is rebuilt once their number doubles.
+    """
+
+    def __init__(self, stops, segment_size=None):
+        """
+        Time Complexity: O(n) where n is number of stops
+
+        Args:
+            stops (list[int]): Stops in tour order, each visited once
+            segment_size (int): Stops per segment (default √n)
+        Raises:
+            ValueError: If a stop appears twice
+        """
+        self.stops = list(stops)
+        self.index = {stop: node for node, stop in enumerate(self.stops)}
+        if len(self.index) != len(self.stops):
+            raise ValueError("A tour visits each stop once")
+        self.segment_size = segment_size or max(8, math.isqrt(len(self.stops)))
+        self._build(range(len(self.stops)))
+
+    def _build(self, nodes):
+        """Helper function laying out the nodes, given in tour order, into fresh segments"""
+        nodes = list(nodes)
+        size = self.segment_size
+        count = max(1, -(-len(nodes) // size))
+        self._seg = [0] * len(nodes)
+        self._seq = [0] * len(nodes)
+        self._next = [-1] * len(nodes)
+        self._prev = [-1] * len(nodes)
+        self._head, self._tail, self._rev, self._rank = [], [], [], []
+        self._seg_next, self._seg_prev = [], []
+        for segment in range(count):
+            members = nodes[segment * size:(segment + 1) * size]
+            for k, node in enumerate(members):
+                self._seg[node] = segment
+                self._seq[node] = k
+                self._prev[node] = members[k - 1] if k else -1
+                self._next[node] = members[k + 1] if k + 1 < len(members) else -1
+            self._head.append(members[0] if members else -1)
+            self._tail.append(members[-1] if members else -1)
+            self._rev.append(False)
+            self._rank.append(segment)
+            self._seg_next.append((segment + 1) % count)
+            self._seg_prev.append((segment - 1) % count)
+        self._first = 0
+        self._max_segments = 2 * count + 2
+
+    def __len__(self):
+        return len(self.stops)
+
+    def __iter__(self):
+        if not self.stops:
+            return
+        first = self._first
+        node = self._tail[first] if self._rev[first] else self._head[first]
+        for _ in range(len(self.stops)):
+            yield self.stops[node]
+            node = self._succ(node)
+
+    def _succ(self, node):
+        """Helper function returning the node after node"""
+        segment = self._seg[node]
+        following = self._prev[node] if self._rev[segment] else self._next[node]
+        if following >= 0:
+            return following
+        segment = self._seg_next[segment]
+        return self._tail[segment] if self._rev[segment] else self._head[segment]
+
+    def _pred(self, node):
+        """Helper function returning the node before node"""
+        segment = self._seg[node]
+        preceding = self._next[node] if self._rev[segment] else self._prev[node]
+        if preceding >= 0:
+            return preceding
+        segment = self._seg_prev[segment]
+        return self._head[segment] if self._rev[segment] else self._tail[segment]
+
+    def _key(self, node):
+        """Helper function returning the node's (segment rank, sequence) in tour direction"""
+        segment = self._seg[node]
+        return self._rank[segment], -self._seq[node] if self._rev[segment] else self._seq[node]
+
+    def next(self, stop):
+        """Stop visited after stop. Time Complexity: O(1)"""
+        return self.stops[self._succ(self.index[stop])]
+
+    def prev(self, stop):
+        """Stop visited before stop. Time Complexity: O(1)"""
+        return self.stops[self._pred(self.index[stop])]
+
+    def between(self, a, b, c):
+        """Whether b lies on the path from a forward to c, ends included. Time Complexity: O(1)"""
+        pa, pb, pc = self._key(self.index[a]), self._key(self.index[b]), self._key(self.index[c])
+        if pa <= pc:
+            return pa <= pb <= pc
+        return pb >= pa or pb <= pc
+
+    def reverse(self, a, b):
+        """
+        Reverses the path from a forward to b in place. When the complement spans fewer
+        segments it is reversed instead, which gives the same cycle traversed in the
+        opposite direction.
+        Time Complexity: O(√n) amortized
+        """
+        first, last = self.index[a], self.index[b]
+        if first == last:
+            return
+        segment = self._seg[first]
+        if segment == self._seg[last] and self._key(first) <= self._key(last):
+            self._reverse_inside(segment, first, last)
+            return
+
+        # Split so the path starts and ends on segment boundaries
+        if self._inner_step(first, forward=False) >= 0:
+            self._split(first)
+        after = self._inner_step(last, forward=True)
+        if after >= 0:
+            self._split(after)
+
+        run = [self._seg[first]]
+        while run[-1] != self._seg[last]:
+            run.append(self._seg_next[run[-1]])
+        if len(run) < len(self._head):
+            if 2 * len(run) > len(self._head):
+                run = [self._seg_next[self._seg[last]]]
+                while run[-1] != self._seg_prev[self._seg[first]]:
+                    run.append(self._seg_next[run[-1]])
+            self._reverse_segments(run)
+
+        if len(self._head) > self._max_segments:
+            self._build(self._node_order())
+
+    def _inner_step(self, node, forward):
+        """Helper function returning the neighbour of node inside its segment, or -1 at its end"""
+        reverse = self._rev[self._seg[node]]
+        return self._prev[node] if reverse == forward else self._next[node]
+
+    def _reverse_inside(self, segment, first, last):
+        """Helper function reversing a path that lies within one segment"""
+        if self._rev[segment]:
+            first, last = last, first
+        before, after = self._prev[first], self._next[last]
+        nodes = [first]
+        while nodes[-1] != last:
+            nodes.append(self._next[nodes[-1]])
+        sequence = [self._seq[node] for node in nodes]
+        nodes.reverse()
+        for k, node in enumerate(nodes):
+            self._seq[node] = sequence[k]
+            self._prev[node] = nodes[k - 1] if k else before
+            self._next[node] = nodes[k + 1] if k + 1 < len(nodes) else after
+        if before >= 0:
+            self._next[before] = nodes[0]
+        else:
+            self._head[segment] = nodes[0]
+        if after >= 0:
+            self._prev[after] = nodes[-1]
+        else:
+            self._tail[segment] = nodes[-1]
+
+    def _split(self, node):
+        """
+        Helper function moving node and the rest of its segment, in tour direction, into a
+        new segment placed right after it. node must not start its segment.
+        """
+        segment = self._seg[node]
+        if not self._rev[segment]:
+            keep = self._prev[node]
+            self._next[keep], self._prev[node] = -1, -1
+            head, tail = node, self._tail[segment]
+            self._tail[segment] = keep
+        else:
+            keep = self._next[node]
+            self._prev[keep], self._next[node] = -1, -1
+            head, tail = self._head[segment], node
+            self._head[segment] = keep
+
+        created = len(self._head)
+        moved = head
+        while moved >= 0:
+            self._seg[moved] = created
+            moved = self._next[moved]
+        following = self._seg_next[segment]
+        self._head.append(head)
+        self._tail.append(tail)
+        self._rev.append(self._rev[segment])
+        self._rank.append(0)
+        self._seg_next.append(following)
+        self._seg_prev.append(segment)
+        self._seg_next[segment] = created
+        self._seg_prev[following] = created
+
+        rank, current = 0, self._first
+        while True:
+            self._rank[current] = rank
+            rank += 1
+            current = self._seg_next[current]
+            if current == self._first:
+                break
+
+    def _reverse_segments(self, run):
+        """Helper function relinking a run of whole segments in the opposite order"""
+        before, after = self._seg_prev[run[0]], self._seg_next[run[-1]]
+        ranks = [self._rank[segment] for segment in run]
+        run = run[::-1]
+        for segment, rank in zip(run, ranks):
+            self._rev[segment] = not self._rev[segment]
+            self._rank[segment] = rank
+        if self._first in run:
+            self._first = run[ranks.index(min(ranks))]
+        chain = [before] + run + [after]
+        for left, right in zip(chain, chain[1:]):
+            self._seg_next[left] = right
+            self._seg_prev[right] = left
+
+    def _node_order(self):
+        """Helper function listing the nodes in tour order"""
+        first = self._first
+        node = self._tail[first] if self._rev[first] else self._head[first]
+        order = []
+        for _ in range(len(self.stops)):
+            order.append(node)
+            node = self._succ(node)
+        return order
+
+
+def make_tour(stops):
+    """
+    The tour structure suited to the number of stops.
+    Time Complexity: O(n)
+    """
+    stops = list(stops)
+    return ArrayTour(stops) if len(stops) <= ARRAY_TOUR_LIMIT else TwoLevelTour(stops)
+
+
+def two_opt(tour, cost, neighbors, fixed=()):
+    """
+    2-opt local search over candidate neighbour lists with don't-look bits.
+    Each improving move is applied in place with tour.reverse, so the tour is never copied.
+    Time Complexity: O(m * k * r) for m evaluated stops with k candidates and reversal cost r
+
+    Args:
+        tour (ArrayTour | TwoLevelTour): Tour to improve in place
+        cost (callable): Symmetric cost(a, b) between two stops
+        neighbors (dict[int, list[int]]): Candidate stops for each stop, nearest first
+        fixed (set[tuple]): Edges (a, b) that must stay in the tour, listed both ways
+    Returns:
+        float: Cost saved
+    """
+    queue = deque(tour)
+    queued = set(queue)
+    saved = 0.0
+    while queue:
+        t1 = queue.popleft()
+        queued.discard(t1)
+        for step, forward in ((tour.next, True), (tour.prev, False)):
+            t2 = step(t1)
+            if (t1, t2) in fixed:
+                continue
+            removed = cost(t1, t2)
+            move = None
+            for t3 in neighbors.get(t1, ()):
+                partial = removed - cost(t1, t3)
+                if partial <= MIN_GAIN:
+                    break
+                t4 = step(t3)
+                if t3 in (t1, t2) or t4 == t1 or (t3, t4) in fixed:
+                    continue
+                gain = partial + cost(t3, t4) - cost(t2, t4)
+                if gain > MIN_GAIN:
+                    move = (t3, t4, gain)
+                    break
+            if move is None:
+                continue
+            t3, t4, gain = move
+            if forward:
+                tour.reverse(t2, t3)
+            else:
+                tour.reverse(t3, t2)
+            saved += gain
+            for stop in (t1, t2, t3, t4):
+                if stop not in queued:
+                    queued.add(stop)
+                    queue.append(stop)
+            break
+    return saved
+
+
+def _route_cost(distances):
+    """Helper function returning a symmetric leg cost for a matrix or oracle, free at OPEN_END"""
+    oracle_distance = getattr(distances, 'distance', None)
+
+    def cost(a, b):
+        if a == OPEN_END or b == OPEN_END:
+            return 0.0
+        if oracle_distance is not None:
+            return oracle_distance(a, b)
+        value = distances[a][b]
+        return distances[b][a] if value is None else value
+
+    return cost
+
+
+def candidate_neighbors(stops, distances, count=10):
+    """
+    The nearest stops of each stop among stops: from the oracle's spatial index when the
+    distances come from coordinates, otherwise by scanning the matrix row.
+    Time Complexity: O(n * k log k) with an oracle, O(n² log k) with a matrix
+
+    Args:
+        stops (list[int]): Stops of the tour
+        distances (list[list[float]]): Distance matrix or DistanceOracle
+        count (int): Neighbours kept per stop
+    Returns:
+        dict[int, list[int]]: Neighbours of each stop, nearest first
+    """
+    cost = _route_cost(distances)
+    members = set(stops)
+    oracle_neighbors = getattr(distances, 'nearest', None)
+    neighbors = {}
+    for stop in stops:
+        if oracle_neighbors is not None:
+            nearby = [other for other in oracle_neighbors(stop, 3 * count) if other in members and other != stop]
+            neighbors[stop] = nearby[:count]
+        else:
+            neighbors[stop] = heapq.nsmallest(count, (other for other in stops if other != stop),
+                                              key=lambda other: (cost(stop, other), other))
+    return neighbors
+
+
+def optimize_route(route, distances, neighbor_count=10):
+    """
+    Improves a route with 2-opt on a tour structure, for routes too long for the
+    copying 3-opt search. The hub stays first; a route that ends at the hub stays closed
+    and an open route may end at any stop.
+    Time Complexity: O(n * k log k) to build candidates plus the local search, with
+    O(√n) reversals on tours longer than ARRAY_TOUR_LIMIT
+
+    Args:
+        route (list[int]): Route starting at the hub, each stop visited once
+        distances (list[list[float]]): Distance matrix or DistanceOracle
+        neighbor_count (int): Candidate neighbours per stop
+    Returns:
+        list[int]: Improved route
+    Raises:
+        ValueError: If a delivery stop appears twice
+    """
+    if len(route) < 4:
+        return list(route)
+    hub = route[0]
+    closed = route[-1] == hub
+    stops = list(route[:-1]) if closed else list(route) + [OPEN_END]
+    tour = make_tour(stops)
+    cost = _route_cost(distances)
+    neighbors = candidate_neighbors([stop for stop in stops if stop != OPEN_END], distances, neighbor_count)
+    fixed = set()
+    if not closed:
+        fixed = {(hub, OPEN_END), (OPEN_END, hub)}
+        for stop, nearby in neighbors.items():
+            if stop != hub:
+                nearby.insert(0, OPEN_END)
+    two_opt(tour, cost, neighbors, fixed)
+
+    step = tour.prev if not closed and tour.next(hub) == OPEN_END else tour.next
+    improved = [hub]
+    for _ in range(len(stops) - 1):
+        improved.append(step(improved[-1]))
+    if closed:
+        improved.append(hub)
+    else:
+        improved.pop()
+    return improved
@@ -1,6 +1,7 @@
-import datetime
+import clock
 import locations as dist
 import parcels
+import speed_profiles
 
 
 class DeliveryVehicle:
@@ -14,17 +15,23 @@ class DeliveryVehicle:
         Initializes delivery vehicle with operational parameters.
         Args:
             vehicle_id (int): Unique identifier for vehicle
-            departure_time (str): Scheduled start time ('HH:MM:SS')
+            departure_time (str | int): Scheduled start time ('HH:MM:SS' or seconds since midnight)
             operator_id (int): Assigned driver identifier
         """
         self.id = vehicle_id
-        self.leave_time = datetime.datetime.strptime(departure_time, '%H:%M:%S')
+        self.leave_time = clock.to_seconds(departure_time)  # Seconds since midnight
+        self.scheduled_departure = self.leave_time  # Fixed departure restored on each re-plan
         self.speed = 18.0  # Average speed in mph
+        self.speed_profile = None  # Time-of-day speeds (None = constant speed)
         self.max_cargo = 16  # Maximum package capacity
+        self.max_weight = None  # Maximum load in kilograms (None = unlimited)
+        self.max_volume = None  # Maximum load volume (None = unlimited)
         self.shipments = []  # Currently loaded parcels
         self.current_loc = 0  # Current location index (0 = hub)
+        self.depot = None  # Location index of the vehicle's depot (None = main hub)
         self.distance_traveled = 0.0  # Accumulated route distance
         self.operator = operator_id  # Assigned driver
+        self.scheduled_operator = operator_id
         self.route = []  # Planned delivery sequence
         self.status = "at hub"
         self.last_location = None
@@ -41,10 +48,10 @@ class DeliveryVehicle:
 
     def update_status(self, current_time):
         """
-        Updates vehicle status based on current time.
+        Updates vehicle status based on current time (seconds since midnight).
         Time Complexity: O(1)
         """
-        if current_time < self.leave_time.time():
+        if current_time < self.leave_time:
             self.status = "at hub"
         elif self.route and self.distance_traveled > 0:
             self.status = "en route"
@@ -60,6 +67,16 @@ fleet = [
 ]
 
 
+def cargo_weight(vehicle):
+    """Total kilograms loaded on a vehicle (unknown weights count as 0). Time Complexity: O(p)"""
+    return sum(package.weight_kg or 0.0 for package in vehicle.shipments)
+
+
+def cargo_volume(vehicle):
+    """Total volume loaded on a vehicle (unknown volumes count as 0). Time Complexity: O(p)"""
+    return sum(package.volume or 0.0 for package in vehicle.shipments)
+
+
 def initialize_fleet(cargo_loads):
     """
     Distributes parcels to vehicles based on optimized loading plan.
@@ -71,6 +88,13 @@ def initialize_fleet(cargo_loads):
         list[DeliveryVehicle]: Configured vehicle fleet
     """
     try:
+        # Clear any previous plan so re-planning does not load parcels twice
+        for vehicle in fleet:
+            vehicle.shipments = []
+            vehicle.route = []
+            vehicle.leave_time = vehicle.scheduled_departure
+            vehicle.operator = vehicle.scheduled_operator
+
         # Load packages onto assigned vehicles
         for vehicle_id, package_ids in cargo_loads.items():
             vehicle = next(v for v in fleet if v.id == vehicle_id)
@@ -87,6 +111,11 @@ def initialize_fleet(cargo_loads):
                 else:
                     raise LookupError(f"Package {package_id} not found")
 
+            if vehicle.max_weight is not None and cargo_weight(vehicle) > vehicle.max_weight:
+                raise ValueError(f"Load on vehicle {vehicle_id} exceeds {vehicle.max_weight:g} kg")
+            if vehicle.max_volume is not None and cargo_volume(vehicle) > vehicle.max_volume:
+                raise ValueError(f"Load on vehicle {vehicle_id} exceeds volume {vehicle.max_volume:g}")
+
         return fleet
 
     except Exception as e:
@@ -96,53 +125,61 @@ def initialize_fleet(cargo_loads):
 def calculate_progress(query_time, vehicle, distances):
     """
     Determines vehicle location and progress at specified time.
-    Time Complexity: O(n) where n is number of route points
+    Time Complexity: O(n + p) where n is number of route points and p is number of packages
 
     Args:
-        query_time: Time point for progress calculation
+        query_time (int): Time point for progress calculation, in seconds since midnight
         vehicle: Vehicle to track
         distances: Distance matrix for route calculations
     Returns:
         tuple: Current location index and total distance traveled
     """
-    if not isinstance(query_time, datetime.time):
+    if isinstance(query_time, bool) or not isinstance(query_time, (int, float)):
         raise ValueError("Invalid query time format")
 
     # Reset progress tracking
     current_time = vehicle.leave_time
-    current_loc = 0
+    current_loc = vehicle.route[0] if vehicle.route else 0  # The vehicle's hub
     travel_distance = 0.0
 
     # If before departure time, return hub location
-    if query_time < vehicle.leave_time.time():
+    if query_time < vehicle.leave_time:
         return current_loc, travel_distance
 
+    # Group packages by destination once instead of re-resolving addresses at every stop
+    packages_by_stop = {}
+    for package in vehicle.shipments:
+        try:
+            packages_by_stop.setdefault(dist.get_location_index(package.destination), []).append(package)
+        except ValueError:
+            continue
+
+    arrival_times, _ = speed_profiles.route_arrival_times(
+        vehicle.route, distances, vehicle.leave_time, vehicle.speed, vehicle.speed_profile)
+
     # Track progress through route
     for i in range(len(vehicle.route) - 1):
         current = vehicle.route[i]
         next_stop = vehicle.route[i + 1]
 
-        # Calculate segment distance and time
+        # Segment distance and arrival time
         segment_distance = dist.calculate_distance([current, next_stop], distances)
-        travel_time = segment_distance / vehicle.speed  # Hours
-        segment_arrival = current_time + datetime.timedelta(hours=travel_time)
+        segment_arrival = arrival_times[i + 1]
 
         # Update delivery times for packages at this stop
-        if query_time >= segment_arrival.time():
+        if query_time >= segment_arrival:
             current_loc = next_stop
             travel_distance += segment_distance
             current_time = segment_arrival
 
             # Update package delivery times
-            for package in vehicle.shipments:
-                if dist.get_location_index(package.destination) == next_stop:
-                    package.delivery_time = segment_arrival
+            for package in packages_by_stop.get(next_stop, ()):
+                package.delivery_time = segment_arrival
         else:
             # Interpolate position between stops
-            time_ratio = ((query_time.hour * 3600 + query_time.minute * 60 + query_time.second) -
-                          (current_time.hour * 3600 + current_time.minute * 60 + current_time.second)) / \
-                         (travel_time * 3600)
-            travel_distance += segment_distance * time_ratio
+            travel_time = segment_arrival - current_time
+            if travel_time > 0:
+                travel_distance += segment_distance * (query_time - current_time) / travel_time
             break
 
     vehicle.distance_traveled = travel_distance